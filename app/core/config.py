@@ -1,13 +1,17 @@
-from dotenv import find_dotenv
+from typing import Literal
+
+from dotenv import find_dotenv, load_dotenv
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# .env читается один раз в окружение процесса (уже заданные переменные приоритетнее),
+# а не заново в каждом из под-конфигов через env_file
+load_dotenv(find_dotenv(".env"), encoding="utf-8", override=False)
+
 
 # Базовый класс конфига
 class Config(BaseSettings):
     model_config = SettingsConfigDict(
-        env_file=find_dotenv(".env"),
-        env_file_encoding="utf-8",
         env_ignore_empty=True,
         extra="ignore",
         env_nested_delimiter="__",
@@ -64,6 +68,12 @@ class ReadKafkaConfig(Config):
     max_poll_interval_ms: int = 300000
     max_poll_records: int = 500
 
+    # Конкурентная обработка с порядком по ключу (KeyOrderedDispatcher) вместо max_workers
+    concurrent_dispatch: bool = False
+    max_in_flight_per_partition: int = 8
+    max_in_flight_total: int = 64
+    drain_timeout_seconds: float = 30.0  # Сколько ждать обрабатываемые сообщения при остановке
+
     model_config = SettingsConfigDict(env_prefix="READ_KAFKA__")
 
 
@@ -71,6 +81,18 @@ class WriteKafkaConfig(Config):
     bootstrap_servers: list[str]
     topic_out: str
 
+    # Потоковая генерация: публиковать частичные ответы (statusCode=101) в topic_out
+    stream_partial: bool = False
+    stream_min_chars: int = 50  # Минимальный прирост текста между частичными публикациями
+
+    # Пакетная публикация результатов в topic_out (BatchingPublisher)
+    batch_publish: bool = False
+    linger_ms: int = 5  # Сколько ждать накопления батча после первого сообщения
+    batch_size: int = 100  # Сброс батча при достижении числа сообщений
+    # Параметры producer-а (действуют и без batch_publish)
+    max_batch_bytes: int = 16384
+    compression_type: Literal["gzip", "snappy", "lz4", "zstd"] | None = None
+
     model_config = SettingsConfigDict(env_prefix="WRITE_KAFKA__")
 
 
@@ -102,6 +124,19 @@ class FluentConfig(Config):
     timeout: float
     raise_exceptions: bool
 
+    pool_maxsize: int = 4  # Соединений в пуле на каждый endpoint Fluentd
+    # Пакетная отправка: записи копятся в ограниченной очереди и уходят пачками из фонового потока
+    batch_enabled: bool = False
+    batch_format: Literal["json", "msgpack"] = "json"  # Тело запроса in_http: JSON- или msgpack-массив
+    batch_size: int = 100  # Сброс пачки по числу записей
+    flush_interval_seconds: float = 1.0  # Сброс пачки по времени
+    max_queue_size: int = 10000  # Ёмкость очереди; при переполнении записи отбрасываются
+    enqueue_timeout_seconds: float = 0.0  # Сколько ждать место в очереди (backpressure), 0 — не ждать
+    max_retries: int = 3  # Повторы отправки пачки (экспоненциальная задержка)
+    retry_backoff_seconds: float = 0.5
+    spool_dir: str | None = None  # Каталог для пачек, не отправленных после повторов (None — отбрасывать)
+    spool_max_bytes: int = 50_000_000  # Предел размера spool-файла
+
     model_config = SettingsConfigDict(
         env_prefix="FLUENT__",
     )
@@ -120,6 +155,13 @@ class TSLGConfig(Config):
     # Параметры подключения к TSLG Agent
     host: str
     port: int
+    # Постоянное соединение: кадры копятся в кольцевом буфере и пишутся пачками из фонового потока
+    tcp_batching: bool = False
+    tcp_buffer_frames: int = 10000  # Буфер на время недоступности агента (старые кадры вытесняются)
+    tcp_batch_bytes: int = 65536  # Максимум байт в одной записи в сокет
+    tcp_connect_timeout_seconds: float = 5.0
+    tcp_reconnect_min_seconds: float = 0.5  # Переподключение: экспонента с jitter в этих пределах
+    tcp_reconnect_max_seconds: float = 30.0
 
     app_name: str  # "python_online_rag_3287_shturman_1"
     app_type: str  # "Тип приложения (PYTHON/JAVA/NODEJS/GO)"
@@ -133,6 +175,8 @@ class TSLGConfig(Config):
 
     # Дополнительные параметры
     aggregation_type: str  # тип агрегации (TRACING/OPENSHIFT_EVENT/...)
+    # Отладка: TslgFormatter собирает сообщение через TSLGMsgSchemas с валидацией (медленнее)
+    validate_schema: bool = False
 
     # Параметры подключения к Kafka
     kafka_topic: str
@@ -145,6 +189,25 @@ class TSLGConfig(Config):
     model_config = SettingsConfigDict(env_prefix="TSLG__")
 
 
+class LogQueueConfig(Config):
+    # Fluentd/TSLG-обработчики за ограниченной очередью: форматирование и отправка в фоновом потоке
+    enabled: bool = False
+    max_size: int = 10000  # Ёмкость очереди записей
+    overflow_policy: Literal["drop", "block"] = "drop"  # drop — отбросить сразу; block — подождать место
+    block_timeout_seconds: float = 0.1  # Для block: сколько ждать место, затем отбросить
+    batch_size: int = 256  # Сколько записей фоновый поток забирает за раз (flush handler-ов — после пачки)
+
+    model_config = SettingsConfigDict(env_prefix="LOG_QUEUE__")
+
+
+class LogPayloadConfig(Config):
+    # Тела Kafka-сообщений в логах middleware (AutoPublishMiddleware и т.п.)
+    sample_rate: float = 1.0  # Доля сообщений, тело которых пишется в лог
+    max_length: int = 0  # Обрезать тело до N символов (0 — без ограничения)
+
+    model_config = SettingsConfigDict(env_prefix="LOG_PAYLOAD__")
+
+
 class SmithLangChainConfig(Config):
     # https://smith.langchain.com/settings
     tracing_v2: bool = Field(default=True, alias="LANGCHAIN_TRACING_V2")
@@ -166,6 +229,10 @@ class RNDTokenManagerConfig(Config):
     password: str
     url: str
     verify: bool = False
+    refresh_ratio: float = 0.8  # Токен обновляется заранее, по истечении этой доли expires_in
+    background_refresh: bool = False  # True → обновление по расписанию в фоне; False → запускает первый запрос
+    refresh_retry_min_seconds: float = 1  # Повторы ошибок обновления: экспонента с jitter в этих пределах
+    refresh_retry_max_seconds: float = 30
 
     model_config = SettingsConfigDict(env_prefix="RND_TOKEN__")
 
@@ -192,6 +259,7 @@ class TYKYandexConfig(Config):
     temperature: float
     max_tokens: int
     use_ssl: bool = False
+    stream: bool = False
 
     use_tyk: bool = False
 
@@ -204,10 +272,29 @@ class EPATokenManagerConfig(Config):
     password: str
     url: str
     verify: bool = False
+    refresh_ratio: float = 0.8  # Токен обновляется заранее, по истечении этой доли expires_in
+    background_refresh: bool = False  # True → обновление по расписанию в фоне; False → запускает первый запрос
+    refresh_retry_min_seconds: float = 1  # Повторы ошибок обновления: экспонента с jitter в этих пределах
+    refresh_retry_max_seconds: float = 30
 
     model_config = SettingsConfigDict(env_prefix="EPA_TOKEN__")
 
 
+# ─────────── HTTP POOL ───────────
+class HTTPClientConfig(Config):
+    max_connections: int = 100  # Всего соединений в пуле
+    max_keepalive_connections: int = 20  # Сколько соединений держать открытыми между запросами
+    keepalive_expiry: float = 30.0  # Через сколько секунд простоя закрывать keep-alive соединение
+    max_connections_per_host: int | None = None  # Лимит одновременных запросов на один хост (None = без лимита)
+    http2: bool = True  # HTTP/2 (нужен пакет h2)
+    verify: bool = False
+    timeout: float = 30.0
+    connect_timeout: float = 5.0
+    connect_retries: int = 0  # Повторы установки соединения на уровне транспорта
+
+    model_config = SettingsConfigDict(env_prefix="HTTP_CLIENT__")
+
+
 class RagConfig(Config):
     # Параметры MultiQuery Ensemble Retriever
     n: int  # Сколько раз LLM переформулирует запрос
@@ -217,20 +304,167 @@ class RagConfig(Config):
     bm25_weight: float  # = 0.55  # вес BM25 в гибридном поиске
     use_answer_checker: bool  # = False
     n_best: int  # Количество лучших результатов для реранкера
+    # Intent и переформулировка+поиск основного запроса выполняются параллельно,
+    # доп. поиск по intent — после обоих (узел IntentRetriever)
+    parallel_intent: bool = False
+    # Слияние vector/BM25 выдачи: rrf | minmax | zscore | concat (прежнее vector + bm25), не больше k чанков
+    fusion_method: Literal["concat", "rrf", "minmax", "zscore"] = "rrf"
+    rrf_k: int = 60  # Сглаживающая константа RRF: 1 / (rrf_k + rank)
+    # Пустая vector-выдача (ниже relevance_threshold) → релевантных документов нет, BM25 не используется
+    require_vector_hits: bool = True
 
     model_config = SettingsConfigDict(env_prefix="RAG__")
 
 
+# ─────────── CIRCUIT BREAKER ───────────
+class CircuitBreakerConfig(Config):
+    enabled: bool = False  # Circuit breaker для TYK/YaGPT и token endpoint-ов
+    failure_threshold: int = 5  # Ошибок доступности (сеть/таймаут/429/5xx) подряд до размыкания
+    recovery_timeout_seconds: float = 30.0  # Сколько цепь разомкнута до пробного вызова
+    half_open_max_calls: int = 1  # Пробных вызовов в half-open
+    fallback_backend: Literal["tyk", "rnd"] | None = None  # Запасной бэкенд при разомкнутой цепи основного
+
+    model_config = SettingsConfigDict(env_prefix="CIRCUIT_BREAKER__")
+
+
+# ─────────── LLM LIMITER ───────────
+class LLMLimiterConfig(Config):
+    enabled: bool = False
+    requests_per_second: float | None = None  # Token bucket запросов; None → без ограничения
+    tokens_per_second: float | None = None  # Token bucket токенов (оценка по длине промпта + max_tokens)
+    burst_seconds: float = 1.0  # Ёмкость bucket-а = rate * burst_seconds
+    chars_per_token: float = 4.0  # Оценка длины токена в символах
+    # Адаптивный лимит параллельных вызовов (AIMD)
+    initial_concurrency: int = 8
+    min_concurrency: int = 1
+    max_concurrency: int = 64
+    latency_threshold_seconds: float = 15.0  # Ответ дольше — сигнал перегрузки
+    decrease_ratio: float = 0.7  # Множитель лимита при перегрузке (429/5xx/таймаут/медленный ответ)
+    acquire_timeout_seconds: float = 30.0  # Сколько ждать слота, потом ошибка
+    # Приоритет узлов графа: меньше — важнее (финальный ответ вперёд проверки)
+    priorities: dict[str, int] = {"llm": 0, "Intent": 1, "Retriever": 1, "AnswerChecker": 2}
+
+    model_config = SettingsConfigDict(env_prefix="LLM_LIMITER__")
+
+
+# ─────────── LLM HEDGING ───────────
+class LLMHedgingConfig(Config):
+    enabled: bool = False
+    percentile: float = 0.95  # Дубль запроса уходит, если ответа нет дольше этого перцентиля задержки
+    min_delay_seconds: float = 0.5  # Не дублировать раньше этого времени
+    window_size: int = 200  # Сколько последних задержек учитывать
+    min_samples: int = 20  # До набора статистики дублей нет
+    max_extra_ratio: float = 0.05  # Бюджет: дублей не больше этой доли от всех вызовов
+    budget_burst: float = 2.0  # Бюджет копится не больше чем на столько дублей подряд
+    exclude_nodes: list[str] = []  # Узлы без дублирования: Intent, Retriever, llm, AnswerChecker
+
+    model_config = SettingsConfigDict(env_prefix="LLM_HEDGING__")
+
+
+# ─────────── LLM ROUTER ───────────
+class LLMRouterConfig(Config):
+    enabled: bool = False
+    backends: list[Literal["primary", "ollama"]] = ["primary"]  # primary — основной LLM сервиса (TYK/RnD)
+    # Политика по узлам (порядок = предпочтение): {"Intent": ["ollama", "primary"], "llm": ["primary"]}
+    node_backends: dict[str, list[str]] = {}
+    ewma_alpha: float = 0.2  # Вес нового замера в EWMA задержки и доли ошибок
+    error_penalty_seconds: float = 10.0  # Оценка бэкенда = EWMA задержки + штраф * доля ошибок
+    switch_ratio: float = 1.5  # Уйти с предпочтительного бэкенда, если оценка другого лучше в switch_ratio раз
+    stats_ttl_seconds: float = 60.0  # Статистика бэкенда без вызовов дольше — сбрасывается (повторная проба)
+    failover: bool = True  # При ошибке бэкенда пробовать следующий
+    ollama_model: str = "qwen2.5:3b"
+    ollama_url: str = "http://127.0.0.1:11434"
+    ollama_temperature: float = 0.0
+
+    model_config = SettingsConfigDict(env_prefix="LLM_ROUTER__")
+
+
+# ─────────── LLM MEMO ───────────
+class LLMMemoConfig(Config):
+    enabled: bool = False
+    backend: Literal["memory", "redis"] = "memory"
+    redis_url: str | None = None
+    redis_password: str = ""
+    key_prefix: str = "rag:llm_memo"
+    ttl_seconds: int = 3600
+    max_size: int = 4096  # Размер in-memory LRU
+    # Выше этой температуры мемоизация не применяется. По умолчанию покрывает температуру генерации
+    # (TYK_YANDEX__TEMPERATURE / RND_YANDEX__TEMPERATURE): повтор того же промпта получает сохранённый ответ
+    max_temperature: float = 1.0
+    exclude_nodes: list[str] = []  # Узлы без мемоизации: Intent, Retriever, llm, AnswerChecker
+
+    model_config = SettingsConfigDict(env_prefix="LLM_MEMO__")
+
+
+# ─────────── RESPONSE CACHE ───────────
+class ResponseCacheConfig(Config):
+    enabled: bool = False
+    redis_url: str | None = None  # None → только in-process L1
+    redis_password: str = ""
+    key_prefix: str = "rag:response"
+    ttl_seconds: int = 3600
+    max_size: int = 10000  # Максимум ответов в Redis (старые вытесняются)
+    l1_max_size: int = 1024  # Максимум ответов в in-process LRU
+    semantic_enabled: bool = False  # Поиск похожих вопросов по эмбеддингам (в пределах L1)
+    similarity_threshold: float = 0.95  # Минимальная косинусная близость для семантического попадания
+
+    model_config = SettingsConfigDict(env_prefix="RESPONSE_CACHE__")
+
+
+# ─────────── WARMUP ───────────
+class WarmupConfig(Config):
+    enabled: bool = False  # Прогрев моделей/соединений в init_async; /health = 503 до его окончания
+    query: str = "Как оформить заявку?"  # Синтетический запрос для прогона графа
+    run_graph: bool = True  # Прогнать синтетический запрос через граф (реальный вызов LLM)
+    timeout_seconds: float = 120  # Общий лимит прогрева; по истечении сервис стартует непрогретым
+
+    model_config = SettingsConfigDict(env_prefix="WARMUP__")
+
+
 # ─────────── EMBEDDING ───────────
 class EmbeddingConfig(Config):
     model: str
     device: str  # "cuda" | "mps" | "cpu"
+    # > 0 → aembed_query конкурентных запросов собираются в общий батч за это окно (микробатчинг)
+    batch_window_ms: float = 0
+    max_batch_size: int = 32
+    # Кэш эмбеддингов: in-memory LRU + (если задан cache_dir) memmap-хранилище на диске
+    cache_enabled: bool = False
+    cache_max_size: int = 10000
+    cache_dir: str | None = None  # Каталог на persistent volume; None → только in-memory
+    cache_dtype: Literal["float32", "float16"] = "float16"
+    cache_disk_capacity: int = 200000  # Максимум векторов на диске
+    # Выделенный executor для инференса: default — как раньше (executor event loop-а по умолчанию)
+    executor: Literal["default", "thread", "process"] = "default"
+    executor_workers: int = 1
+    torch_num_threads: int | None = None  # Intra-op потоки torch в воркере (None → по умолчанию torch)
+    max_queue_depth: int = 64  # Максимум задач в executor-е одновременно
+    queue_timeout_seconds: float = 10  # Сколько ждать места в очереди, потом ошибка
 
     model_config = SettingsConfigDict(env_prefix="EMBEDDING__")
 
 
+# ─────────── RERANKER ───────────
+class RerankerConfig(Config):
+    enabled: bool = False  # False → Reranker только обрезает выдачу до n_best
+    model: str = "/app/models/reranker"  # путь/имя модели sentence-transformers CrossEncoder
+    device: str = "cpu"
+    # onnx — для CPU-подов (нужен extra reranker-onnx: sentence-transformers[onnx]);
+    # onnx_file_name — например квантованная int8-модель
+    backend: Literal["torch", "onnx"] = "torch"
+    onnx_file_name: str | None = None  # "onnx/model_qint8_avx512_vnni.onnx"
+    max_length: int = 512  # Обрезка пары (вопрос, чанк) в токенах
+    max_batch_size: int = 64  # Все кандидаты скорятся одним батчем, но не больше max_batch_size пар
+    max_workers: int = 1  # Потоки для инференса (модель не блокирует event loop)
+    batch_window_ms: float = 0  # > 0 → пары конкурентных запросов собираются в общий батч (микробатчинг)
+    torch_num_threads: int | None = None  # None → по умолчанию torch
+
+    model_config = SettingsConfigDict(env_prefix="RERANKER__")
+
+
 # ─────────── OPENSEARCH ───────────
 class OpenSearchConfig(Config):
+    enabled: bool = False  # False → моковый поиск в RetrieverIntent
     url: str
     index_name: str
     login: str
@@ -241,28 +475,39 @@ class OpenSearchConfig(Config):
 
 class EnvConfig(Config):
     # LLM
-    tyk_yandex_config: TYKYandexConfig = TYKYandexConfig()  # type: ignore[call-arg]
-    epa_token: EPATokenManagerConfig = EPATokenManagerConfig()  # type: ignore[call-arg]
-    rnd_yandex_config: RNDYandexConfig = RNDYandexConfig()  # type: ignore[call-arg]
-    rnd_token_manager_config: RNDTokenManagerConfig = RNDTokenManagerConfig()  # type: ignore[call-arg]
-
-    embedding: EmbeddingConfig = EmbeddingConfig()  # type: ignore[call-arg]
-    rag: RagConfig = RagConfig()  # type: ignore[call-arg]
-    open_search: OpenSearchConfig = OpenSearchConfig()  # type: ignore[call-arg]
-
-    project: ProjectConfig = ProjectConfig()  # type: ignore[call-arg]
-    prometheus: PrometheusConfig = PrometheusConfig()  # type: ignore[call-arg]
-    api: APIConfig = APIConfig()  # type: ignore[call-arg]
-    read_kafka: ReadKafkaConfig = ReadKafkaConfig()  # type: ignore[call-arg]
-    write_kafka: WriteKafkaConfig = WriteKafkaConfig()  # type: ignore[call-arg]
-    ssl_kafka: SSLKafkaConfig = SSLKafkaConfig()  # type: ignore[call-arg]
-    fluent: FluentConfig = FluentConfig()  # type: ignore[call-arg]
-    tslg: TSLGConfig = TSLGConfig()  # type: ignore[call-arg]
+    tyk_yandex_config: TYKYandexConfig = Field(default_factory=lambda: TYKYandexConfig())  # type: ignore[call-arg]
+    epa_token: EPATokenManagerConfig = Field(default_factory=lambda: EPATokenManagerConfig())  # type: ignore[call-arg]
+    rnd_yandex_config: RNDYandexConfig = Field(default_factory=lambda: RNDYandexConfig())  # type: ignore[call-arg]
+    rnd_token_manager_config: RNDTokenManagerConfig = Field(default_factory=lambda: RNDTokenManagerConfig())  # type: ignore[call-arg]
+    http_client: HTTPClientConfig = Field(default_factory=HTTPClientConfig)
+    circuit_breaker: CircuitBreakerConfig = Field(default_factory=CircuitBreakerConfig)
+
+    embedding: EmbeddingConfig = Field(default_factory=lambda: EmbeddingConfig())  # type: ignore[call-arg]
+    rag: RagConfig = Field(default_factory=lambda: RagConfig())  # type: ignore[call-arg]
+    response_cache: ResponseCacheConfig = Field(default_factory=ResponseCacheConfig)
+    llm_memo: LLMMemoConfig = Field(default_factory=LLMMemoConfig)
+    llm_limiter: LLMLimiterConfig = Field(default_factory=LLMLimiterConfig)
+    llm_hedging: LLMHedgingConfig = Field(default_factory=LLMHedgingConfig)
+    llm_router: LLMRouterConfig = Field(default_factory=LLMRouterConfig)
+    reranker: RerankerConfig = Field(default_factory=RerankerConfig)
+    warmup: WarmupConfig = Field(default_factory=WarmupConfig)
+    open_search: OpenSearchConfig = Field(default_factory=lambda: OpenSearchConfig())  # type: ignore[call-arg]
+
+    project: ProjectConfig = Field(default_factory=lambda: ProjectConfig())  # type: ignore[call-arg]
+    prometheus: PrometheusConfig = Field(default_factory=lambda: PrometheusConfig())  # type: ignore[call-arg]
+    api: APIConfig = Field(default_factory=lambda: APIConfig())  # type: ignore[call-arg]
+    read_kafka: ReadKafkaConfig = Field(default_factory=lambda: ReadKafkaConfig())  # type: ignore[call-arg]
+    write_kafka: WriteKafkaConfig = Field(default_factory=lambda: WriteKafkaConfig())  # type: ignore[call-arg]
+    ssl_kafka: SSLKafkaConfig = Field(default_factory=lambda: SSLKafkaConfig())  # type: ignore[call-arg]
+    fluent: FluentConfig = Field(default_factory=lambda: FluentConfig())  # type: ignore[call-arg]
+    tslg: TSLGConfig = Field(default_factory=lambda: TSLGConfig())  # type: ignore[call-arg]
+    log_queue: LogQueueConfig = Field(default_factory=LogQueueConfig)
+    log_payload: LogPayloadConfig = Field(default_factory=LogPayloadConfig)
     log_level: str = "INFO"
     enable_colored_logs: bool = True  # Added here
 
-    langfuse: LangfuseConfig = LangfuseConfig()  # type: ignore[call-arg]
-    smith: SmithLangChainConfig = SmithLangChainConfig()  # type: ignore[call-arg]
+    langfuse: LangfuseConfig = Field(default_factory=lambda: LangfuseConfig())  # type: ignore[call-arg]
+    smith: SmithLangChainConfig = Field(default_factory=lambda: SmithLangChainConfig())  # type: ignore[call-arg]
 
 
 CONFIG = EnvConfig()
@@ -1,18 +1,32 @@
+import asyncio
 import logging
+import time
+from collections.abc import Awaitable
+from pathlib import Path
 
-from app.core.config import EnvConfig
-from app.services.RAG.llm.llm import AsyncLLM
+from langchain_community.vectorstores import OpenSearchVectorSearch
+from langchain_core.embeddings import Embeddings
 
-# from app.services.RAG.rag_pipeline.embeddings.embedding import Embedding
+from app.core.config import EnvConfig
+from app.core.http_client import HTTPClientPool
+from app.services.RAG.llm.fallback import FallbackLLM
+from app.services.RAG.llm.limiter import LLMLimiter
+from app.services.RAG.llm.llm import AsyncLLM, LocalAsyncOllamaLLM
+from app.services.RAG.llm.memo import InMemoryMemoBackend, MemoBackend, RedisMemoBackend
+from app.services.RAG.llm.protocols import AsyncLLMProtocol
+from app.services.RAG.llm.router import LLMRouter
+from app.services.RAG.rag_pipeline.cache.response_cache import SemanticResponseCache
+from app.services.RAG.rag_pipeline.embeddings.async_embedding import AsyncEmbedding
+from app.services.RAG.rag_pipeline.embeddings.batched import BatchedEmbeddings
+from app.services.RAG.rag_pipeline.embeddings.cached import CachedEmbeddings, MemmapVectorStore
+from app.services.RAG.rag_pipeline.embeddings.embedding import Embedding
 from app.services.RAG.rag_pipeline.graph.builder import RAGGraphBuilder
+from app.services.RAG.rag_pipeline.nodes.retrieval.hybrid_search import HybridOpenSearchEngine
 from app.services.RAG.rag_pipeline.pipeline import RAGPipeline
+from app.services.RAG.rag_pipeline.reranking.cross_encoder import CrossEncoderScorer
 from app.services.rag_service import RagService
-
-# from pathlib import Path
-
-# from langchain_community.vectorstores import OpenSearchVectorSearch
-# from langchain_huggingface import HuggingFaceEmbeddings
-
+from rnd_connectors.redis.base import AsyncRedisClient
+from rnd_connectors.redis.schemas import RedisConfig
 
 logger = logging.getLogger(__name__)
 
@@ -25,47 +39,115 @@ class DependencyContainer:
 
     def __init__(self, config: EnvConfig):
         self.config = config
+        self._http_pool: HTTPClientPool | None = None
         self._llm: AsyncLLM | None = None
-        # self._embeddings: HuggingFaceEmbeddings | None = None
-        # self._opensearch: OpenSearchVectorSearch | None = None
+        self._fallback_llm: AsyncLLM | None = None
+        self._embeddings: Embeddings | None = None
+        self._model_embeddings: Embeddings | None = None  # модель без обёрток (кэш/батчинг) — для прогрева
+        self._async_embedding: AsyncEmbedding | None = None
+        self._cache_redis: AsyncRedisClient | None = None
+        self._response_cache: SemanticResponseCache | None = None
+        self._memo_redis: AsyncRedisClient | None = None
+        self._memo_backend: MemoBackend | None = None
+        self._llm_limiter: LLMLimiter | None = None
+        self._llm_router: LLMRouter | None = None
+        self._opensearch: OpenSearchVectorSearch | None = None
+        self._search_engine: HybridOpenSearchEngine | None = None
+        self._reranker_scorer: CrossEncoderScorer | None = None
         self._graph_builder: RAGGraphBuilder | None = None
         self._pipeline: RAGPipeline | None = None
         self._service: RagService | None = None
+        self._ready = False
 
     # -------- ЛЕНИВЫЕ КОМПОНЕНТЫ --------
-    # @property
-    # def embeddings(self) -> HuggingFaceEmbeddings:
-    #     """Инициализация модели эмбеддингов"""
-    #     if self._embeddings is None:
-    #         # Извлекаем название модели из пути
-    #         model_path = self.config.embedding.model
-    #         model_name = Path(model_path).name
-    #
-    #         logger.info(f"🔧 Инициализация модели embeddings: {model_name}...")
-    #         embedding_service = Embedding(self.config.embedding)
-    #         self._embeddings = embedding_service.embeddings
-    #         logger.info(
-    #             f"✅ Модель embeddings: {model_name} инициализирована. device: {self.config.embedding.device}",
-    #         )
-    #     return self._embeddings
-    #
-    # @property
-    # def opensearch(self) -> OpenSearchVectorSearch:
-    #     """Инициализация векторного хранилища OpenSearch."""
-    #     if self._opensearch is None:
-    #         logger.info("🔧 Инициализация OpenSearchVectorSearch...")
-    #         self._opensearch = OpenSearchVectorSearch(
-    #             opensearch_url=self.config.open_search.url,
-    #             index_name=self.config.open_search.index_name,
-    #             embedding_function=self.embeddings,
-    #             http_auth=(self.config.open_search.login, self.config.open_search.password),
-    #             use_ssl=True,
-    #             verify_certs=False,
-    #             ssl_assert_hostname=False,
-    #             ssl_show_warn=False,
-    #         )
-    #         logger.info("✅ OpenSearchVectorSearch готов к работе")
-    #     return self._opensearch
+    @property
+    def embeddings(self) -> Embeddings:
+        """Инициализация модели эмбеддингов"""
+        if self._embeddings is None:
+            # Извлекаем название модели из пути
+            model_path = self.config.embedding.model
+            model_name = Path(model_path).name
+
+            logger.info(f"🔧 Инициализация модели embeddings: {model_name}...")
+            embeddings: Embeddings
+            if self.config.embedding.executor == "default":
+                embeddings = Embedding(self.config.embedding).embeddings
+            else:
+                self._async_embedding = AsyncEmbedding(self.config.embedding)
+                embeddings = self._async_embedding
+            self._model_embeddings = embeddings
+            if self.config.embedding.batch_window_ms > 0:
+                embeddings = BatchedEmbeddings(
+                    embeddings,
+                    max_batch_size=self.config.embedding.max_batch_size,
+                    max_wait_ms=self.config.embedding.batch_window_ms,
+                )
+            if self.config.embedding.cache_enabled:
+                embeddings = self._create_cached_embeddings(embeddings, model_name)
+            self._embeddings = embeddings
+            logger.info(
+                f"✅ Модель embeddings: {model_name} инициализирована. device: {self.config.embedding.device}",
+            )
+        return self._embeddings
+
+    def _create_cached_embeddings(self, embeddings: Embeddings, model_name: str) -> CachedEmbeddings:
+        config = self.config.embedding
+        store = None
+        if config.cache_dir is not None:
+            store = MemmapVectorStore(
+                Path(config.cache_dir) / model_name,
+                dtype=config.cache_dtype,
+                capacity=config.cache_disk_capacity,
+            )
+        return CachedEmbeddings(embeddings, model_name=model_name, max_size=config.cache_max_size, store=store)
+
+    @property
+    def opensearch(self) -> OpenSearchVectorSearch:
+        """Инициализация векторного хранилища OpenSearch."""
+        if self._opensearch is None:
+            logger.info("🔧 Инициализация OpenSearchVectorSearch...")
+            self._opensearch = OpenSearchVectorSearch(
+                opensearch_url=self.config.open_search.url,
+                index_name=self.config.open_search.index_name,
+                embedding_function=self.embeddings,
+                http_auth=(self.config.open_search.login, self.config.open_search.password),
+                use_ssl=True,
+                verify_certs=False,
+                ssl_assert_hostname=False,
+                ssl_show_warn=False,
+            )
+            logger.info("✅ OpenSearchVectorSearch готов к работе")
+        return self._opensearch
+
+    @property
+    def search_engine(self) -> HybridOpenSearchEngine | None:
+        """Гибридный поиск (vector + BM25) в OpenSearch; None — если OpenSearch выключен."""
+        if self._search_engine is None and self.config.open_search.enabled:
+            rag_config = self.config.rag
+            self._search_engine = HybridOpenSearchEngine(
+                client=self.opensearch.async_client,
+                index_name=self.config.open_search.index_name,
+                embeddings=self.embeddings,
+                k=rag_config.k,
+                relevance_threshold=rag_config.relevance_threshold,
+                use_hybrid_search=rag_config.use_hybrid_search,
+                bm25_weight=rag_config.bm25_weight,
+            )
+        return self._search_engine
+
+    @property
+    def reranker_scorer(self) -> CrossEncoderScorer | None:
+        """CrossEncoder для Reranker; None — если реранкер выключен."""
+        if self._reranker_scorer is None and self.config.reranker.enabled:
+            self._reranker_scorer = CrossEncoderScorer(self.config.reranker)
+        return self._reranker_scorer
+
+    @property
+    def http_pool(self) -> HTTPClientPool:
+        """Общий пул HTTP-соединений для всех LLM-клиентов."""
+        if self._http_pool is None:
+            self._http_pool = HTTPClientPool(self.config.http_client)
+        return self._http_pool
 
     @property
     def llm(self) -> AsyncLLM:
@@ -80,6 +162,8 @@ class DependencyContainer:
             #     rnd_token_manager_config=self.config.rnd_token_manager_config,
             #     rnd_yandex_config=self.config.rnd_yandex_config,
             #     use_tyk=self.config.tyk_yandex_config.use_tyk,
+            #     http_client=self.http_pool.client,
+            #     circuit_breaker_config=self.config.circuit_breaker,
             # )
 
             ## todo: local
@@ -96,23 +180,136 @@ class DependencyContainer:
                 folder_id=os.environ["YC_FOLDER_ID"],
                 model="yandexgpt-lite",
                 url="https://llm.api.cloud.yandex.net/foundationModels/v1/completion",
+                http_client=self.http_pool.client,
+                stream=self.config.rnd_yandex_config.stream,
             )
             ## ollama
-            # self._llm = LocalAsyncOllamaLLM(model="mistral")
+            # self._llm = LocalAsyncOllamaLLM(model="mistral", http_client=self.http_pool.client)
             ## todo: local end
             logger.info("✅ LLM инициализирован")
         return self._llm
 
+    @property
+    def fallback_llm(self) -> AsyncLLM | None:
+        """Запасной бэкенд LLM на время разомкнутой цепи основного (None, если не задан)."""
+        breaker_config = self.config.circuit_breaker
+        if self._fallback_llm is None and breaker_config.enabled and breaker_config.fallback_backend:
+            use_tyk = breaker_config.fallback_backend == "tyk"
+            if use_tyk == self.config.tyk_yandex_config.use_tyk:
+                logger.warning(
+                    f"⚠️ CIRCUIT_BREAKER__FALLBACK_BACKEND={breaker_config.fallback_backend} совпадает "
+                    "с основным бэкендом — запасной бэкенд не используется",
+                )
+                return None
+            self._fallback_llm = AsyncLLM(
+                epa_token_config=self.config.epa_token,
+                tyk_yandex_config=self.config.tyk_yandex_config,
+                rnd_token_manager_config=self.config.rnd_token_manager_config,
+                rnd_yandex_config=self.config.rnd_yandex_config,
+                use_tyk=use_tyk,
+                http_client=self.http_pool.client,
+                circuit_breaker_config=breaker_config,
+            )
+            logger.info(f"✅ Запасной бэкенд LLM: {breaker_config.fallback_backend}")
+        return self._fallback_llm
+
+    def _llm_with_fallback(self) -> AsyncLLMProtocol:
+        fallback = self.fallback_llm
+        if fallback is None:
+            return self.llm
+        return FallbackLLM(self.llm, fallback)
+
+    @property
+    def response_cache(self) -> SemanticResponseCache | None:
+        """Кэш готовых ответов RAG (None, если выключен)."""
+        cache_config = self.config.response_cache
+        if cache_config.enabled and self._response_cache is None:
+            logger.info("🔧 Инициализация кэша ответов...")
+            if cache_config.redis_url:
+                self._cache_redis = self._create_redis(
+                    cache_config.redis_url,
+                    cache_config.redis_password,
+                    cache_config.ttl_seconds,
+                )
+            self._response_cache = SemanticResponseCache(
+                config=cache_config,
+                redis=self._cache_redis,
+                embeddings=self.embeddings if cache_config.semantic_enabled else None,
+            )
+            logger.info(
+                f"✅ Кэш ответов готов: redis={bool(self._cache_redis)}, semantic={cache_config.semantic_enabled}",
+            )
+        return self._response_cache
+
+    @property
+    def memo_backend(self) -> MemoBackend | None:
+        """Хранилище мемоизации вызовов LLM (None, если выключено)."""
+        memo_config = self.config.llm_memo
+        if memo_config.enabled and self._memo_backend is None:
+            if memo_config.backend == "redis":
+                if not memo_config.redis_url:
+                    raise ValueError("LLM_MEMO__REDIS_URL обязателен для LLM_MEMO__BACKEND=redis")
+                self._memo_redis = self._create_redis(
+                    memo_config.redis_url,
+                    memo_config.redis_password,
+                    memo_config.ttl_seconds,
+                )
+                self._memo_backend = RedisMemoBackend(self._memo_redis, key_prefix=memo_config.key_prefix)
+            else:
+                self._memo_backend = InMemoryMemoBackend(
+                    max_size=memo_config.max_size,
+                    ttl_seconds=memo_config.ttl_seconds,
+                )
+            logger.info(f"✅ Мемоизация LLM включена: backend={memo_config.backend}")
+        return self._memo_backend
+
+    @property
+    def llm_limiter(self) -> LLMLimiter | None:
+        """Общий лимитер вызовов LLM (None, если выключен)."""
+        if self._llm_limiter is None and self.config.llm_limiter.enabled:
+            self._llm_limiter = LLMLimiter(self.config.llm_limiter)
+            logger.info(f"✅ Лимитер LLM включён: concurrency={self._llm_limiter.concurrency.limit}")
+        return self._llm_limiter
+
+    @property
+    def llm_router(self) -> LLMRouter | None:
+        """Роутер вызовов LLM между бэкендами по узлам графа (None, если выключен)."""
+        router_config = self.config.llm_router
+        if self._llm_router is None and router_config.enabled:
+            backends: dict[str, AsyncLLMProtocol] = {}
+            for name in router_config.backends:
+                if name == "primary":
+                    backends[name] = self._llm_with_fallback()
+                else:
+                    backends[name] = LocalAsyncOllamaLLM(
+                        model=router_config.ollama_model,
+                        base_url=router_config.ollama_url,
+                        temperature=router_config.ollama_temperature,
+                        http_client=self.http_pool.client,
+                    )
+            self._llm_router = LLMRouter(backends, router_config)
+            logger.info(f"✅ Роутер LLM включён: backends={list(backends)}, policy={router_config.node_backends}")
+        return self._llm_router
+
+    @staticmethod
+    def _create_redis(url: str, password: str, expiration: int) -> AsyncRedisClient:
+        return AsyncRedisClient(RedisConfig(url=url, password=password, expiration=expiration, use_async=True))
+
     @property
     def graph_builder(self) -> RAGGraphBuilder:
         """Возвращает RAGGraphBuilder для доступа к методам build, get_image_graph и т.д."""
         if self._graph_builder is None:
             logger.info("🔧 Создание RAGGraphBuilder...")
             self._graph_builder = RAGGraphBuilder(
-                async_llm=self.llm,
+                async_llm=self._llm_with_fallback(),
                 rag_config=self.config.rag,
-                # opensearch=self.opensearch,
-                # embedding_model=self.embeddings,
+                memo_backend=self.memo_backend,
+                memo_config=self.config.llm_memo,
+                search_engine=self.search_engine,
+                reranker_scorer=self.reranker_scorer,
+                llm_limiter=self.llm_limiter,
+                hedging_config=self.config.llm_hedging,
+                llm_router=self.llm_router,
             )
             logger.info("✅ RAGGraphBuilder создан")
         return self._graph_builder
@@ -124,7 +321,7 @@ class DependencyContainer:
             logger.info("🔧 Сборка RAG графа...")
             # builder для получения скомпилированного графа
             compiled_graph = self.graph_builder.build()
-            self._pipeline = RAGPipeline(graph=compiled_graph)
+            self._pipeline = RAGPipeline(graph=compiled_graph, response_cache=self.response_cache)
             logger.info("✅ RAG граф собран")
         return self._pipeline
 
@@ -139,11 +336,63 @@ class DependencyContainer:
 
     # -------- ПУБЛИЧНЫЕ МЕТОДЫ --------
 
+    @property
+    def ready(self) -> bool:
+        """Сервис инициализирован (и прогрет, если прогрев включён) и ещё не закрывается."""
+        return self._ready
+
     async def init_async(self) -> None:
         """Асинхронная инициализация ресурсов."""
         logger.info("🔧 Асинхронная инициализация ресурсов...")
-        # Пример: проверка соединения с LLM или VectorDB
         _ = self.service  # Принудительно инициализировать весь граф
+        warmup_config = self.config.warmup
+        if warmup_config.enabled:
+            try:
+                await asyncio.wait_for(self.warmup(), timeout=warmup_config.timeout_seconds)
+            except TimeoutError:
+                logger.warning(
+                    f"⚠️ Прогрев не уложился в {warmup_config.timeout_seconds} с, сервис стартует непрогретым",
+                )
+        self._ready = True
+
+    async def warmup(self) -> None:
+        """
+        Прогрев до приёма трафика: первый запрос не платит за ленивую загрузку.
+
+        Загружает модели (эмбеддинги, реранкер) с пробным forward pass, получает токен LLM,
+        открывает соединения с Redis/OpenSearch и прогоняет синтетический запрос через граф
+        (без записи в кэш ответов). Ошибка шага логируется и не мешает старту.
+        """
+        logger.info("🔥 Прогрев сервиса...")
+        started = time.perf_counter()
+        query = self.config.warmup.query
+        if self._model_embeddings is not None:
+            await self._warmup_step("модель эмбеддингов", self._model_embeddings.aembed_query(query))
+        if self._reranker_scorer is not None:
+            await self._warmup_step("модель реранкера", self._reranker_scorer.score(query, [query]))
+
+        token_manager = getattr(self.llm, "token_manager", None)
+        if token_manager is not None:
+            await self._warmup_step("токен LLM", token_manager.id_token)  # async-свойство
+        for name, redis_client in (("кэша ответов", self._cache_redis), ("мемоизации LLM", self._memo_redis)):
+            if redis_client is not None:
+                await self._warmup_step(f"Redis {name}", redis_client.ping())
+        if self._opensearch is not None:
+            await self._warmup_step("OpenSearch", self._opensearch.async_client.ping())
+
+        if self.config.warmup.run_graph:
+            await self._warmup_step("RAG граф", self.pipeline.query(query, use_cache=False))
+        logger.info(f"✅ Прогрев завершён за {time.perf_counter() - started:.2f} с")
+
+    @staticmethod
+    async def _warmup_step(name: str, step: Awaitable[object]) -> None:
+        started = time.perf_counter()
+        try:
+            await step
+        except Exception as e:
+            logger.warning(f"⚠️ Прогрев: {name} — ошибка {e!r}")
+            return
+        logger.info(f"🔥 Прогрев: {name} — {time.perf_counter() - started:.2f} с")
 
     def build_service(self) -> RagService:
         """Возвращает готовый RagService."""
@@ -152,10 +401,35 @@ class DependencyContainer:
     async def aclose(self) -> None:
         """Закрытие ресурсов."""
         logger.info("🔻 Закрытие ресурсов контейнера...")
+        self._ready = False
         # Если есть клиенты сессий (aiohttp), закрываем их здесь
-        # if self._opensearch is not None:
-        #     try:
-        #         await self._opensearch.async_client.close()
-        #         logger.info("✅ OpenSearch async_client закрыт")
-        #     except Exception as e:
-        #         logger.warning(f"⚠️ Ошибка при закрытии OpenSearch client: {e}")
+        if self._opensearch is not None:
+            try:
+                await self._opensearch.async_client.close()
+                logger.info("✅ OpenSearch async_client закрыт")
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка при закрытии OpenSearch client: {e}")
+        for llm in (self._llm, self._fallback_llm):
+            token_manager = getattr(llm, "token_manager", None)
+            if token_manager is not None:
+                await token_manager.aclose()
+        if self._reranker_scorer is not None:
+            self._reranker_scorer.close()
+        if self._async_embedding is not None:
+            self._async_embedding.close()
+        if isinstance(self._embeddings, CachedEmbeddings) and self._embeddings.store is not None:
+            # дописываем очередь дискового кэша эмбеддингов, не блокируя event loop
+            await asyncio.to_thread(self._embeddings.store.close)
+        for name, redis_client in (("кэша ответов", self._cache_redis), ("мемоизации LLM", self._memo_redis)):
+            if redis_client is None:
+                continue
+            try:
+                await redis_client.aclose()
+                logger.info(f"✅ Redis клиент {name} закрыт")
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка при закрытии Redis клиента {name}: {e}")
+        if self._http_pool is not None:
+            try:
+                await self._http_pool.aclose()
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка при закрытии HTTP пула: {e}")
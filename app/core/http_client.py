@@ -0,0 +1,155 @@
+import asyncio
+import importlib.util
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+
+from app.core.config import HTTPClientConfig
+
+logger = logging.getLogger(__name__)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Тело ответа, освобождающее слот хоста только после закрытия ответа (важно для stream-запросов)."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]) -> None:
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class _PerHostLimitTransport(httpx.AsyncBaseTransport):
+    """
+    Обёртка над транспортом httpx, ограничивающая число одновременных запросов к одному хосту.
+
+    httpx.Limits ограничивает пул целиком, а не отдельный upstream: без этого один медленный
+    бэкенд (например TYK) может занять все соединения пула и заблокировать остальные LLM.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int) -> None:
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: dict[tuple[str, str, int | None], asyncio.Semaphore] = {}
+
+    def _semaphore(self, url: httpx.URL) -> asyncio.Semaphore:
+        key = (url.scheme, url.host, url.port)
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(self._max_per_host)
+        return self._semaphores[key]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        semaphore = self._semaphore(request.url)
+        await semaphore.acquire()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                semaphore.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        if isinstance(response.stream, httpx.ByteStream):
+            # Тело уже целиком в памяти — соединение свободно
+            release()
+            return response
+
+        response.stream = _ReleasingStream(response.stream, release)  # type: ignore[arg-type]
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class HTTPClientPool:
+    """
+    Общий пул HTTP-соединений процесса для всех LLM-клиентов.
+
+    Держит один httpx.AsyncClient с keep-alive (и HTTP/2, если установлен h2),
+    чтобы каждый вызов LLM не открывал новое TCP+TLS соединение.
+    Жизненным циклом управляет DependencyContainer (закрывается в aclose()).
+    """
+
+    def __init__(self, config: HTTPClientConfig) -> None:
+        self.config = config
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Ленивая инициализация общего клиента."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        http2 = self.config.http2 and self._h2_available()
+        limits = httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+            verify=self.config.verify,
+            http2=http2,
+            limits=limits,
+            retries=self.config.connect_retries,
+        )
+        if self.config.max_connections_per_host:
+            transport = _PerHostLimitTransport(transport, max_per_host=self.config.max_connections_per_host)
+
+        logger.info(
+            f"🔧 HTTP пул создан: http2={http2}, max_connections={self.config.max_connections}, "
+            f"keepalive={self.config.max_keepalive_connections}, per_host={self.config.max_connections_per_host}",
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(self.config.timeout, connect=self.config.connect_timeout),
+        )
+
+    @staticmethod
+    def _h2_available() -> bool:
+        """HTTP/2 требует пакет h2 (httpx[http2]); без него работаем по HTTP/1.1."""
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("⚠️ Пакет h2 не установлен — HTTP/2 отключён, используется HTTP/1.1")
+            return False
+        return True
+
+    async def aclose(self) -> None:
+        """Закрывает все соединения пула."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("✅ HTTP пул закрыт")
+        self._client = None
+
+
+@asynccontextmanager
+async def use_client(client: httpx.AsyncClient | None, **kwargs: Any) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Отдаёт общий клиент пула, если он передан, иначе создаёт временный клиент на один запрос.
+
+    :param client: общий клиент из HTTPClientPool (не закрывается здесь)
+    :param kwargs: параметры временного httpx.AsyncClient (verify, timeout, ...)
+    """
+    if client is not None:
+        yield client
+        return
+
+    async with httpx.AsyncClient(**kwargs) as temporary_client:
+        yield temporary_client
@@ -0,0 +1,129 @@
+import asyncio
+from collections.abc import Awaitable
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from aiokafka.structs import RecordMetadata  # type: ignore[import-untyped]
+
+from app.core.logger import get_logger
+from app.services.prometheus_service import prometheus_service
+
+logger = get_logger(__name__)
+
+
+class _Publisher(Protocol):
+    """Подмножество KafkaBroker.publish, которым пользуется BatchingPublisher."""
+
+    def publish(
+        self,
+        message: Any,
+        topic: str = ...,
+        *,
+        key: bytes | Any | None = ...,
+        headers: dict[str, str] | None = ...,
+        no_confirm: bool = ...,
+    ) -> Awaitable[Any]: ...
+
+
+@dataclass(slots=True)
+class _PendingMessage:
+    message: Any
+    headers: dict[str, str] | None
+    key: bytes | None
+    future: "asyncio.Future[RecordMetadata]" = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class BatchingPublisher:
+    """
+    Пакетная публикация в один топик.
+
+    - Сообщения копятся в буфере и сбрасываются по linger_ms (от первого сообщения) или по batch_size;
+    - батч уходит в producer без ожидания подтверждений (no_confirm), подтверждения ждутся разом;
+    - publish() возвращает future доставки конкретного сообщения — хендлер ждёт его,
+      поэтому offset входного сообщения коммитится только после доставки результата;
+    - порядок отправки сохраняется (батчи отправляются строго последовательно).
+    """
+
+    def __init__(self, broker: _Publisher, topic: str, linger_ms: int, batch_size: int) -> None:
+        self.broker = broker
+        self.topic = topic
+        self.linger = linger_ms / 1000
+        self.batch_size = batch_size
+        self._buffer: list[_PendingMessage] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._send_lock = asyncio.Lock()
+        self._flushes: set[asyncio.Task[None]] = set()
+
+    async def publish(
+        self,
+        message: Any,
+        headers: dict[str, str] | None = None,
+        key: bytes | None = None,
+    ) -> "asyncio.Future[RecordMetadata]":
+        """Ставит сообщение в батч; возвращает future с RecordMetadata после подтверждения брокером."""
+        pending = _PendingMessage(message=message, headers=headers, key=key)
+        self._buffer.append(pending)
+
+        if len(self._buffer) >= self.batch_size:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.linger, self._schedule_flush)
+        return pending.future
+
+    def _schedule_flush(self) -> None:
+        task = asyncio.create_task(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self) -> None:
+        """Отправляет накопленный батч и разрешает future-ы сообщений по результатам доставки."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+
+        sent: list[tuple[_PendingMessage, asyncio.Future[RecordMetadata]]] = []
+        async with self._send_lock:
+            for pending in batch:
+                try:
+                    delivery = await self.broker.publish(
+                        pending.message,
+                        topic=self.topic,
+                        headers=pending.headers,
+                        key=pending.key,
+                        no_confirm=True,
+                    )
+                except Exception as e:
+                    self._resolve(pending, error=e)
+                    continue
+                sent.append((pending, delivery))
+        prometheus_service.record_publish_batch_size(len(batch), destination=self.topic)
+        logger.debug(f"📦 Батч из {len(batch)} сообщений отправлен в {self.topic}")
+
+        for pending, delivery in sent:
+            try:
+                self._resolve(pending, result=await delivery)
+            except Exception as e:
+                self._resolve(pending, error=e)
+
+    @staticmethod
+    def _resolve(
+        pending: _PendingMessage,
+        result: RecordMetadata | None = None,
+        error: Exception | None = None,
+    ) -> None:
+        # ожидающий хендлер мог быть отменён — future уже закрыт
+        if pending.future.done():
+            return
+        if error is not None:
+            pending.future.set_exception(error)
+        else:
+            pending.future.set_result(result)
+
+    async def close(self) -> None:
+        """Сбрасывает остаток буфера и ждёт подтверждения всех отправленных батчей."""
+        await self.flush()
+        if self._flushes:
+            await asyncio.wait(set(self._flushes))
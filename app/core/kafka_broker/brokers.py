@@ -1,13 +1,19 @@
+from typing import Any
+
+from faststream import AckPolicy
 from faststream.kafka import KafkaBroker
 from faststream.kafka.prometheus import KafkaPrometheusMiddleware
 
 from app.core.config import CONFIG
+from app.core.kafka_broker.batching_publisher import BatchingPublisher
+from app.core.kafka_broker.dispatcher import KeyOrderedDispatcher
 from app.core.kafka_broker.middlewares import (
     AutoPublishMiddleware,
     PrometheusMiddleware,
     RequestContextMiddleware,
     exc_middleware,
 )
+from app.core.kafka_broker.middlewares.error_middleware import error_handler
 from app.core.kafka_broker.utils.ssl_config import ssl_and_update_broker_kwargs
 from app.core.logger import get_logger
 from app.services.prometheus_service import prometheus_service
@@ -19,10 +25,34 @@ registry = prometheus_service.registry
 kafka_prometheus_middleware = KafkaPrometheusMiddleware(registry=registry)
 
 
+# Конкурентная обработка с порядком по ключу (READ_KAFKA__CONCURRENT_DISPATCH)
+dispatcher: KeyOrderedDispatcher | None = None
+if CONFIG.read_kafka.concurrent_dispatch:
+    dispatcher = KeyOrderedDispatcher(
+        max_in_flight_per_partition=CONFIG.read_kafka.max_in_flight_per_partition,
+        max_in_flight_total=CONFIG.read_kafka.max_in_flight_total,
+        on_error=error_handler,
+    )
+
+
+def subscriber_concurrency_kwargs() -> dict[str, Any]:
+    """
+    Параметры конкурентности для broker.subscriber.
+
+    С диспетчером: один consumer-цикл и ручной коммит (коммитит диспетчер),
+    иначе — встроенные воркеры FastStream (max_workers).
+    """
+    if dispatcher is not None:
+        return {"max_workers": 1, "ack_policy": AckPolicy.MANUAL}
+    return {"max_workers": CONFIG.read_kafka.max_workers}
+
+
 broker = KafkaBroker(
     CONFIG.read_kafka.bootstrap_servers,
     logger=logger,
     middlewares=[
+        # 0. Диспетчер (если включён) — самый внешний: отпускает consumer-цикл сразу
+        *([dispatcher.middleware] if dispatcher is not None else []),
         # 1.  # кастомный middleware
         PrometheusMiddleware,
         # 2. # KafkaPrometheusMiddleware для готового дашборда # опционально
@@ -34,5 +64,34 @@ broker = KafkaBroker(
         # 5. Global Error Handler
         exc_middleware,
     ],
-    **ssl_and_update_broker_kwargs(),
+    **{
+        # параметры producer-а: размер батча в байтах и сжатие
+        "max_batch_size": CONFIG.write_kafka.max_batch_bytes,
+        "compression_type": CONFIG.write_kafka.compression_type,
+        **ssl_and_update_broker_kwargs(),
+    },
 )
+
+# Пакетная публикация в topic_out (WRITE_KAFKA__BATCH_PUBLISH)
+batching_publisher: BatchingPublisher | None = None
+if CONFIG.write_kafka.batch_publish:
+    batching_publisher = BatchingPublisher(
+        broker,
+        topic=CONFIG.write_kafka.topic_out,
+        linger_ms=CONFIG.write_kafka.linger_ms,
+        batch_size=CONFIG.write_kafka.batch_size,
+    )
+
+
+async def publish_out(message: Any, headers: dict[str, str], key: bytes | None) -> None:
+    """
+    Публикует сообщение в topic_out и возвращает управление после подтверждения доставки.
+
+    С batching_publisher сообщение уходит в общем батче; ожидание подтверждения сохраняется,
+    чтобы offset входного сообщения коммитился только после доставки ответа.
+    """
+    if batching_publisher is None:
+        await broker.publish(message=message, topic=CONFIG.write_kafka.topic_out, headers=headers, key=key)
+        return
+    delivery = await batching_publisher.publish(message, headers=headers, key=key)
+    await delivery
@@ -0,0 +1,219 @@
+import asyncio
+import functools
+import inspect
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from aiokafka import TopicPartition  # type: ignore[import-untyped]
+from faststream import BaseMiddleware, PublishCommand, StreamMessage
+
+from app.core.logger import get_logger
+
+if TYPE_CHECKING:
+    from faststream._internal.context.repository import ContextRepo
+
+logger = get_logger(__name__)
+
+
+class PartitionOffsetTracker:
+    """
+    Учёт обрабатываемых offset-ов по партициям.
+
+    Сообщения завершаются не по порядку, а коммитить можно только непрерывный префикс:
+    позиция коммита = наименьший ещё не завершённый offset (или последний завершённый + 1).
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[TopicPartition, deque[int]] = {}
+        self._done: dict[TopicPartition, set[int]] = {}
+
+    def register(self, tp: TopicPartition, offset: int) -> None:
+        pending = self._pending.setdefault(tp, deque())
+        done = self._done.setdefault(tp, set())
+        if pending and offset <= pending[-1]:
+            # повторная доставка после ребаланса/seek — старое состояние партиции неактуально
+            logger.warning(f"⚠️ Offset {offset} <= {pending[-1]} в {tp}: сброс состояния партиции")
+            pending.clear()
+            done.clear()
+        pending.append(offset)
+
+    def complete(self, tp: TopicPartition, offset: int) -> int | None:
+        """Отмечает offset завершённым; возвращает новую позицию коммита, если она сдвинулась."""
+        pending = self._pending.get(tp)
+        if not pending or offset < pending[0]:
+            # offset из состояния до сброса партиции
+            return None
+        done = self._done[tp]
+        done.add(offset)
+
+        commit_position: int | None = None
+        while pending and pending[0] in done:
+            head = pending.popleft()
+            done.discard(head)
+            commit_position = head + 1
+        return commit_position
+
+    def in_flight(self, tp: TopicPartition) -> int:
+        return len(self._pending.get(tp, ())) - len(self._done.get(tp, ()))
+
+
+class KeyOrderedDispatcher:
+    """
+    Конкурентная обработка Kafka-сообщений с сохранением порядка по ключу.
+
+    - сообщения с одинаковым key обрабатываются строго по очереди, с разными — параллельно;
+    - не больше max_in_flight_per_partition сообщений на партицию (партиция ставится на pause);
+    - не больше max_in_flight_total сообщений в памяти всего (consumer-цикл ждёт);
+    - offset коммитится только до наименьшего незавершённого (at-least-once).
+
+    Работает как самый внешний middleware подписчика с max_workers=1 и AckPolicy.MANUAL:
+    consume_scope ставит обработку в фоновую задачу и сразу возвращает управление consumer-циклу.
+    """
+
+    def __init__(
+        self,
+        max_in_flight_per_partition: int,
+        max_in_flight_total: int,
+        on_error: Callable[[Exception], Awaitable[Any] | Any] | None = None,
+    ) -> None:
+        """
+        :param on_error: обработчик исключений, вылетевших из call_next в фоновой задаче (sync или async).
+            Ошибки хендлера ловит ExceptionMiddleware (самый внутренний middleware, работает внутри call_next);
+            сюда доходят только исключения внешних middleware (Prometheus, RequestContext, AutoPublish).
+        """
+        self.max_in_flight_per_partition = max_in_flight_per_partition
+        self.on_error = on_error
+        self.tracker = PartitionOffsetTracker()
+        self._total = asyncio.Semaphore(max_in_flight_total)
+        self._key_tails: dict[bytes, asyncio.Task[None]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._paused: set[TopicPartition] = set()
+        self._consumer: Any = None
+
+    @property
+    def middleware(self) -> Callable[..., BaseMiddleware]:
+        """Фабрика middleware для KafkaBroker(middlewares=[...]) — ставить первой в списке."""
+        return functools.partial(_DispatchMiddleware, dispatcher=self)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def dispatch(
+        self,
+        call_next: Callable[[StreamMessage[Any]], Awaitable[Any]],
+        msg: StreamMessage[Any],
+    ) -> None:
+        raw = msg.raw_message
+        consumer = getattr(msg, "consumer", None)
+        tp = TopicPartition(raw.topic, raw.partition)
+
+        await self._total.acquire()
+        self._consumer = consumer
+        self.tracker.register(tp, raw.offset)
+        # без consumer (тестовый брокер, другие транспорты) партицию не приостановить —
+        # ограничение только общим семафором max_in_flight_total
+        if (
+            consumer is not None
+            and self.tracker.in_flight(tp) >= self.max_in_flight_per_partition
+            and tp not in self._paused
+        ):
+            consumer.pause(tp)
+            self._paused.add(tp)
+
+        key: bytes | None = raw.key
+        previous = self._key_tails.get(key) if key is not None else None
+        task = asyncio.create_task(self._process(call_next, msg, tp, raw.offset, previous, consumer))
+        if key is not None:
+            self._key_tails[key] = task
+            task.add_done_callback(functools.partial(self._release_key, key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(
+        self,
+        call_next: Callable[[StreamMessage[Any]], Awaitable[Any]],
+        msg: StreamMessage[Any],
+        tp: TopicPartition,
+        offset: int,
+        previous: asyncio.Task[None] | None,
+        consumer: Any,
+    ) -> None:
+        try:
+            if previous is not None:
+                # строгий порядок по ключу: ждём предыдущее сообщение (его ошибки нас не касаются)
+                await asyncio.wait({previous})
+            try:
+                await call_next(msg)
+            except Exception as e:
+                if self.on_error is None:
+                    logger.exception(f"❌ Ошибка обработки сообщения {tp.topic}[{tp.partition}]@{offset}")
+                else:
+                    result = self.on_error(e)
+                    if inspect.isawaitable(result):
+                        await result
+        finally:
+            self._total.release()
+            commit_position = self.tracker.complete(tp, offset)
+            if tp in self._paused and self.tracker.in_flight(tp) < self.max_in_flight_per_partition:
+                consumer.resume(tp)
+                self._paused.discard(tp)
+            if commit_position is not None and consumer is not None:
+                await self._commit(consumer, tp, commit_position)
+
+    @staticmethod
+    async def _commit(consumer: Any, tp: TopicPartition, position: int) -> None:
+        try:
+            await consumer.commit({tp: position})
+        except Exception as e:
+            # например, партиция отобрана при ребалансе — сообщения будут переобработаны новым владельцем
+            logger.warning(f"⚠️ Не удалось закоммитить {tp.topic}[{tp.partition}]@{position}: {e!r}")
+
+    def _release_key(self, key: bytes, task: asyncio.Task[None]) -> None:
+        if self._key_tails.get(key) is task:
+            del self._key_tails[key]
+
+    async def drain(self, timeout: float) -> None:
+        """Останавливает приём (pause всех партиций) и ждёт завершения обрабатываемых сообщений."""
+        if self._consumer is not None:
+            try:
+                self._consumer.pause(*self._consumer.assignment())
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось поставить партиции на паузу: {e!r}")
+
+        if not self._tasks:
+            return
+        logger.info(f"⏳ Ожидание завершения {len(self._tasks)} сообщений в обработке...")
+        _, not_done = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if not_done:
+            logger.warning(f"⚠️ {len(not_done)} сообщений не завершены за {timeout}с — будут переобработаны")
+        else:
+            logger.info("✅ Все сообщения в обработке завершены")
+
+
+class _DispatchMiddleware(BaseMiddleware):  # type: ignore[misc]
+    """Middleware-обёртка над KeyOrderedDispatcher (экземпляр создаётся FastStream на каждое сообщение)."""
+
+    def __init__(self, msg: Any, *, context: "ContextRepo", dispatcher: KeyOrderedDispatcher) -> None:
+        super().__init__(msg, context=context)
+        self.dispatcher = dispatcher
+
+    async def consume_scope(
+        self,
+        call_next: Callable[[StreamMessage[Any]], Awaitable[Any]],
+        msg: StreamMessage[Any],
+    ) -> Any:
+        # батчи и сообщения без consumer (тестовый брокер) — обычная последовательная обработка
+        if isinstance(msg.raw_message, tuple) or not hasattr(getattr(msg, "consumer", None), "pause"):
+            return await call_next(msg)
+
+        await self.dispatcher.dispatch(call_next, msg)
+        return None
+
+    async def publish_scope(
+        self,
+        call_next: Callable[[PublishCommand], Awaitable[Any]],
+        cmd: PublishCommand,
+    ) -> Any:
+        return await call_next(cmd)
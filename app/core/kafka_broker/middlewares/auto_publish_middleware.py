@@ -1,3 +1,4 @@
+import logging
 import time
 from collections.abc import Awaitable, Callable
 from typing import Any
@@ -6,10 +7,10 @@ from faststream import BaseMiddleware, PublishCommand, StreamMessage
 
 from app.core.config import CONFIG
 from app.core.kafka_broker.schemas import HeadersTopikOut
-from app.core.logger import get_logger
+from app.core.logger import get_lazy_logger
 from app.core.logger.context_storage import message_headers, message_key, reset_request_context
 
-logger = get_logger(__name__)
+logger = get_lazy_logger(__name__)
 
 
 class AutoPublishMiddleware(BaseMiddleware):  # type: ignore[misc]
@@ -43,11 +44,11 @@ class AutoPublishMiddleware(BaseMiddleware):  # type: ignore[misc]
 
             if result is not None:
                 try:
-                    await self._publish_result(result)
+                    await self.publish_result(result)
                     publish_success = True
                 except Exception as e:  # noqa: PERF203
                     publish_error = e
-                    logger.error(f"❌ Ошибка публикации результата: {e}", exc_info=True)
+                    logger.error("❌ Ошибка публикации результата: %s", e, exc_info=True)
 
             return result
         except Exception as e:  # noqa: PERF203
@@ -56,36 +57,33 @@ class AutoPublishMiddleware(BaseMiddleware):  # type: ignore[misc]
         finally:
             elapsed = time.perf_counter() - started_at
             r = msg.raw_message
-            partition = r.partition
-            offset = r.offset
 
             if processing_error:
-                logger.error(
-                    f"❌ Ошибка обработки: {processing_error} | topic={CONFIG.write_kafka.topic_out} | partition={partition} | offset={offset} | время:⏱️ {elapsed:.3f}с",  # noqa: E501
-                )
+                level, text = logging.ERROR, f"❌ Ошибка обработки: {processing_error}"
             elif result is None:
-                logger.info(
-                    f"ℹ️ Пустой результат | topic={CONFIG.write_kafka.topic_out} | partition={partition} | offset={offset} | время:⏱️ {elapsed:.3f}с",  # noqa: E501
-                )
+                level, text = logging.INFO, "ℹ️ Пустой результат"
             elif publish_success:
-                logger.info(
-                    f"✅ Результат опубликован | topic={CONFIG.write_kafka.topic_out} | partition={partition} | offset={offset} | время:⏱️ {elapsed:.3f}с",  # noqa: E501
-                )
+                level, text = logging.INFO, "✅ Результат опубликован"
             elif publish_error:
-                logger.error(
-                    f"❌ Ошибка публикации: {publish_error} | topic={CONFIG.write_kafka.topic_out} | partition={partition} | offset={offset} | время:⏱️ {elapsed:.3f}с",  # noqa: E501
-                )
+                level, text = logging.ERROR, f"❌ Ошибка публикации: {publish_error}"
             else:
-                logger.warning(
-                    f"⚠️ Неожиданное состояние AutoPublishMiddleware | topic={CONFIG.write_kafka.topic_out} | partition={partition} | offset={offset} | время:⏱️ {elapsed:.3f}с",  # noqa: E501
-                )
+                level, text = logging.WARNING, "⚠️ Неожиданное состояние AutoPublishMiddleware"
+            logger.event(
+                level,
+                text,
+                topic=CONFIG.write_kafka.topic_out,
+                partition=r.partition,
+                offset=r.offset,
+                duration=elapsed,
+            )
             # при успехе сбрасываем, при ошибке сбрасывается в exc
             if not processing_error:
                 reset_request_context()
 
     @staticmethod
-    async def _publish_result(result: Any) -> None:
-        from app.core.kafka_broker.brokers import broker
+    async def publish_result(result: Any) -> None:
+        """Публикует результат в topic_out с key/headers текущего сообщения (также для частичных ответов)."""
+        from app.core.kafka_broker.brokers import publish_out
 
         message_data = result.model_dump(exclude_none=True) if hasattr(result, "model_dump") else result
 
@@ -97,18 +95,18 @@ class AutoPublishMiddleware(BaseMiddleware):  # type: ignore[misc]
 
         key = message_key.get()
 
-        logger.info(
-            f"📤Отправка сообщения в топик: {CONFIG.write_kafka.topic_out} | "
-            f"message: {message_data} | headers: {new_headers} | key: {key!r}",
-        )
-
-        await broker.publish(
-            message=message_data,
+        # тело сообщения — выборочно и лениво (LOG_PAYLOAD__*)
+        logger.event(
+            logging.INFO,
+            "📤 Отправка сообщения в топик",
             topic=CONFIG.write_kafka.topic_out,
             headers=new_headers,
-            key=key,
+            key=repr(key),
+            payload=message_data,
         )
 
+        await publish_out(message_data, headers=new_headers, key=key)
+
     async def publish_scope(
         self,
         call_next: Callable[[PublishCommand], Awaitable[Any]],
@@ -17,7 +17,7 @@ async def error_handler(exc: Exception) -> None:
     """
     Ловит исключения, логирует и публикует сообщение об ошибке с корректными headers и key.
     """
-    from app.core.kafka_broker.brokers import broker
+    from app.core.kafka_broker.brokers import publish_out
 
     logger.error(f"🚨 Обработано исключение: {repr(exc)}")
     logger.error(f"🚨 Тип исключения: {type(exc).__name__}")
@@ -74,12 +74,7 @@ async def error_handler(exc: Exception) -> None:
             f"message: {error_msg} | headers: {new_headers} | key: {key!r}",
         )
 
-        await broker.publish(
-            topic=CONFIG.write_kafka.topic_out,
-            message=error_msg,
-            headers=new_headers,
-            key=key,
-        )
+        await publish_out(error_msg, headers=new_headers, key=key)
 
         logger.info("✅ ⚠️ Сообщение об ошибке опубликовано")
 
@@ -1,8 +1,9 @@
+import logging
 import sys
 import time
 from collections.abc import Awaitable, Callable
 from types import FrameType
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from faststream import BaseMiddleware, PublishCommand, StreamMessage
 
@@ -10,25 +11,30 @@ if TYPE_CHECKING:
     from faststream._internal.context.repository import ContextRepo
 
 from app.core.config import CONFIG
-from app.core.logger import get_logger
+from app.core.logger import get_lazy_logger
 from app.services.prometheus_service import prometheus_service
 
-logger = get_logger(__name__)
+logger = get_lazy_logger(__name__)
 
 
 class PrometheusMiddleware(BaseMiddleware):  # type: ignore[misc]
     """Мидлваре для сбора метрик Prometheus."""
 
+    # Имя обработчика по подписчику (id объекта подписчика FastStream): экземпляр middleware создаётся
+    # на каждое сообщение, поэтому имя определяется один раз на подписчика, а не на каждое сообщение
+    _handler_names: ClassVar[dict[int, str]] = {}
+
     def __init__(self, msg: Any, *, context: "ContextRepo") -> None:
         """Инициализация мидлваре."""
         super().__init__(msg, context=context)
         self._processing_start_time: float | None = None
 
+        # экземпляр создаётся на каждое сообщение — не засоряем INFO
         if not CONFIG.prometheus.enabled:
-            logger.info("Мидлваре Prometheus отключено в конфигурации")
+            logger.debug("Мидлваре Prometheus отключено в конфигурации")
             return
 
-        logger.info("Мидлваре Prometheus инициализировано")
+        logger.debug("Мидлваре Prometheus инициализировано")
 
     async def on_receive(self) -> Any:
         if not CONFIG.prometheus.enabled:
@@ -41,7 +47,7 @@ class PrometheusMiddleware(BaseMiddleware):  # type: ignore[misc]
         if message_size > 0:
             prometheus_service.record_message_size(size=message_size, handler=handler_name)
 
-        logger.info(f"Получено сообщение - обработчик={handler_name}, размер={message_size} байт")
+        logger.event(logging.INFO, "Получено сообщение", handler=handler_name, size_bytes=message_size)
         return await super().on_receive()
 
     async def consume_scope(
@@ -59,14 +65,14 @@ class PrometheusMiddleware(BaseMiddleware):  # type: ignore[misc]
         try:
             result = await call_next(msg)
             prometheus_service.increment_processed_messages(handler=handler_name, status="success")
-            logger.info(f"Сообщение успешно обработано - обработчик={handler_name}")
+            logger.event(logging.INFO, "Сообщение успешно обработано", handler=handler_name)
             return result
 
         except Exception as e:
             exception_type = type(e).__name__
             prometheus_service.increment_processed_messages(handler=handler_name, status="error")
             prometheus_service.increment_processing_exceptions(handler=handler_name, exception_type=exception_type)
-            logger.info(f"Ошибка при обработке сообщения - обработчик={handler_name}, исключение={exception_type}")
+            logger.event(logging.INFO, "Ошибка при обработке сообщения", handler=handler_name, exception=exception_type)
             raise
 
         finally:
@@ -74,7 +80,7 @@ class PrometheusMiddleware(BaseMiddleware):  # type: ignore[misc]
             if self._processing_start_time is not None:
                 duration = time.time() - self._processing_start_time
                 prometheus_service.record_processing_duration(duration=duration, handler=handler_name)
-                logger.info(f"Длительность обработки сообщения - обработчик={handler_name}, время={duration:.3f}с")
+                logger.event(logging.INFO, "Длительность обработки сообщения", handler=handler_name, duration=duration)
 
     async def publish_scope(
         self,
@@ -90,41 +96,62 @@ class PrometheusMiddleware(BaseMiddleware):  # type: ignore[misc]
         try:
             result = await call_next(cmd)
             prometheus_service.increment_published_messages(destination=destination, status="success")
-            logger.info(f"Сообщение успешно опубликовано - направление={destination}")
+            logger.event(logging.INFO, "Сообщение успешно опубликовано", destination=destination)
             return result
 
         except Exception as e:
             exception_type = type(e).__name__
             prometheus_service.increment_published_messages(destination=destination, status="error")
             prometheus_service.increment_publish_exceptions(destination=destination, exception_type=exception_type)
-            logger.info(f"Ошибка при публикации сообщения - направление={destination}, исключение={exception_type}")
+            logger.event(
+                logging.INFO,
+                "Ошибка при публикации сообщения",
+                destination=destination,
+                exception=exception_type,
+            )
             raise
 
         finally:
             duration = time.time() - publish_start_time
             prometheus_service.record_publish_duration(duration=duration, destination=destination)
-            logger.info(f"Длительность публикации сообщения - направление={destination}, время={duration:.3f}с")
+            logger.event(logging.INFO, "Длительность публикации сообщения", destination=destination, duration=duration)
 
     def _get_handler_name(self) -> str:
-        """Получить имя обработчика из контекста."""
+        """Имя обработчика: из кэша по подписчику, при первом сообщении подписчика — определяется."""
+        subscriber = self.context.get_local("handler_", None) if hasattr(self.context, "get_local") else None
+        key = id(subscriber)
+        name = self._handler_names.get(key)
+        if name is None:
+            name = self._resolve_handler_name(subscriber)
+            self._handler_names[key] = name
+        return name
+
+    def _resolve_handler_name(self, subscriber: Any) -> str:
+        """Получить имя обработчика из подписчика или контекста (стек вызовов — крайний случай)."""
         try:
+            # Функции-обработчики подписчика FastStream (context "handler_")
+            names = [call.name for call in getattr(subscriber, "calls", ())]
+            if names:
+                logger.debug("Определен обработчик подписчика: %s", names)
+                return ",".join(names)
+
             # Пытаемся получить handler из контекста
             if hasattr(self.context, "get_local"):
                 handler_info = self.context.get_local("handler", None)
                 if handler_info and hasattr(handler_info, "__name__"):
-                    logger.info(f"Определен обработчик из контекста: {handler_info.__name__}")
+                    logger.debug("Определен обработчик из контекста: %s", handler_info.__name__)
                     return str(handler_info.__name__)
 
             # Альтернативный способ через стек вызовов
-            frame: FrameType | None = sys._getframe(1)
+            frame: FrameType | None = sys._getframe(2)  # пропускаем _get_handler_name
             while frame is not None:
                 if "handler" in frame.f_code.co_name or "process" in frame.f_code.co_name:
-                    logger.info(f"Определен обработчик через стек вызовов: {frame.f_code.co_name}")
+                    logger.debug("Определен обработчик через стек вызовов: %s", frame.f_code.co_name)
                     return frame.f_code.co_name
                 frame = frame.f_back  # mypy: frame теперь может быть None, тип правильный
 
         except Exception as e:
-            logger.info(f"Не удалось определить имя обработчика: {e}")
+            logger.info("Не удалось определить имя обработчика: %s", e)
 
         return "unknown_handler"
 
@@ -160,5 +187,5 @@ class PrometheusMiddleware(BaseMiddleware):  # type: ignore[misc]
                 # Если нет специальных атрибутов, берём сам объект
                 return self._calculate_size(self.msg)
         except Exception as e:
-            logger.info(f"Не удалось определить размер сообщения: {e}")
+            logger.info("Не удалось определить размер сообщения: %s", e)
         return 0
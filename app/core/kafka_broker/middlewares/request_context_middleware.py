@@ -86,7 +86,7 @@ class RequestContextMiddleware(BaseMiddleware):
         # Если успешно - используем (возможно очищенные) заголовки
         final_headers = validated
 
-        logger.debug(f"RequestContextMiddleware: распознано заголовков: {len(final_headers)}")
+        logger.debug("RequestContextMiddleware: распознано заголовков: %d", len(final_headers))
         message_headers.set(final_headers)
 
         # messageId vs requestId: теперь используем только requestId
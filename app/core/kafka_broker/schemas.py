@@ -40,6 +40,7 @@ ERROR_TRACES = {
 
 class StatusCode(IntEnum):
     SUCCESS = 100  # успешные
+    PARTIAL = 101  # частичный ответ (потоковая генерация), финальный придёт с SUCCESS
     PROCESSING_ERROR = 400  # не успешные
 
 
@@ -58,7 +59,7 @@ class ErrorInfo(BaseModel):
 
 class LangchainProducerMessage(ProducerMessage):
     message: str = Field(..., description="Сообщение в топит out")
-    statusCode: StatusCode = Field(description="код статуса. 100 - успешно. >101 - ошибка")
+    statusCode: StatusCode = Field(description="код статуса. 100 - успешно. 101 - частичный ответ. >101 - ошибка")
     errorInfo: list[ErrorInfo] | None = Field(default=None, description="Информация об ошибке")
 
 
@@ -1,3 +1,12 @@
-from app.core.logger.logger import get_logger, setup_logger
+from app.core.logger.lazy import Lazy, LazyLogger, get_lazy_logger
+from app.core.logger.logger import get_log_queue_handler, get_logger, setup_logger, shutdown_log_queue
 
-__all__ = ["get_logger", "setup_logger"]
+__all__ = [
+    "Lazy",
+    "LazyLogger",
+    "get_lazy_logger",
+    "get_log_queue_handler",
+    "get_logger",
+    "setup_logger",
+    "shutdown_log_queue",
+]
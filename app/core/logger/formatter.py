@@ -3,11 +3,13 @@ import socket
 import sys
 import uuid
 from datetime import datetime, timezone
+from functools import lru_cache
 from time import time
 from typing import Any, ClassVar, Literal
 
 from colorama import Fore, Style
 
+from app.core.logger.tslg_serializer import EventIdGenerator, TslgJsonTemplate, format_local_time
 from app.core.logger.utils import is_valid_uuid
 from rnd_connectors.tslg.protocols import TSLGConfigProtocol
 from rnd_connectors.tslg.schemas import TSLGMsgSchemas
@@ -52,8 +54,22 @@ def create_formatter() -> logging.Formatter:
     return logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
 
 
+# request_id повторяется во всех строках лога одного сообщения — проверка формата кэшируется
+_is_uuid_cached = lru_cache(maxsize=1024)(is_valid_uuid)
+
+
+def _is_uuid(value: Any) -> bool:
+    return isinstance(value, str) and _is_uuid_cached(value)
+
+
 class TslgFormatter(logging.Formatter):
-    """Форматтер для преобразования LogRecord в JSON‑строку для TSLG Agent."""
+    """
+    Форматтер для преобразования LogRecord в JSON‑строку для TSLG Agent.
+
+    По умолчанию — быстрый путь без pydantic: постоянные поля сериализованы заранее
+    (TslgJsonTemplate), на запись через orjson пишутся только изменяемые. С validate_schema=True
+    (отладка) сообщение собирается и валидируется через TSLGMsgSchemas, как раньше.
+    """
 
     def __init__(self, config: TSLGConfigProtocol, is_fluentbit: bool) -> None:
         super().__init__()
@@ -65,9 +81,63 @@ class TslgFormatter(logging.Formatter):
             self._pod_ip = "127.0.0.1"
 
         self.is_fluentbit = is_fluentbit
+        self.validate_schema = config.validate_schema
+        self._tracing = config.aggregation_type == "TRACING"
+        self._event_id = EventIdGenerator()
+        self._template = TslgJsonTemplate(self._static_fields(), exclude_none=False)
 
     def format(self, record: logging.LogRecord) -> str:
         """Форматирование LogRecord в JSON строку для TSLG."""
+        if self.validate_schema:
+            return self._format_validated(record)
+        return self._template.render(self._dynamic_fields(record)).decode()
+
+    def _static_fields(self) -> dict[str, Any]:
+        """Поля, одинаковые для всех записей (тот же набор ключей, что у TSLGMsgSchemas)."""
+        fields: dict[str, Any] = {
+            "appName": self.tslg_config.app_name,
+            "appType": self.tslg_config.app_type,
+            "envType": self.tslg_config.env_type,
+            "risCode": self.tslg_config.ris_code,
+            "projectCode": self.tslg_config.project_code,
+            "podName": self._pod_ip,
+            "hostName": self._host,
+            "tec": {"podIp": self._pod_ip},
+            "agrType": self.tslg_config.aggregation_type if self._tracing else None,
+            "parentSpanId": None,
+            "namespace": self.tslg_config.namespace,
+        }
+        if not self._tracing:
+            fields["traceId"] = None
+            fields["spanId"] = None
+        if not self.is_fluentbit:
+            fields["tslgClientVersion"] = self.tslg_config.client_version
+        return fields
+
+    def _dynamic_fields(self, record: logging.LogRecord) -> dict[str, Any]:
+        request_id = getattr(record, "request_id", None)
+        fields: dict[str, Any] = {
+            "level": logging.getLevelName(record.levelno),
+            "text": record.getMessage(),
+            "callerMethod": f"{record.filename}.{record.funcName}",
+            "callerLine": record.lineno,
+            "PID": record.process,
+            "stack": None,
+            "threadName": record.threadName,
+            "loggerName": record.name,
+            "eventId": request_id if _is_uuid(request_id) else self._event_id(),
+            "localTime": format_local_time(record.created),
+            "timestamp": time(),
+            "mdc": {"request_id": request_id} if request_id is not None and request_id != "-" else None,
+        }
+        self._add_stack_trace_if_needed(record=record, tslg_dict=fields)
+        if self._tracing:
+            fields["traceId"] = self._extract_uuid(record=record, attr_name="trace_id")
+            fields["spanId"] = self._extract_uuid(record=record, attr_name="span_id")
+        return fields
+
+    def _format_validated(self, record: logging.LogRecord) -> str:
+        """Прежний путь через TSLGMsgSchemas: валидация схемы (отладка) и эталон для тестов/бенчмарка."""
         tslg_dict = self._build_base_dict(record)
         self._add_mdc_if_needed(record=record, tslg_dict=tslg_dict)
         self._add_stack_trace_if_needed(record=record, tslg_dict=tslg_dict)
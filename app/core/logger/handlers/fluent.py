@@ -9,7 +9,8 @@ from datetime import UTC, datetime
 from urllib3.exceptions import InsecureRequestWarning
 
 from app.core.config import CONFIG
-from rnd_connectors.fluent.client import FluentdClient
+from rnd_connectors.fluent.batching import FluentdBatchSender
+from rnd_connectors.fluent.client import DB_TAG, EFK_TAG, FluentdClient
 from rnd_connectors.fluent.protocols import FluentdConfigProtocol
 from rnd_connectors.fluent.schemas import FluentDBLog, FluentELKLog, FluentEvent, FluentExt, FluentMessage
 
@@ -20,17 +21,24 @@ warnings.filterwarnings("ignore", category=InsecureRequestWarning, module="urlli
 
 
 class FluentHandler(logging.Handler):
-    """Обработчик логирования для отправки логов в Fluentd."""
+    """
+    Обработчик логирования для отправки логов в Fluentd.
+
+    С batch_sender записи уходят пачками через его ограниченную очередь,
+    без него — по одному запросу на запись через общий executor.
+    """
 
     def __init__(
         self,
         fluent_client: FluentdClient,
         fluent_config: FluentdConfigProtocol,
         level: int = logging.NOTSET,
+        batch_sender: FluentdBatchSender | None = None,
     ) -> None:
         super().__init__(level)
         self.fluent_client = fluent_client
         self.fluent_config = fluent_config
+        self.batch_sender = batch_sender
         self.node = socket.gethostname()
 
     def emit(self, record: logging.LogRecord) -> None:
@@ -83,7 +91,10 @@ class FluentHandler(logging.Handler):
                 ),
             )
 
-            executor.submit(self.fluent_client.send_to_efk, msg_efk)
+            if self.batch_sender is not None:
+                self.batch_sender.submit(EFK_TAG, msg_efk.model_dump(mode="json", exclude_none=True))
+            else:
+                executor.submit(self.fluent_client.send_to_efk, msg_efk)
 
         if self.fluent_config.external_db_enabled:
             msg_db = FluentDBLog(
@@ -96,4 +107,12 @@ class FluentHandler(logging.Handler):
                 message=record.getMessage(),
                 event_date=event_date,
             )
-            executor.submit(self.fluent_client.send_to_db, msg_db)
+            if self.batch_sender is not None:
+                self.batch_sender.submit(DB_TAG, msg_db.model_dump(mode="json", exclude_none=True))
+            else:
+                executor.submit(self.fluent_client.send_to_db, msg_db)
+
+    def close(self) -> None:
+        if self.batch_sender is not None:
+            self.batch_sender.close()
+        super().close()
@@ -0,0 +1,120 @@
+import logging
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler
+from typing import Literal
+
+_SENTINEL = None
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Дешёвая сторона вызывающего: запись только кладётся в ограниченную очередь.
+
+    Фильтры (request_id, stages, headers из ContextVar) должны висеть на этом handler-е:
+    в потоке отправки контекст запроса уже недоступен. Форматирование, построение
+    pydantic-моделей и сеть — в BatchQueueListener.
+
+    При переполнении очереди:
+    - drop — запись отбрасывается сразу;
+    - block — ждём место не дольше block_timeout_seconds, затем отбрасываем.
+    """
+
+    def __init__(
+        self,
+        log_queue: "queue.Queue[logging.LogRecord | None]",
+        overflow_policy: Literal["drop", "block"] = "drop",
+        block_timeout_seconds: float = 0.1,
+    ) -> None:
+        super().__init__(log_queue)
+        self.queue: queue.Queue[logging.LogRecord | None] = log_queue
+        self.overflow_policy = overflow_policy
+        self.block_timeout_seconds = block_timeout_seconds
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # запись не уходит из процесса: exc_info и объекты контекста остаются как есть,
+        # фиксируется только текст (args могут измениться после возврата из logger.info)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.overflow_policy == "block":
+                self.queue.put(record, timeout=self.block_timeout_seconds)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    @property
+    def size(self) -> int:
+        return self.queue.qsize()
+
+
+class BatchQueueListener:
+    """
+    Фоновый поток отправки логов: забирает записи из очереди пачками до batch_size
+    и передаёт их handler-ам (с учётом уровня каждого), после пачки — flush handler-ов.
+    """
+
+    def __init__(
+        self,
+        log_queue: "queue.Queue[logging.LogRecord | None]",
+        handlers: list[logging.Handler],
+        batch_size: int = 256,
+    ) -> None:
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-queue-listener", daemon=True)
+        self._thread.start()
+
+    def _next_batch(self) -> tuple[list[logging.LogRecord], bool]:
+        """Пачка записей (ждёт первую) и признак остановки."""
+        record = self.queue.get()
+        batch: list[logging.LogRecord] = []
+        while record is not _SENTINEL:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                record = self.queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _run(self) -> None:
+        stopped = False
+        while not stopped:
+            batch, stopped = self._next_batch()
+            for record in batch:
+                self.handle(record)
+            for handler in self.handlers:
+                try:
+                    handler.flush()
+                except Exception as e:
+                    # print, а не logging: лог из потока отправки снова попал бы в очередь
+                    print(f"Log handler flush failed: {e!r}", file=sys.stderr)
+
+    def handle(self, record: logging.LogRecord) -> None:
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def stop(self, timeout: float | None = 10.0) -> None:
+        """Досылает накопленные записи и останавливает поток."""
+        if self._thread is None:
+            return
+        self.queue.put(_SENTINEL)
+        self._thread.join(timeout)
+        self._thread = None
+        for handler in self.handlers:
+            handler.close()
@@ -0,0 +1,141 @@
+import logging
+import random
+from collections.abc import Callable, Mapping
+from typing import Any
+
+_TRUNCATED_SUFFIX = "…"
+
+
+class Lazy:
+    """
+    Отложенное значение для аргументов лога: func вызывается только при форматировании записи
+    (т.е. если уровень включён и запись дошла до handler-а), результат кешируется.
+
+        logger.debug("заголовки: %s", Lazy(lambda: dict(headers)))
+    """
+
+    __slots__ = ("_func", "_value", "_evaluated")
+
+    def __init__(self, func: Callable[[], Any]) -> None:
+        self._func = func
+        self._evaluated = False
+        self._value: Any = None
+
+    def get(self) -> Any:
+        if not self._evaluated:
+            self._value = self._func()
+            self._evaluated = True
+        return self._value
+
+    def __str__(self) -> str:
+        return str(self.get())
+
+    def __repr__(self) -> str:
+        return repr(self.get())
+
+
+class Fields:
+    """Поля события, отрисовываются при форматировании: ' | topic=out | offset=42 | duration=0.012'."""
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: Mapping[str, Any]) -> None:
+        self.fields = fields
+
+    @staticmethod
+    def _render(value: Any) -> str:
+        if isinstance(value, Lazy):
+            value = value.get()
+        if isinstance(value, float):
+            return f"{value:.3f}"
+        return str(value)
+
+    def __str__(self) -> str:
+        return "".join(f" | {key}={self._render(value)}" for key, value in self.fields.items())
+
+
+class PayloadSampler:
+    """
+    Выборочное логирование тел сообщений (LOG_PAYLOAD__*).
+
+    - sample_rate: доля сообщений, для которых тело попадает в лог (1.0 — все, 0 — ни одного);
+    - max_length: тело обрезается до max_length символов (0 — без ограничения).
+    """
+
+    def __init__(self, sample_rate: float = 1.0, max_length: int = 0) -> None:
+        self.configure(sample_rate, max_length)
+
+    def configure(self, sample_rate: float, max_length: int) -> None:
+        self.sample_rate = sample_rate
+        self.max_length = max_length
+
+    def sample(self) -> bool:
+        if self.sample_rate >= 1:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def preview(self, payload: Any) -> Lazy:
+        """Отложенное (и при необходимости обрезанное) строковое представление тела."""
+        max_length = self.max_length
+
+        def render() -> str:
+            text = str(payload)
+            if max_length and len(text) > max_length:
+                return text[:max_length] + _TRUNCATED_SUFFIX
+            return text
+
+        return Lazy(render)
+
+
+# Общий сэмплер тел сообщений, настраивается в setup_logger
+PAYLOAD_SAMPLER = PayloadSampler()
+
+
+class LazyLogger(logging.LoggerAdapter):  # type: ignore[type-arg]
+    """
+    Логгер со структурированными событиями, которые собираются только при включённом уровне.
+
+        logger.event(logging.INFO, "✅ Результат опубликован", topic=topic, offset=offset, duration=elapsed)
+        logger.event(logging.INFO, "📤 Отправка сообщения", topic=topic, payload=message_data)
+
+    Поля попадают в текст записи (' | key=value', float — с 3 знаками) и в record.event_fields.
+    payload логируется выборочно (PAYLOAD_SAMPLER) в поле message и строится лениво.
+    Обычные debug/info/... работают как у logging.Logger — используйте %-аргументы, не f-строки.
+    """
+
+    def __init__(self, logger: logging.Logger, payload_sampler: PayloadSampler = PAYLOAD_SAMPLER) -> None:
+        super().__init__(logger, {})
+        self.payload_sampler = payload_sampler
+
+    def process(self, msg: Any, kwargs: Any) -> tuple[Any, Any]:
+        return msg, kwargs
+
+    def event(
+        self,
+        level: int,
+        message: str,
+        /,
+        *,
+        payload: Any = None,
+        exc_info: Any = None,
+        **fields: Any,
+    ) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if payload is not None and self.payload_sampler.sample():
+            fields["message"] = self.payload_sampler.preview(payload)
+        # stacklevel=2: funcName/lineno — места вызова event, а не этого модуля
+        self.logger.log(
+            level,
+            "%s%s",
+            message,
+            Fields(fields),
+            exc_info=exc_info,
+            extra={"event_fields": fields},
+            stacklevel=2,
+        )
+
+
+def get_lazy_logger(name: str | None = None) -> LazyLogger:
+    """LazyLogger поверх logging.getLogger(name)."""
+    return LazyLogger(logging.getLogger(name))
@@ -1,14 +1,19 @@
+import atexit
 import logging
+import queue
 import sys
 from typing import Any
 
-from app.core.config import EnvConfig
+from app.core.config import EnvConfig, LogQueueConfig
 from app.core.exceptions import BusinessException
 from app.core.logger.filters import MessageHeadersFilter, MessageKeyFilter, RequestIdFilter, StagesFilter
 from app.core.logger.formatter import ColoredFormatter, TslgFormatter
 from app.core.logger.handlers.fluent import FluentHandler
+from app.core.logger.handlers.queued import BatchQueueListener, BoundedQueueHandler
 from app.core.logger.handlers.tslg_kafka import TslgKafkaHandler
 from app.core.logger.handlers.tslg_socket import TslgSocketHandler
+from app.core.logger.lazy import PAYLOAD_SAMPLER
+from rnd_connectors.fluent.batching import FluentdBatchSender
 from rnd_connectors.fluent.client import FluentdClient
 from rnd_connectors.fluent.protocols import FluentdConfigProtocol
 from rnd_connectors.fluent.schemas import ErrorType, FluentError
@@ -36,6 +41,9 @@ _COMMON_FILTERS = [
     MessageKeyFilter(),
 ]
 
+# Фоновые потоки отправки логов (LOG_QUEUE__ENABLED), останавливаются при выходе
+_QUEUE_LISTENERS: list[BatchQueueListener] = []
+
 
 # ============================================================================
 # Log Record Factory
@@ -137,7 +145,8 @@ def _get_console_handler(env_config: EnvConfig) -> logging.Handler:
 def _get_fluentd_handler(fluent_config: FluentdConfigProtocol) -> logging.Handler:
     """Создаёт обработчик для отправки логов в Fluentd."""
     fluentd_client = FluentdClient(fluent_config)
-    handler = FluentHandler(fluent_client=fluentd_client, fluent_config=fluent_config)
+    batch_sender = FluentdBatchSender(fluentd_client, fluent_config) if fluent_config.batch_enabled else None
+    handler = FluentHandler(fluent_client=fluentd_client, fluent_config=fluent_config, batch_sender=batch_sender)
     formatter = _create_default_formatter()
     return _setup_handler(handler=handler, formatter=formatter, log_level=fluent_config.log_level)
 
@@ -165,6 +174,17 @@ def _get_tslg_kafka_handler(tslg_config: TSLGConfigProtocol) -> logging.Handler:
 def _collect_handlers(env_config: EnvConfig) -> list[logging.Handler]:
     """Собирает список обработчиков на основе конфигов."""
     handlers = [_get_console_handler(env_config)]
+    sinks = _collect_sink_handlers(env_config)
+    if sinks and env_config.log_queue.enabled:
+        handlers.append(_get_queue_handler(sinks, env_config.log_queue))
+    else:
+        handlers.extend(sinks)
+    return handlers
+
+
+def _collect_sink_handlers(env_config: EnvConfig) -> list[logging.Handler]:
+    """Обработчики внешних приёмников логов (Fluentd, TSLG TCP/Kafka)."""
+    handlers: list[logging.Handler] = []
 
     if env_config.fluent.external_efk_enabled or env_config.fluent.external_db_enabled:
         handlers.append(_get_fluentd_handler(env_config.fluent))
@@ -184,6 +204,30 @@ def _collect_handlers(env_config: EnvConfig) -> list[logging.Handler]:
     return handlers
 
 
+def _get_queue_handler(sinks: list[logging.Handler], queue_config: LogQueueConfig) -> logging.Handler:
+    """
+    Ставит приёмники за ограниченную очередь: вызывающий только кладёт запись в очередь,
+    фильтры, форматирование и отправка — в фоновом потоке BatchQueueListener.
+    """
+    log_queue: queue.Queue[logging.LogRecord | None] = queue.Queue(maxsize=queue_config.max_size)
+    handler = BoundedQueueHandler(
+        log_queue,
+        overflow_policy=queue_config.overflow_policy,
+        block_timeout_seconds=queue_config.block_timeout_seconds,
+    )
+    handler.setLevel(min(sink.level for sink in sinks))
+    # значения ContextVar (request_id, stages, ...) доступны только в потоке вызывающего
+    for filter_obj in _COMMON_FILTERS:
+        handler.addFilter(filter_obj)
+        for sink in sinks:
+            sink.removeFilter(filter_obj)
+
+    listener = BatchQueueListener(log_queue, handlers=sinks, batch_size=queue_config.batch_size)
+    listener.start()
+    _QUEUE_LISTENERS.append(listener)
+    return handler
+
+
 # ============================================================================
 # Public
 # ============================================================================
@@ -207,6 +251,20 @@ def setup_logger(env_config: EnvConfig) -> None:
 
     logging.setLogRecordFactory(_custom_log_record_factory)
     logging.raiseExceptions = env_config.fluent.raise_exceptions
+    PAYLOAD_SAMPLER.configure(env_config.log_payload.sample_rate, env_config.log_payload.max_length)
+    if _QUEUE_LISTENERS:
+        atexit.register(shutdown_log_queue)
+
+
+def shutdown_log_queue() -> None:
+    """Досылает записи из очереди логов и останавливает фоновые потоки отправки."""
+    while _QUEUE_LISTENERS:
+        _QUEUE_LISTENERS.pop().stop()
+
+
+def get_log_queue_handler() -> BoundedQueueHandler | None:
+    """Обработчик очереди логов на корневом логгере (None, если очередь выключена)."""
+    return next((h for h in logging.getLogger().handlers if isinstance(h, BoundedQueueHandler)), None)
 
 
 def get_logger(name: str | None = None) -> logging.Logger:
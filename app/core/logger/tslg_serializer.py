@@ -0,0 +1,67 @@
+import itertools
+import math
+import time
+import uuid
+from typing import Any
+
+import orjson
+
+_MICROSECONDS_PER_SECOND = 1_000_000
+
+
+class TslgJsonTemplate:
+    """
+    Быстрая сериализация TSLG-сообщений без pydantic.
+
+    Постоянные поля (appName, podName, namespace, ...) сериализуются один раз в префикс JSON-объекта,
+    на каждую запись через orjson сериализуются только изменяемые поля. Поля со значением None
+    не выводятся (как model_dump(exclude_none=True)).
+    """
+
+    def __init__(self, static_fields: dict[str, Any], exclude_none: bool = True) -> None:
+        """
+        :param exclude_none: False — поля со значением None выводятся как null (как model_dump_json)
+        """
+        self.exclude_none = exclude_none
+        static = self._drop_none(static_fields)
+        # b'{"appName":"...","namespace":"..."' — без закрывающей скобки
+        self._prefix = orjson.dumps(static)[:-1]
+        self._separator = b"," if static else b""
+
+    def _drop_none(self, fields: dict[str, Any]) -> dict[str, Any]:
+        if not self.exclude_none:
+            return fields
+        return {key: value for key, value in fields.items() if value is not None}
+
+    def render(self, dynamic_fields: dict[str, Any]) -> bytes:
+        dynamic = self._drop_none(dynamic_fields)
+        if not dynamic:
+            return self._prefix + b"}"
+        # b'{"level":...}' → b',"level":...}'
+        return self._prefix + self._separator + orjson.dumps(dynamic)[1:]
+
+
+def format_local_time(created: float) -> str:
+    """Время записи в ISO 8601 UTC с миллисекундами: 'YYYY-MM-ddTHH:mm:ss.SSSZ' (без datetime)."""
+    # округление микросекунд — как в datetime.fromtimestamp, миллисекунды — отбрасыванием
+    fraction, seconds = math.modf(created)
+    microseconds = round(fraction * _MICROSECONDS_PER_SECOND)
+    if microseconds >= _MICROSECONDS_PER_SECOND:
+        seconds += 1
+        microseconds -= _MICROSECONDS_PER_SECOND
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))}.{microseconds // 1000:03d}Z"
+
+
+class EventIdGenerator:
+    """
+    Уникальные eventId в формате UUID без uuid4 на каждую запись:
+    случайные старшие 64 бита на процесс + счётчик в младших.
+    """
+
+    def __init__(self) -> None:
+        self._prefix = f"{uuid.uuid4().int >> 64:016x}"
+        self._counter = itertools.count()
+
+    def __call__(self) -> str:
+        h = self._prefix + f"{next(self._counter) & 0xFFFFFFFFFFFFFFFF:016x}"
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
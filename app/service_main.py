@@ -4,6 +4,7 @@ from __future__ import annotations
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Annotated, Any
+from urllib.parse import parse_qs
 
 from faststream import Context
 from faststream.asgi import AsgiFastStream, make_ping_asgi
@@ -11,7 +12,14 @@ from prometheus_client import make_asgi_app
 
 from app.core.config import CONFIG
 from app.core.container import DependencyContainer
-from app.core.kafka_broker.brokers import broker, registry
+from app.core.kafka_broker.brokers import (
+    batching_publisher,
+    broker,
+    dispatcher,
+    registry,
+    subscriber_concurrency_kwargs,
+)
+from app.core.kafka_broker.middlewares import AutoPublishMiddleware
 from app.core.kafka_broker.schemas import LangchainConsumerMessage, LangchainProducerMessage
 from app.core.logger.logger import get_logger, setup_logger
 from app.services.rag_service import RagService
@@ -20,6 +28,7 @@ setup_logger(CONFIG)
 logger = get_logger(__name__)
 
 SERVICE_KEY = "service"
+CONTAINER_KEY = "container"
 
 
 # =============================================================================
@@ -36,6 +45,7 @@ async def lifespan():
     """
     logger.info("🔧 Запуск DependencyContainer...")
     container = DependencyContainer(config=CONFIG)
+    app.context.set_global(CONTAINER_KEY, container)
 
     await container.init_async()
     service_instance = container.build_service()
@@ -54,7 +64,7 @@ async def lifespan():
 @broker.subscriber(
     CONFIG.read_kafka.topic_in,
     group_id=CONFIG.read_kafka.group_id,
-    max_workers=CONFIG.read_kafka.max_workers,
+    **subscriber_concurrency_kwargs(),
 )
 async def on_message(
     body: LangchainConsumerMessage,
@@ -63,16 +73,72 @@ async def on_message(
     service: Annotated[RagService, Context(SERVICE_KEY)],
 ) -> LangchainProducerMessage:
     # Middleware (AutoPublishMiddleware) автоматически опубликует результат
+    if CONFIG.write_kafka.stream_partial:
+        # частичные ответы публикуются по ходу генерации, финальный — как обычно
+        return await service.handle_message_stream(
+            body=body,
+            headers=headers,
+            key=key,
+            on_partial=AutoPublishMiddleware.publish_result,
+            min_chars=CONFIG.write_kafka.stream_min_chars,
+        )
     return await service.handle_message(body=body, headers=headers, key=key)
 
 
+async def rag_stream_asgi(scope, receive, send) -> None:
+    """
+    GET /rag/stream?question=... — ответ RAG потоком Server-Sent Events.
+    Каждое событие data: — очередная часть текста, в конце event: done.
+    """
+    query = parse_qs(scope.get("query_string", b"").decode())
+    question = (query.get("question") or [""])[0]
+    if scope["method"] != "GET" or not question:
+        await send({"type": "http.response.start", "status": 400, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"question is required"})
+        return
+
+    service: RagService = app.context.get(SERVICE_KEY)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")],
+        },
+    )
+    try:
+        async for delta in service.stream_answer(question):
+            data = "".join(f"data: {line}\n" for line in delta.split("\n"))
+            await send({"type": "http.response.body", "body": f"{data}\n".encode(), "more_body": True})
+        await send({"type": "http.response.body", "body": b"event: done\ndata: \n\n"})
+    except Exception as e:
+        logger.exception("❌ Ошибка потоковой генерации ответа")
+        await send({"type": "http.response.body", "body": f"event: error\ndata: {e}\n\n".encode()})
+
+
+ping_asgi = make_ping_asgi(broker)
+
+
+async def health_asgi(scope, receive, send) -> None:
+    """
+    GET /health — 503, пока контейнер не готов (идёт прогрев) или уже закрывается;
+    после готовности — проверка подключения брокера.
+    """
+    container: DependencyContainer | None = app.context.get(CONTAINER_KEY)
+    if container is None or not container.ready:
+        await send({"type": "http.response.start", "status": 503, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"warming up"})
+        return
+    await ping_asgi(scope, receive, send)
+
+
 app = AsgiFastStream(
     broker,
     logger=logger,
     lifespan=lifespan,
     asgi_routes=[
-        ("/health", make_ping_asgi(broker)),
+        ("/health", health_asgi),
         ("/metrics", make_asgi_app(registry)),
+        ("/rag/stream", rag_stream_asgi),
     ],
 )
 
@@ -92,6 +158,16 @@ async def example_log_start() -> None:
     logger.info("  - Топик записи: %s", CONFIG.write_kafka.topic_out)
 
 
+@app.on_shutdown
+async def drain_in_flight() -> None:
+    # до остановки брокера: дообработать сообщения в полёте и закоммитить их offset-ы
+    if dispatcher is not None:
+        await dispatcher.drain(timeout=CONFIG.read_kafka.drain_timeout_seconds)
+    # затем дослать накопленные батчи публикации
+    if batching_publisher is not None:
+        await batching_publisher.close()
+
+
 @app.on_shutdown
 async def example_log_stop() -> None:
     logger.info("💤- FastStream приложение остановлено. Работа завершена")
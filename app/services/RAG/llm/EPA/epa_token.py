@@ -1,5 +1,6 @@
 import asyncio
 import time
+from contextlib import nullcontext
 
 from app.core.config import EPATokenManagerConfig
 from app.core.logger import get_logger
@@ -7,12 +8,25 @@ from app.services.RAG.llm.EPA.exceptions import EPATokenError
 from app.services.RAG.llm.EPA.schemas import EPAToken
 from app.utils.logging_decorators import log_execution_time
 from app.utils.post_request import make_request
+from rnd_connectors.resilience.circuit_breaker import CircuitBreaker
+from rnd_connectors.yandex_llm.token_refresh import TokenRefresher
 
 logger = get_logger(__name__)
 
 
 class EPATokenManager:
-    def __init__(self, config: EPATokenManagerConfig):
+    """
+    Менеджер EPA-токена.
+
+    Пока токен действителен, он отдаётся без лока; заранее (refresh_ratio от expires_in)
+    токен обновляется в фоне (TokenRefresher), поэтому запросы не ждут EPA.
+    Лок берётся, только если токена нет или он уже истёк.
+    """
+
+    def __init__(self, config: EPATokenManagerConfig, circuit_breaker: CircuitBreaker | None = None):
+        """
+        :param circuit_breaker: при разомкнутой цепи EPA не вызывается (CircuitOpenError)
+        """
         self.login: str = config.login
         self.password: str = config.password
         self.url = config.url
@@ -20,22 +34,27 @@ class EPATokenManager:
         self.__access_token: str | None = None
         self.__expires_in: int | None = None
         self.__lock = asyncio.Lock()
+        self.__refresher = TokenRefresher(self._refresh_tokens, config, name="epa")
+        self.circuit_breaker = circuit_breaker
+
+    def _is_valid(self) -> bool:
+        return self.__access_token is not None and self.__expires_in is not None and self.__expires_in > time.time()
 
     @property
     async def token(self) -> str:
         """
-        Получение id_token с использованием лока.
-        Только один вызов может получить id_token одновременно.
+        Получение токена.
+        Быстрый путь — без лока; при отсутствии/истечении токена только один вызов идёт в EPA.
         """
-        current_time = int(time.time())
-
-        # Если токен ещё действителен — возвращаем его
-        if self.__access_token is not None and self.__expires_in is not None and self.__expires_in > current_time:
-            return self.__access_token
+        # Если токен ещё действителен — возвращаем его (плановое обновление идёт в фоне)
+        if self._is_valid():
+            if self.__refresher.due():
+                self.__refresher.trigger()
+            return self.__access_token  # type: ignore[return-value]
 
         async with self.__lock:
             # Если токен истёк или отсутствует — обновляем
-            if self.__access_token is None or self.__expires_in is None or self.__expires_in <= current_time:
+            if not self._is_valid():
                 logger.info("Getting new EPA token...")
                 tokens = await self.get_token()
                 self._update_tokens(tokens)
@@ -54,6 +73,16 @@ class EPATokenManager:
         """Обновление внутренних токенов"""
         self.__access_token = tokens.access_token
         self.__expires_in = tokens.expires_in + int(time.time())
+        self.__refresher.schedule(issued_at=time.time(), expires_in=tokens.expires_in)
+
+    async def _refresh_tokens(self) -> None:
+        async with self.__lock:
+            logger.info("Refreshing EPA token...")
+            self._update_tokens(await self.get_token())
+
+    async def aclose(self) -> None:
+        """Остановка фонового обновления токена"""
+        await self.__refresher.aclose()
 
     @log_execution_time
     async def get_token(self) -> EPAToken:
@@ -64,11 +93,13 @@ class EPATokenManager:
             "client_secret": self.password,
         }
 
-        response = await make_request(
-            self.url,
-            logger=logger,
-            payload=token_request,
-            verify=self.verify,
-            error_class=EPATokenError,
-        )
+        guard = self.circuit_breaker.guard() if self.circuit_breaker is not None else nullcontext()
+        async with guard:
+            response = await make_request(
+                self.url,
+                logger=logger,
+                payload=token_request,
+                verify=self.verify,
+                error_class=EPATokenError,
+            )
         return EPAToken(**response)
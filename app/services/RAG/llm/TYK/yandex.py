@@ -1,10 +1,17 @@
+import json
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager, nullcontext
+from typing import Any
+
 from httpx import AsyncClient, HTTPStatusError, ReadTimeout, RequestError, codes
 
 from app.core.config import TYKYandexConfig
+from app.core.http_client import use_client
 from app.core.logger import get_logger
 from app.services.RAG.llm.EPA.epa_token import EPATokenManager
 from app.services.RAG.llm.TYK.exceptions import TYKClientError
 from app.utils.logging_decorators import log_execution_time
+from rnd_connectors.resilience.circuit_breaker import CircuitBreaker
 
 logger = get_logger(__name__)
 
@@ -15,9 +22,22 @@ class TYKClient:
     Использует EPA токен, полученный через EPATokenManager.
     """
 
-    def __init__(self, config: TYKYandexConfig, token_manager: EPATokenManager) -> None:
+    def __init__(
+        self,
+        config: TYKYandexConfig,
+        token_manager: EPATokenManager,
+        http_client: AsyncClient | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ) -> None:
         self.config: TYKYandexConfig = config
         self.token_manager: EPATokenManager = token_manager
+        # Общий клиент из HTTPClientPool; None → новое соединение на каждый запрос
+        self.http_client = http_client
+        # При разомкнутой цепи запросы к TYK сразу падают с CircuitOpenError
+        self.circuit_breaker = circuit_breaker
+
+    def _guard(self) -> AbstractAsyncContextManager[None]:
+        return self.circuit_breaker.guard() if self.circuit_breaker is not None else nullcontext()
 
     @log_execution_time
     async def completion(self, payload: dict):
@@ -25,28 +45,68 @@ class TYKClient:
         Делает POST-запрос к TYK API с валидным EPA токеном.
         Возвращает JSON-ответ как dict[str, Any].
         """
-        token = await self.token_manager.token
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        }
-
-        try:
-            async with AsyncClient(verify=False, timeout=30) as client:
-                response = await client.post(self.config.api_url, json=payload, headers=headers)
-
-            if response.status_code != codes.OK:
-                raise TYKClientError(
-                    f"TYK API returned {response.status_code}: {response.text}",
-                    status_code=response.status_code,
-                )
-
-            return response.json()
-
-        except ReadTimeout as exc:
-            logger.exception("TYK request timeout")
-            raise TYKClientError("TYK request timeout") from exc
-
-        except (RequestError, HTTPStatusError) as exc:
-            logger.exception("TYK request failed: %s", exc)
-            raise TYKClientError(str(exc)) from exc
+        async with self._guard():
+            token = await self.token_manager.token
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+            }
+
+            try:
+                async with use_client(self.http_client, verify=False) as client:
+                    response = await client.post(self.config.api_url, json=payload, headers=headers, timeout=30)
+
+                if response.status_code != codes.OK:
+                    raise TYKClientError(
+                        f"TYK API returned {response.status_code}: {response.text}",
+                        status_code=response.status_code,
+                    )
+
+                return response.json()
+
+            except ReadTimeout as exc:
+                logger.exception("TYK request timeout")
+                raise TYKClientError("TYK request timeout") from exc
+
+            except (RequestError, HTTPStatusError) as exc:
+                logger.exception("TYK request failed: %s", exc)
+                raise TYKClientError(str(exc)) from exc
+
+    async def stream_completion(self, payload: dict) -> AsyncIterator[dict[str, Any]]:
+        """
+        Потоковый POST-запрос к TYK API (completionOptions.stream=True).
+        Отдаёт распарсенные строки NDJSON-ответа по мере их прихода.
+        """
+        async with self._guard():
+            token = await self.token_manager.token
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+            }
+
+            try:
+                async with use_client(self.http_client, verify=False) as client:
+                    async with client.stream(
+                        "POST",
+                        self.config.api_url,
+                        json=payload,
+                        headers=headers,
+                        timeout=60,
+                    ) as response:
+                        if response.status_code != codes.OK:
+                            await response.aread()
+                            raise TYKClientError(
+                                f"TYK API returned {response.status_code}: {response.text}",
+                                status_code=response.status_code,
+                            )
+                        async for line in response.aiter_lines():
+                            if line.strip():
+                                yield json.loads(line)
+
+            except ReadTimeout as exc:
+                logger.exception("TYK stream timeout")
+                raise TYKClientError("TYK request timeout") from exc
+
+            except (RequestError, HTTPStatusError) as exc:
+                logger.exception("TYK stream failed: %s", exc)
+                raise TYKClientError(str(exc)) from exc
@@ -0,0 +1,43 @@
+import logging
+from collections.abc import AsyncIterator
+
+from app.services.RAG.llm.protocols import AsyncLLMProtocol
+from app.services.RAG.llm.schemas import ResponseYAGPTSchema
+from app.services.RAG.llm.wrapper import LLMWrapper
+from app.services.RAG.rag_pipeline.exceptions import LLMUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class FallbackLLM(LLMWrapper):
+    """
+    Обёртка LLM с запасным бэкендом.
+
+    Если основной бэкенд недоступен (LLMUnavailableError — разомкнут circuit breaker),
+    вызов уходит в fallback. astream переключается, только пока клиенту ещё ничего не отдано:
+    склеить начало ответа одной модели с продолжением другой нельзя.
+    """
+
+    def __init__(self, llm: AsyncLLMProtocol, fallback: AsyncLLMProtocol) -> None:
+        super().__init__(llm)
+        self.fallback = fallback
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        try:
+            return await self.llm.generate(prompt)
+        except LLMUnavailableError as e:
+            logger.warning(f"⚠️ Основной LLM недоступен ({e.message}), запрос отправлен в запасной бэкенд")
+            return await self.fallback.generate(prompt)
+
+    async def astream(self, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]:
+        started = False
+        try:
+            async for chunk in self.llm.astream(prompt):
+                started = True
+                yield chunk
+        except LLMUnavailableError as e:
+            if started:
+                raise
+            logger.warning(f"⚠️ Основной LLM недоступен ({e.message}), поток переключён на запасной бэкенд")
+            async for chunk in self.fallback.astream(prompt):
+                yield chunk
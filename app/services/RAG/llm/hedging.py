@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+
+from app.core.config import LLMHedgingConfig
+from app.services.prometheus_service import prometheus_service
+from app.services.RAG.llm.protocols import AsyncLLMProtocol
+from app.services.RAG.llm.schemas import ResponseYAGPTSchema
+from app.services.RAG.llm.wrapper import LLMWrapper
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow:
+    """Скользящее окно последних задержек с расчётом перцентиля."""
+
+    def __init__(self, size: int) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def add(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgedLLM(LLMWrapper):
+    """
+    Hedged requests для generate: срезает хвост задержек LLM.
+
+    - если ответа нет дольше percentile недавних задержек (но не раньше min_delay_seconds),
+      отправляется дубль запроса; берётся первый успешный ответ, второй запрос отменяется;
+    - бюджет дублей — token bucket: каждый вызов добавляет max_extra_ratio, дубль тратит 1,
+      копится не больше budget_burst (тихий период не даёт потом залпа дублей); до min_samples замеров — без дублей;
+    - ошибка одного из запросов не прерывает вызов, пока второй ещё выполняется;
+    - astream не дублируется: уже отданную часть ответа повторить нельзя.
+    """
+
+    def __init__(self, llm: AsyncLLMProtocol, config: LLMHedgingConfig, node: str = "default") -> None:
+        super().__init__(llm)
+        self.config = config
+        self.node = node
+        self.latencies = LatencyWindow(config.window_size)
+        self._budget = 0.0
+
+    def hedge_delay(self) -> float | None:
+        """Через сколько секунд отправлять дубль (None — статистики ещё мало)."""
+        if len(self.latencies) < self.config.min_samples:
+            return None
+        return max(self.config.min_delay_seconds, self.latencies.percentile(self.config.percentile))
+
+    def _within_budget(self) -> bool:
+        return self._budget >= 1
+
+    async def _timed_generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        started = time.perf_counter()
+        try:
+            response = await self.llm.generate(prompt)
+        except asyncio.CancelledError:
+            # Отменённый проигравший отвечал бы не быстрее прошедшего времени — пишем это как нижнюю оценку,
+            # иначе окно теряет самые медленные вызовы и перцентиль занижается
+            self.latencies.add(time.perf_counter() - started)
+            raise
+        self.latencies.add(time.perf_counter() - started)
+        return response
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        self._budget = min(self.config.budget_burst, self._budget + self.config.max_extra_ratio)
+        delay = self.hedge_delay()
+        primary = asyncio.create_task(self._timed_generate(prompt))
+        if delay is None:
+            return await primary
+
+        pending: set[asyncio.Task[ResponseYAGPTSchema]] = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done or not self._within_budget():
+                return await primary
+
+            self._budget -= 1
+            prometheus_service.increment_llm_hedges_fired(node=self.node)
+            logger.info(f"🔀 [{self.node}] Нет ответа LLM за {delay:.2f} с — отправлен дубль запроса")
+            hedge = asyncio.create_task(self._timed_generate(prompt))
+            pending.add(hedge)
+
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task_error = task.exception()
+                    if task_error is None:
+                        if task is hedge:
+                            prometheus_service.increment_llm_hedges_won(node=self.node)
+                        return task.result()
+                    # при ошибке обоих наружу уходит ошибка исходного запроса
+                    if error is None or task is primary:
+                        error = task_error
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,238 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import httpx
+
+from app.core.config import LLMLimiterConfig
+from app.services.prometheus_service import prometheus_service
+from app.services.RAG.llm.protocols import AsyncLLMProtocol
+from app.services.RAG.llm.schemas import ResponseYAGPTSchema
+from app.services.RAG.llm.wrapper import LLMWrapper
+from app.services.RAG.rag_pipeline.exceptions import RagPipelineError
+
+logger = logging.getLogger(__name__)
+
+_TOO_MANY_REQUESTS = 429
+_SERVER_ERROR = 500
+
+
+class TokenBucket:
+    """Token bucket: rate единиц в секунду, не больше capacity накопленных; ожидающие обслуживаются по очереди."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, amount: float) -> None:
+        # запрос больше ёмкости иначе не прошёл бы никогда — ждёт полный bucket
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Лимит параллельных вызовов, подстраиваемый по AIMD.
+
+    - успех → лимит растёт на 1/limit (примерно +1 за «окно» из limit вызовов);
+    - перегрузка → лимит умножается на decrease_ratio, не чаще раза за «окно»: перегрузки вызовов,
+      начатых до последнего снижения, уже учтены им и лимит не трогают;
+    - освободившийся слот получает ожидающий с наименьшим priority (при равенстве — пришедший раньше).
+    """
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int, decrease_ratio: float) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_ratio = decrease_ratio
+        self._limit = float(initial)
+        self._decreased_at = float("-inf")
+        self._in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self, priority: int) -> None:
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # слот уже выдан, но вызывающий отменён — возвращаем его
+                self.release()
+            else:
+                self._wake()
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def on_success(self) -> None:
+        self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+        self._wake()
+
+    def on_overload(self, started_at: float) -> bool:
+        """
+        Сжимает лимит по перегрузке вызова, начатого в started_at (time.perf_counter()).
+
+        :return: False — вызов начат до последнего снижения, лимит не изменён
+        """
+        if started_at < self._decreased_at:
+            return False
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_ratio)
+        self._decreased_at = time.perf_counter()
+        return True
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._in_flight += 1
+            future.set_result(None)
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """429/5xx/таймаут где-либо в цепочке причин исключения."""
+    current: BaseException | None = error
+    while current is not None:
+        if isinstance(current, TimeoutError | httpx.TimeoutException):
+            return True
+        status_code = getattr(current, "status_code", None)
+        if isinstance(current, httpx.HTTPStatusError):
+            status_code = current.response.status_code
+        if status_code is not None and (status_code == _TOO_MANY_REQUESTS or status_code >= _SERVER_ERROR):
+            return True
+        if "timeout" in str(current).lower():
+            return True
+        current = current.__cause__
+    return False
+
+
+class LLMLimiter:
+    """
+    Общий лимитер вызовов LLM (один на все узлы графа и все бэкенды).
+
+    Вызов ждёт слот адаптивного лимита параллельности (по приоритету узла), затем —
+    token bucket-ы запросов и токенов в секунду. По результату вызова лимит растёт
+    (успех) или сжимается (429/5xx/таймаут/ответ дольше latency_threshold_seconds),
+    поэтому при деградации upstream нагрузка на него снижается, а не растёт ретраями.
+    """
+
+    def __init__(self, config: LLMLimiterConfig) -> None:
+        self.config = config
+        self.concurrency = AdaptiveConcurrencyLimit(
+            initial=config.initial_concurrency,
+            min_limit=config.min_concurrency,
+            max_limit=config.max_concurrency,
+            decrease_ratio=config.decrease_ratio,
+        )
+        self.requests_bucket = self._bucket(config.requests_per_second)
+        self.tokens_bucket = self._bucket(config.tokens_per_second)
+        self._default_priority = max(config.priorities.values(), default=0) + 1
+        prometheus_service.set_llm_concurrency_limit(self.concurrency.limit)
+
+    def _bucket(self, rate: float | None) -> TokenBucket | None:
+        if rate is None:
+            return None
+        return TokenBucket(rate=rate, capacity=max(1.0, rate * self.config.burst_seconds))
+
+    def priority(self, node: str) -> int:
+        return self.config.priorities.get(node, self._default_priority)
+
+    def estimate_tokens(self, prompt: list[dict[str, str]]) -> float:
+        return sum(len(message.get("text", "")) for message in prompt) / self.config.chars_per_token
+
+    @asynccontextmanager
+    async def slot(self, node: str, tokens: float, stream: bool = False) -> AsyncIterator[None]:
+        """
+        Разрешение на один вызов LLM.
+
+        :param tokens: оценка токенов запроса (для token bucket-а токенов)
+        :param stream: потоковый вызов — длительность не считается сигналом перегрузки
+        """
+        waited_from = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.concurrency.acquire(self.priority(node)), self.config.acquire_timeout_seconds)
+        except TimeoutError as e:
+            prometheus_service.increment_llm_limiter_rejected(node=node)
+            raise RagPipelineError(
+                message=f"Лимит вызовов LLM: нет свободного слота за {self.config.acquire_timeout_seconds} с",
+            ) from e
+
+        try:
+            if self.requests_bucket is not None:
+                await self.requests_bucket.acquire(1)
+            if self.tokens_bucket is not None:
+                await self.tokens_bucket.acquire(tokens)
+            prometheus_service.record_llm_limiter_wait(time.perf_counter() - waited_from, node=node)
+
+            started = time.perf_counter()
+            try:
+                yield
+            except Exception as e:
+                if is_overload_error(e):
+                    self._on_overload(node, started, reason=repr(e))
+                raise
+            latency = time.perf_counter() - started
+            if not stream and latency > self.config.latency_threshold_seconds:
+                self._on_overload(node, started, reason=f"ответ за {latency:.1f} с")
+            else:
+                self.concurrency.on_success()
+                prometheus_service.set_llm_concurrency_limit(self.concurrency.limit)
+        finally:
+            self.concurrency.release()
+
+    def _on_overload(self, node: str, started: float, reason: str) -> None:
+        prometheus_service.increment_llm_overload(node=node)
+        if not self.concurrency.on_overload(started):
+            return
+        prometheus_service.set_llm_concurrency_limit(self.concurrency.limit)
+        logger.warning(f"⚠️ [{node}] Перегрузка LLM ({reason}), лимит параллельности: {self.concurrency.limit}")
+
+
+class RateLimitedLLM(LLMWrapper):
+    """Обёртка LLM, пропускающая вызовы узла node через общий LLMLimiter."""
+
+    def __init__(self, llm: AsyncLLMProtocol, limiter: LLMLimiter, node: str = "default") -> None:
+        super().__init__(llm)
+        self.limiter = limiter
+        self.node = node
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        async with self.limiter.slot(self.node, self.limiter.estimate_tokens(prompt)):
+            return await self.llm.generate(prompt)
+
+    async def astream(self, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]:
+        async with self.limiter.slot(self.node, self.limiter.estimate_tokens(prompt), stream=True):
+            async for chunk in self.llm.astream(prompt):
+                yield chunk
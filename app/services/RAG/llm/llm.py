@@ -1,17 +1,34 @@
+import json
 import logging
+from collections.abc import AsyncIterator
 from datetime import datetime
 from typing import Any
 
 import httpx
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
-
-from app.core.config import EPATokenManagerConfig, RNDTokenManagerConfig, RNDYandexConfig, TYKYandexConfig
-from app.services.RAG.rag_pipeline.exceptions import RagPipelineError
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from app.core.config import (
+    CircuitBreakerConfig,
+    EPATokenManagerConfig,
+    RNDTokenManagerConfig,
+    RNDYandexConfig,
+    TYKYandexConfig,
+)
+from app.core.http_client import use_client
+from app.services.prometheus_service import prometheus_service
 from app.services.RAG.llm.EPA.epa_token import EPATokenManager
 from app.services.RAG.llm.schemas import AlternativesSchema, MessageSchema, ResponseYAGPTSchema
 from app.services.RAG.llm.TYK.exceptions import TYKClientError
 from app.services.RAG.llm.TYK.yandex import TYKClient
+from app.services.RAG.rag_pipeline.exceptions import LLMUnavailableError, RagPipelineError
 from app.utils.logging_decorators import log_execution_time
+from rnd_connectors.resilience.circuit_breaker import CircuitBreaker, CircuitOpenError
 from rnd_connectors.yandex_llm.client import YaGPTAsyncClient
 from rnd_connectors.yandex_llm.exceptions import YaGPTClientError
 from rnd_connectors.yandex_llm.token_manager import AsyncTokenManager
@@ -33,12 +50,17 @@ class AsyncLLM:
         rnd_token_manager_config: RNDTokenManagerConfig,
         rnd_yandex_config: RNDYandexConfig,
         use_tyk: bool,  # True → TYK режим
+        http_client: httpx.AsyncClient | None = None,  # общий пул соединений (HTTPClientPool)
+        circuit_breaker_config: CircuitBreakerConfig | None = None,  # None/disabled → без circuit breaker
     ) -> None:
         self.epa_config = epa_token_config
         self.tyk_yandex_config = tyk_yandex_config
         self.rnd_token_manager_config = rnd_token_manager_config
         self.rnd_yandex_config = rnd_yandex_config
         self.use_tyk = use_tyk
+        self.circuit_breaker_config = circuit_breaker_config
+        # Потоковая генерация (astream) включается флагом stream в конфиге активного режима
+        self.stream = (self.tyk_yandex_config if self.use_tyk else self.rnd_yandex_config).stream
 
         # объявляем общие типы - mypy не понимает, что они разные
         self.token_manager: EPATokenManager | AsyncTokenManager
@@ -46,21 +68,48 @@ class AsyncLLM:
 
         if self.use_tyk:
             # EPA + TYK
-            self.token_manager = EPATokenManager(self.epa_config)
-            self.client = TYKClient(config=self.tyk_yandex_config, token_manager=self.token_manager)
+            self.token_manager = EPATokenManager(self.epa_config, circuit_breaker=self._circuit_breaker("epa"))
+            self.client = TYKClient(
+                config=self.tyk_yandex_config,
+                token_manager=self.token_manager,
+                http_client=http_client,
+                circuit_breaker=self._circuit_breaker("tyk"),
+            )
             logger.info("AsyncGenerateProcessor initialized in TYK mode")
         else:
             # Прямое подключение к YaGPT через RnD
-            self.token_manager = AsyncTokenManager(config=self.rnd_token_manager_config)
+            self.token_manager = AsyncTokenManager(
+                config=self.rnd_token_manager_config,
+                circuit_breaker=self._circuit_breaker("rnd_token"),
+            )
             self.client = YaGPTAsyncClient(
                 token_manager=self.token_manager,
                 folder_id=self.rnd_yandex_config.folder_id,
                 api_url=self.rnd_yandex_config.api_url,
                 use_ssl=self.rnd_yandex_config.use_ssl,
+                http_client=http_client,
+                circuit_breaker=self._circuit_breaker("yandex"),
             )
             logger.info("AsyncGenerateProcessor initialized in Yandex RnD mode")
 
     # ───────── helpers ─────────
+    def _circuit_breaker(self, backend: str) -> CircuitBreaker | None:
+        config = self.circuit_breaker_config
+        if config is None or not config.enabled:
+            return None
+        return CircuitBreaker(backend, config, on_state_change=prometheus_service.set_circuit_state)
+
+    @property
+    def model_uri(self) -> str:
+        """URI модели активного режима (используется в ключах кэша/метриках)."""
+        return self._model_uri
+
+    @property
+    def temperature(self) -> float:
+        """Температура генерации активного режима."""
+        config = self.tyk_yandex_config if self.use_tyk else self.rnd_yandex_config
+        return config.temperature
+
     @property
     def _model_uri(self) -> str:
         """
@@ -91,7 +140,8 @@ class AsyncLLM:
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=0.5, max=5),
-        retry=retry_if_exception_type(RagPipelineError),
+        # при разомкнутой цепи (LLMUnavailableError) — сразу отказ, без ретраев
+        retry=retry_if_exception_type(RagPipelineError) & retry_if_not_exception_type(LLMUnavailableError),
         reraise=True,
     )
     async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
@@ -101,17 +151,7 @@ class AsyncLLM:
         :param prompt: список сообщений (chat history)
         :return: объект ResponseYAGPTSchema с результатом
         """
-        config = self.tyk_yandex_config if self.use_tyk else self.rnd_yandex_config
-
-        payload: dict[str, Any] = {
-            "modelUri": self._model_uri,
-            "messages": prompt,
-            "completionOptions": {
-                "stream": False,
-                "temperature": config.temperature,
-                "maxTokens": config.max_tokens,
-            },
-        }
+        payload = self._build_payload(prompt, stream=False)
 
         try:
             if self.use_tyk:
@@ -119,6 +159,9 @@ class AsyncLLM:
             else:
                 raw = await self._generate_via_yandex(payload)
 
+        except CircuitOpenError as e:
+            raise LLMUnavailableError(message=f"LLM недоступен: {e}") from e
+
         except (TYKClientError, YaGPTClientError) as e:
             logger.exception("Ошибка при вызове LLM API (%s)", "TYK" if self.use_tyk else "Yandex RnD")
             raise RagPipelineError(
@@ -131,7 +174,66 @@ class AsyncLLM:
                 message=f"Неизвестная ошибка LLM: {e!r}",
             ) from e
 
-        # ───────── парсинг ─────────
+        return self._parse_response(raw)
+
+    async def astream(self, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]:
+        """
+        Потоковая генерация текста.
+
+        Каждый чанк — ResponseYAGPTSchema с накопленным на текущий момент текстом
+        (так отдаёт YaGPT), последний чанк содержит полный ответ.
+        Ретраев нет: уже отданную клиенту часть ответа повторить нельзя.
+
+        :param prompt: список сообщений (chat history)
+        """
+        payload = self._build_payload(prompt, stream=True)
+        start_time = datetime.now()
+
+        try:
+            if self.use_tyk:
+                client: TYKClient = self.client  # type: ignore
+                lines = client.stream_completion(payload)
+            else:
+                yandex_client: YaGPTAsyncClient = self.client  # type: ignore
+                lines = yandex_client.stream(endpoint="completion", payload=payload)
+
+            async for raw in lines:
+                yield self._parse_response(raw)
+
+        except RagPipelineError:
+            raise
+
+        except CircuitOpenError as e:
+            raise LLMUnavailableError(message=f"LLM недоступен: {e}") from e
+
+        except (TYKClientError, YaGPTClientError) as e:
+            logger.exception("Ошибка при потоковом вызове LLM API (%s)", "TYK" if self.use_tyk else "Yandex RnD")
+            raise RagPipelineError(
+                message=f"Ошибка LLM API: {e}",
+            ) from e
+
+        except Exception as e:
+            logger.exception("Неизвестная ошибка при потоковом обращении к LLM API")
+            raise RagPipelineError(
+                message=f"Неизвестная ошибка LLM: {e!r}",
+            ) from e
+
+        logger.info(f"Время выполнения AsyncLLM.astream = {(datetime.now() - start_time).total_seconds()} секунд")
+
+    def _build_payload(self, prompt: list[dict[str, str]], stream: bool) -> dict[str, Any]:
+        config = self.tyk_yandex_config if self.use_tyk else self.rnd_yandex_config
+        return {
+            "modelUri": self._model_uri,
+            "messages": prompt,
+            "completionOptions": {
+                "stream": stream,
+                "temperature": config.temperature,
+                "maxTokens": config.max_tokens,
+            },
+        }
+
+    @staticmethod
+    def _parse_response(raw: Any) -> ResponseYAGPTSchema:
         try:
             result = raw.get("result", raw) if isinstance(raw, dict) else raw
             return ResponseYAGPTSchema(**result)
@@ -161,11 +263,23 @@ class LocalAsyncYandexLLM:
         folder_id: str,
         model: str,
         url: str,
+        http_client: httpx.AsyncClient | None = None,
+        stream: bool = False,
+        temperature: float = 0.82,
+        max_tokens: int = 2000,
     ):
         self._api_key = api_key
         self._folder_id = folder_id
         self.model = model
         self.url = url.rstrip()
+        self.http_client = http_client
+        self.stream = stream
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    @property
+    def model_uri(self) -> str:
+        return f"gpt://{self._folder_id}/{self.model}"
 
     # Конфигурация ретраев
     @retry(
@@ -175,22 +289,13 @@ class LocalAsyncYandexLLM:
         reraise=True,
     )
     async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
-        payload = {
-            "modelUri": f"gpt://{self._folder_id}/{self.model}",
-            "messages": prompt,
-            "completionOptions": {
-                "stream": False,
-                "temperature": 0.82,
-                "maxTokens": 2000,
-            },
-        }
-
+        payload = self._build_payload(prompt, stream=False)
         headers = {"Authorization": f"Api-Key {self._api_key}"}
 
         start_time = datetime.now()
-        async with httpx.AsyncClient(verify=False, timeout=30) as client:
+        async with use_client(self.http_client, verify=False) as client:
             try:
-                resp = await client.post(self.url, headers=headers, json=payload)
+                resp = await client.post(self.url, headers=headers, json=payload, timeout=30)
             except Exception as e:
                 raise RagPipelineError(
                     message=f"Ошибка обработки сообщения к Yandex Llm: {e!r}",
@@ -208,6 +313,45 @@ class LocalAsyncYandexLLM:
         resp_json = resp.json()
         return ResponseYAGPTSchema(**resp_json["result"])
 
+    async def astream(self, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]:
+        """Потоковая генерация: чанки с накопленным текстом (NDJSON от YandexGPT)."""
+        payload = self._build_payload(prompt, stream=True)
+        headers = {"Authorization": f"Api-Key {self._api_key}"}
+
+        start_time = datetime.now()
+        async with use_client(self.http_client, verify=False) as client:
+            try:
+                async with client.stream("POST", self.url, headers=headers, json=payload, timeout=60) as resp:
+                    if resp.status_code != httpx.codes.OK:
+                        await resp.aread()
+                        raise RagPipelineError(
+                            message=f"Ошибка обработки сообщения к Yandex Llm: {resp.status_code}: {resp.text}",
+                        )
+                    async for line in resp.aiter_lines():
+                        if line.strip():
+                            yield ResponseYAGPTSchema(**json.loads(line)["result"])
+            except RagPipelineError:
+                raise
+            except Exception as e:
+                raise RagPipelineError(
+                    message=f"Ошибка обработки сообщения к Yandex Llm: {e!r}",
+                ) from e
+
+        logger.info(
+            f"Время выполнения LocalYandexGPT.astream = {(datetime.now() - start_time).total_seconds()} секунд",
+        )
+
+    def _build_payload(self, prompt: list[dict[str, str]], stream: bool) -> dict[str, Any]:
+        return {
+            "modelUri": self.model_uri,
+            "messages": prompt,
+            "completionOptions": {
+                "stream": stream,
+                "temperature": self.temperature,
+                "maxTokens": self.max_tokens,
+            },
+        }
+
 
 class LocalAsyncOllamaLLM:
     """
@@ -223,6 +367,8 @@ class LocalAsyncOllamaLLM:
         base_url: str = "http://127.0.0.1:11434",
         temperature: float = 0.82,
         max_tokens: int = 2000,
+        http_client: httpx.AsyncClient | None = None,
+        stream: bool = False,
     ):
         """
         Инициализация Ollama LLM.
@@ -232,12 +378,20 @@ class LocalAsyncOllamaLLM:
             base_url: URL Ollama сервера (по умолчанию localhost)
             temperature: Температура генерации (0-1)
             max_tokens: Максимальное количество токенов в ответе
+            http_client: Общий httpx.AsyncClient из HTTPClientPool (None → клиент на каждый запрос)
+            stream: Использовать потоковую генерацию (astream) в узле ответа
         """
         self.model = model
         self.base_url = base_url.rstrip("/")
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.url = f"{self.base_url}/api/chat"  # Ollama chat endpoint
+        self.http_client = http_client
+        self.stream = stream
+
+    @property
+    def model_uri(self) -> str:
+        return f"ollama://{self.model}"
 
     @retry(
         stop=stop_after_attempt(3),
@@ -272,9 +426,9 @@ class LocalAsyncOllamaLLM:
         }
 
         start_time = datetime.now()
-        async with httpx.AsyncClient(verify=False, timeout=60) as client:
+        async with use_client(self.http_client, verify=False) as client:
             try:
-                resp = await client.post(self.url, json=payload)
+                resp = await client.post(self.url, json=payload, timeout=60)
             except Exception as e:
                 raise RagPipelineError(
                     message=f"Ошибка обработки сообщения к Ollama: {e!r}",
@@ -310,3 +464,56 @@ class LocalAsyncOllamaLLM:
             ],
             modelVersion=response_model,
         )
+
+    async def astream(self, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]:
+        """
+        Потоковая генерация от Ollama.
+
+        Ollama присылает дельты, а не накопленный текст — накапливаем сами,
+        чтобы чанки совпадали по смыслу с YandexGPT (каждый несёт весь текст на текущий момент).
+        """
+        messages = [{"role": m["role"], "content": m["text"]} for m in prompt]
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": True,
+            "options": {
+                "temperature": self.temperature,
+                "num_predict": self.max_tokens,
+            },
+        }
+
+        text = ""
+        start_time = datetime.now()
+        async with use_client(self.http_client, verify=False) as client:
+            try:
+                async with client.stream("POST", self.url, json=payload, timeout=60) as resp:
+                    if resp.status_code != httpx.codes.OK:
+                        await resp.aread()
+                        raise RagPipelineError(
+                            message=f"Ошибка обработки сообщения к Ollama: {resp.status_code}: {resp.text}",
+                        )
+                    async for line in resp.aiter_lines():
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        text += chunk.get("message", {}).get("content", "")
+                        yield ResponseYAGPTSchema(
+                            alternatives=[
+                                AlternativesSchema(
+                                    message=MessageSchema(role="assistant", text=text),
+                                    status="ok" if chunk.get("done") else "partial",
+                                ),
+                            ],
+                            modelVersion=chunk.get("model", self.model),
+                        )
+            except RagPipelineError:
+                raise
+            except Exception as e:
+                raise RagPipelineError(
+                    message=f"Ошибка обработки сообщения к Ollama: {e!r}",
+                ) from e
+
+        logger.info(
+            f"Время выполнения LocalAsyncOllamaLLM.astream = {(datetime.now() - start_time).total_seconds():.3f} сек",
+        )
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import json
+import logging
+from collections.abc import AsyncIterator
+from typing import Any, Protocol
+
+from app.core.config import LLMMemoConfig
+from app.services.prometheus_service import prometheus_service
+from app.services.RAG.llm.protocols import AsyncLLMProtocol
+from app.services.RAG.llm.schemas import ResponseYAGPTSchema
+from app.services.RAG.llm.wrapper import LLMWrapper
+from app.services.RAG.rag_pipeline.cache.lru import LRUCache
+from rnd_connectors.redis.base import AsyncRedisClient
+
+logger = logging.getLogger(__name__)
+
+
+class MemoBackend(Protocol):
+    """Хранилище мемоизированных ответов LLM (ключ → ResponseYAGPTSchema.model_dump())."""
+
+    async def get(self, key: str) -> dict[str, Any] | None: ...
+
+    async def set(self, key: str, value: dict[str, Any]) -> None: ...
+
+
+class InMemoryMemoBackend:
+    """In-process LRU с TTL."""
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self._cache: LRUCache[dict[str, Any]] = LRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: dict[str, Any]) -> None:
+        self._cache.set(key, value)
+
+
+class RedisMemoBackend:
+    """Redis (общий для реплик); TTL задаётся expiration клиента."""
+
+    def __init__(self, redis: AsyncRedisClient, key_prefix: str) -> None:
+        self.redis = redis
+        self.key_prefix = key_prefix
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        cached = await self.redis.get(f"{self.key_prefix}:{key}")
+        return cached["response"] if cached else None
+
+    async def set(self, key: str, value: dict[str, Any]) -> None:
+        await self.redis.set(f"{self.key_prefix}:{key}", {"response": value})
+
+
+class MemoizedLLM(LLMWrapper):
+    """
+    Мемоизация вызовов LLM по хэшу (model URI, temperature, messages).
+
+    - Температура выше max_temperature → вызов без кэша (ответ недетерминирован);
+    - одинаковые одновременные вызовы схлопываются в один запрос (single-flight);
+    - ошибки бэкенда не ломают генерацию — логируются, вызов идёт в LLM.
+    """
+
+    def __init__(
+        self,
+        llm: AsyncLLMProtocol,
+        backend: MemoBackend,
+        config: LLMMemoConfig,
+        node: str = "default",
+    ) -> None:
+        super().__init__(llm)
+        self.backend = backend
+        self.config = config
+        self.node = node
+        self._inflight: dict[str, asyncio.Future[ResponseYAGPTSchema]] = {}
+
+    def make_key(self, prompt: list[dict[str, str]]) -> str:
+        raw = json.dumps(
+            {"model": self.model_uri, "temperature": self.temperature, "messages": prompt},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @property
+    def _bypass(self) -> bool:
+        return self.temperature > self.config.max_temperature
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        if self._bypass:
+            self._record("bypass")
+            return await self.llm.generate(prompt)
+
+        key = self.make_key(prompt)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._record("hit")
+            return await asyncio.shield(inflight)
+
+        cached = await self._lookup(key)
+        if cached is not None:
+            return cached
+
+        future: asyncio.Future[ResponseYAGPTSchema] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self.llm.generate(prompt)
+            future.set_result(response)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # ожидающие получат исключение; если их нет — не шумим "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        await self._store(key, response)
+        return response
+
+    async def astream(self, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]:
+        if self._bypass:
+            self._record("bypass")
+            async for chunk in self.llm.astream(prompt):
+                yield chunk
+            return
+
+        key = self.make_key(prompt)
+        cached = await self._lookup(key)
+        if cached is not None:
+            yield cached
+            return
+
+        last: ResponseYAGPTSchema | None = None
+        async for chunk in self.llm.astream(prompt):
+            last = chunk
+            yield chunk
+        if last is not None:
+            await self._store(key, last)
+
+    async def _lookup(self, key: str) -> ResponseYAGPTSchema | None:
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"⚠️ [{self.node}] Ошибка чтения мемо-кэша LLM: {e!r}")
+            cached = None
+
+        if cached is None:
+            self._record("miss")
+            return None
+        self._record("hit")
+        logger.info(f"⚡ [{self.node}] Ответ LLM взят из мемо-кэша")
+        return ResponseYAGPTSchema(**cached)
+
+    async def _store(self, key: str, response: ResponseYAGPTSchema) -> None:
+        try:
+            await self.backend.set(key, response.model_dump())
+        except Exception as e:
+            logger.warning(f"⚠️ [{self.node}] Ошибка записи в мемо-кэш LLM: {e!r}")
+
+    def _record(self, result: str) -> None:
+        prometheus_service.increment_llm_memo(node=self.node, result=result)
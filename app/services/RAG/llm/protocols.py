@@ -0,0 +1,21 @@
+from collections.abc import AsyncIterator
+from typing import Protocol
+
+from app.services.RAG.llm.schemas import ResponseYAGPTSchema
+
+
+class AsyncLLMProtocol(Protocol):
+    """Общий интерфейс LLM для узлов графа (AsyncLLM, локальные LLM и обёртки над ними)."""
+
+    @property
+    def stream(self) -> bool: ...
+
+    @property
+    def model_uri(self) -> str: ...
+
+    @property
+    def temperature(self) -> float: ...
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema: ...
+
+    def astream(self, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]: ...
@@ -0,0 +1,158 @@
+import logging
+import time
+from collections.abc import AsyncIterator
+
+from app.core.config import LLMRouterConfig
+from app.services.prometheus_service import prometheus_service
+from app.services.RAG.llm.protocols import AsyncLLMProtocol
+from app.services.RAG.llm.schemas import ResponseYAGPTSchema
+
+logger = logging.getLogger(__name__)
+
+
+class BackendStats:
+    """EWMA задержки успешных вызовов и доли ошибок одного бэкенда."""
+
+    def __init__(self, alpha: float, ttl_seconds: float) -> None:
+        self.alpha = alpha
+        self.ttl_seconds = ttl_seconds
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self._updated_at = 0.0
+
+    def record(self, latency: float, ok: bool) -> None:
+        if ok:
+            self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+        self.error_rate = self.alpha * (0.0 if ok else 1.0) + (1 - self.alpha) * self.error_rate
+        self._updated_at = time.monotonic()
+
+    def score(self, error_penalty: float) -> float:
+        """Чем меньше, тем лучше; устаревшая статистика сбрасывается — бэкенд снова получает пробный вызов."""
+        if self._updated_at and time.monotonic() - self._updated_at > self.ttl_seconds:
+            self.latency = None
+            self.error_rate = 0.0
+            self._updated_at = 0.0
+        return (self.latency or 0.0) + error_penalty * self.error_rate
+
+
+class LLMRouter:
+    """
+    Роутер вызовов LLM между несколькими бэкендами (удалённый YandexGPT, локальная Ollama и т.п.).
+
+    - для узла берутся бэкенды из политики node_backends (порядок = предпочтение), иначе — все;
+    - оценка бэкенда = EWMA задержки + error_penalty_seconds * EWMA доли ошибок;
+    - вызов идёт в предпочтительный бэкенд, пока другой не лучше его в switch_ratio раз
+      (ещё не измеренный бэкенд имеет оценку 0 и так получает пробный вызов);
+    - при ошибке вызов повторяется на следующем бэкенде (failover), по возрастанию оценки.
+
+    Статистика общая для всех узлов: бэкенд, деградировавший на одном узле, обходят и остальные.
+    """
+
+    def __init__(self, backends: dict[str, AsyncLLMProtocol], config: LLMRouterConfig) -> None:
+        if not backends:
+            raise ValueError("LLMRouter: нужен хотя бы один бэкенд")
+        unknown = {name for names in config.node_backends.values() for name in names} - backends.keys()
+        if unknown:
+            raise ValueError(f"LLM_ROUTER__NODE_BACKENDS: неизвестные бэкенды {sorted(unknown)}")
+        self.backends = backends
+        self.config = config
+        self.stats = {name: BackendStats(config.ewma_alpha, config.stats_ttl_seconds) for name in backends}
+
+    def candidates(self, node: str) -> list[str]:
+        return self.config.node_backends.get(node) or list(self.backends)
+
+    def order(self, node: str) -> list[str]:
+        """Порядок попыток для узла: выбранный бэкенд, затем (при failover) остальные по оценке."""
+        candidates = self.candidates(node)
+        scores = {name: self.stats[name].score(self.config.error_penalty_seconds) for name in candidates}
+        chosen = candidates[0]
+        for name in candidates[1:]:
+            if scores[name] * self.config.switch_ratio < scores[chosen]:
+                chosen = name
+        if not self.config.failover:
+            return [chosen]
+        return [chosen, *sorted((name for name in candidates if name != chosen), key=scores.__getitem__)]
+
+    def record(self, backend: str, node: str, latency: float, ok: bool) -> None:
+        self.stats[backend].record(latency, ok)
+        prometheus_service.increment_llm_router_calls(backend=backend, node=node, status="success" if ok else "error")
+
+    def for_node(self, node: str) -> "RoutedLLM":
+        return RoutedLLM(self, node)
+
+
+class RoutedLLM:
+    """LLM узла графа поверх LLMRouter (интерфейс AsyncLLMProtocol)."""
+
+    def __init__(self, router: LLMRouter, node: str) -> None:
+        self.router = router
+        self.node = node
+        # stream/model_uri/temperature — от предпочтительного бэкенда узла
+        self._preferred = router.backends[router.candidates(node)[0]]
+
+    @property
+    def stream(self) -> bool:
+        return self._preferred.stream
+
+    @property
+    def model_uri(self) -> str:
+        return self._preferred.model_uri
+
+    @property
+    def temperature(self) -> float:
+        return self._preferred.temperature
+
+    def _failover(self, backend: str, error: Exception) -> None:
+        prometheus_service.increment_llm_router_failovers(node=self.node)
+        logger.warning(f"⚠️ [{self.node}] Ошибка бэкенда LLM {backend}: {error!r} — пробуем следующий")
+
+    async def _generate(self, backend: str, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        started = time.perf_counter()
+        try:
+            response = await self.router.backends[backend].generate(prompt)
+        except Exception:
+            self.router.record(backend, self.node, time.perf_counter() - started, ok=False)
+            raise
+        self.router.record(backend, self.node, time.perf_counter() - started, ok=True)
+        return response
+
+    async def _astream(self, backend: str, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]:
+        # задержка потока — время до первого чанка
+        started = time.perf_counter()
+        first_chunk = True
+        try:
+            async for chunk in self.router.backends[backend].astream(prompt):
+                if first_chunk:
+                    first_chunk = False
+                    self.router.record(backend, self.node, time.perf_counter() - started, ok=True)
+                yield chunk
+        except Exception:
+            self.router.record(backend, self.node, time.perf_counter() - started, ok=False)
+            raise
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        *failover_backends, last = self.router.order(self.node)
+        for backend in failover_backends:
+            try:
+                return await self._generate(backend, prompt)
+            except Exception as e:
+                self._failover(backend, e)
+        return await self._generate(last, prompt)
+
+    async def astream(self, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]:
+        *failover_backends, last = self.router.order(self.node)
+        for backend in failover_backends:
+            started = False
+            try:
+                async for chunk in self._astream(backend, prompt):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                # уже отданную часть ответа с другого бэкенда не продолжить
+                if started:
+                    raise
+                self._failover(backend, e)
+                continue
+            return
+        async for chunk in self._astream(last, prompt):
+            yield chunk
@@ -0,0 +1,35 @@
+from collections.abc import AsyncIterator
+
+from app.services.RAG.llm.protocols import AsyncLLMProtocol
+from app.services.RAG.llm.schemas import ResponseYAGPTSchema
+
+
+class LLMWrapper:
+    """
+    Базовая обёртка над LLM: делегирует всё во вложенную модель.
+
+    Наследники переопределяют generate/astream, добавляя поведение (кэш, лимиты и т.п.);
+    обёртки можно вкладывать друг в друга.
+    """
+
+    def __init__(self, llm: AsyncLLMProtocol) -> None:
+        self.llm = llm
+
+    @property
+    def stream(self) -> bool:
+        return self.llm.stream
+
+    @property
+    def model_uri(self) -> str:
+        return self.llm.model_uri
+
+    @property
+    def temperature(self) -> float:
+        return self.llm.temperature
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        return await self.llm.generate(prompt)
+
+    async def astream(self, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]:
+        async for chunk in self.llm.astream(prompt):
+            yield chunk
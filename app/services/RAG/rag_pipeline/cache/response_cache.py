@@ -0,0 +1,149 @@
+import hashlib
+import logging
+import re
+import time
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import ResponseCacheConfig
+from app.services.prometheus_service import prometheus_service
+from app.services.RAG.rag_pipeline.cache.lru import LRUCache
+from rnd_connectors.redis.base import AsyncRedisClient
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.,;:…]+$")
+
+
+class SemanticResponseCache:
+    """
+    Кэш готовых ответов RAG перед RAGPipeline.query.
+
+    Уровни поиска:
+    1. L1 — in-process LRU по нормализованному вопросу;
+    2. Redis — общий для всех реплик, по тому же ключу (TTL + ограничение размера через индекс ZSET);
+    3. семантический — косинусная близость эмбеддинга вопроса к вопросам из L1 (если переданы embeddings).
+
+    Ошибки кэша не должны ронять обработку запроса — вызывающий код логирует и идёт в пайплайн.
+    """
+
+    def __init__(
+        self,
+        config: ResponseCacheConfig,
+        redis: AsyncRedisClient | None = None,
+        embeddings: Embeddings | None = None,
+    ) -> None:
+        self.config = config
+        self.redis = redis
+        self.embeddings = embeddings if config.semantic_enabled else None
+        self._l1: LRUCache[dict[str, Any]] = LRUCache(max_size=config.l1_max_size, ttl_seconds=config.ttl_seconds)
+        # эмбеддинги вопросов, посчитанные при промахе — чтобы не считать повторно в set()
+        self._pending_vectors: LRUCache[np.ndarray] = LRUCache(max_size=256, ttl_seconds=config.ttl_seconds)
+
+    # ───────── helpers ─────────
+    @staticmethod
+    def normalize(question: str) -> str:
+        """Нормализует вопрос: регистр, ё→е, пробелы, хвостовая пунктуация."""
+        normalized = question.lower().replace("ё", "е")
+        normalized = _WHITESPACE_RE.sub(" ", normalized).strip()
+        return _TRAILING_PUNCT_RE.sub("", normalized)
+
+    def _key(self, normalized: str) -> str:
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"{self.config.key_prefix}:{digest}"
+
+    @property
+    def _index_key(self) -> str:
+        return f"{self.config.key_prefix}:index"
+
+    # ───────── main ─────────
+    async def get(self, question: str) -> str | None:
+        """Возвращает закэшированный ответ или None."""
+        normalized = self.normalize(question)
+        key = self._key(normalized)
+
+        entry = self._l1.get(key)
+        if entry is not None:
+            self._record("hit", "l1")
+            return entry["answer"]
+
+        if self.redis is not None:
+            cached = await self.redis.get(key)
+            if cached is not None:
+                vector = await self._embed(normalized)
+                self._l1.set(key, {"question": normalized, "answer": cached["answer"], "vector": vector})
+                self._record("hit", "redis")
+                return cached["answer"]
+
+        if self.embeddings is not None:
+            answer = await self._semantic_lookup(normalized)
+            if answer is not None:
+                self._record("hit", "semantic")
+                return answer
+
+        self._record("miss", "none")
+        return None
+
+    async def set(self, question: str, answer: str) -> None:
+        """Сохраняет ответ в L1 и Redis."""
+        normalized = self.normalize(question)
+        key = self._key(normalized)
+
+        vector = self._pending_vectors.get(normalized)
+        if vector is None:
+            vector = await self._embed(normalized)
+        self._pending_vectors.delete(normalized)
+        self._l1.set(key, {"question": normalized, "answer": answer, "vector": vector})
+
+        if self.redis is not None:
+            await self.redis.set(key, {"question": normalized, "answer": answer})
+            await self._evict_redis(key)
+
+    async def _semantic_lookup(self, normalized: str) -> str | None:
+        vector = await self._embed(normalized)
+        if vector is None:
+            return None
+        self._pending_vectors.set(normalized, vector)
+
+        best_score = -1.0
+        best_answer: str | None = None
+        for _, entry in self._l1.items():
+            candidate = entry.get("vector")
+            if candidate is None:
+                continue
+            score = float(np.dot(vector, candidate))
+            if score > best_score:
+                best_score, best_answer = score, entry["answer"]
+
+        if best_answer is not None and best_score >= self.config.similarity_threshold:
+            logger.info(f"🎯 Семантическое попадание в кэш ответов: similarity={best_score:.3f}")
+            return best_answer
+        return None
+
+    async def _embed(self, text: str) -> np.ndarray | None:
+        """Нормированный эмбеддинг (скалярное произведение = косинусная близость)."""
+        if self.embeddings is None:
+            return None
+        vector = np.asarray(await self.embeddings.aembed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def _evict_redis(self, key: str) -> None:
+        """Держит в Redis не больше max_size ответов: вытесняются самые старые по времени записи."""
+        assert self.redis is not None
+        now = time.time()
+        await self.redis.zadd(self._index_key, {key: now})
+        # записи, истёкшие по TTL, убираем из индекса
+        await self.redis.zremrangebyscore(self._index_key, 0, now - self.config.ttl_seconds)
+        overflow = await self.redis.zcard(self._index_key) - self.config.max_size
+        if overflow > 0:
+            evicted = [member for member, _ in await self.redis.zpopmin(self._index_key, overflow)]
+            await self.redis.delete(*evicted)
+            logger.debug(f"🧹 Кэш ответов: вытеснено {len(evicted)} записей из Redis")
+
+    @staticmethod
+    def _record(result: str, level: str) -> None:
+        prometheus_service.increment_response_cache(result=result, level=level)
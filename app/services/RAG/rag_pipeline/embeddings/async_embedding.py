@@ -0,0 +1,159 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import EmbeddingConfig
+from app.services.prometheus_service import prometheus_service
+from app.services.RAG.rag_pipeline.embeddings.embedding import Embedding
+from app.services.RAG.rag_pipeline.exceptions import RagPipelineError
+
+logger = logging.getLogger(__name__)
+
+Operation = Literal["query", "documents"]
+
+# модель внутри процесса-воркера (executor="process")
+_worker_embeddings: Embeddings | None = None
+
+
+def _set_torch_threads(num_threads: int | None) -> None:
+    if num_threads is None:
+        return
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+
+def _init_process_worker(config: EmbeddingConfig) -> None:
+    global _worker_embeddings  # noqa: PLW0603
+    _set_torch_threads(config.torch_num_threads)
+    _worker_embeddings = Embedding(config).embeddings
+
+
+_EmbedResult = tuple[list[list[float]], float, float]
+
+
+def _embed_in_worker(operation: Operation, texts: list[str], submitted_at: float) -> _EmbedResult:
+    """Выполняется в процессе-воркере; возвращает (векторы, ожидание в очереди, время расчёта)."""
+    assert _worker_embeddings is not None
+    return _embed(_worker_embeddings, operation, texts, submitted_at)
+
+
+def _embed(
+    embeddings: Embeddings,
+    operation: Operation,
+    texts: list[str],
+    submitted_at: float,
+) -> _EmbedResult:
+    # time.time(), а не perf_counter: отметка переходит между процессами
+    started_at = time.time()
+    if operation == "query":
+        vectors = [embeddings.embed_query(texts[0])]
+    else:
+        vectors = embeddings.embed_documents(texts)
+    return vectors, started_at - submitted_at, time.time() - started_at
+
+
+class AsyncEmbedding(Embeddings):
+    """
+    Embedding с инференсом в выделенном executor-е (event loop не блокируется).
+
+    - executor="thread" — пул потоков (torch_num_threads ограничивает intra-op потоки torch);
+    - executor="process" — пул процессов с моделью в каждом воркере (изоляция от GIL и падений);
+    - в executor одновременно не больше max_queue_depth задач, остальные ждут не дольше queue_timeout_seconds
+      (отдельно для async- и sync-вызовов: sync ждёт слот в своём потоке, не блокируя event loop);
+    - время ожидания в очереди и время расчёта пишутся в метрики раздельно.
+    """
+
+    def __init__(self, config: EmbeddingConfig, embeddings: Embeddings | None = None) -> None:
+        """
+        :param embeddings: готовая модель для executor="thread" (None — создаётся из config через Embedding)
+        """
+        self.config = config
+        self._embeddings: Embeddings | None = None
+        self._executor: Executor
+        if config.executor == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=config.executor_workers,
+                initializer=_init_process_worker,
+                initargs=(config,),
+            )
+        else:
+            self._embeddings = embeddings if embeddings is not None else Embedding(config).embeddings
+            self._executor = ThreadPoolExecutor(
+                max_workers=config.executor_workers,
+                thread_name_prefix="embedding",
+                initializer=_set_torch_threads,
+                initargs=(config.torch_num_threads,),
+            )
+        self._slots = asyncio.Semaphore(config.max_queue_depth)
+        self._sync_slots = threading.BoundedSemaphore(config.max_queue_depth)
+
+    # ───────── sync (вызывающий поток) ─────────
+    def embed_query(self, text: str) -> list[float]:
+        return self._submit_sync("query", [text])[0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._submit_sync("documents", texts)
+
+    # ───────── async ─────────
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self._submit("query", [text]))[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        return await self._submit("documents", texts)
+
+    async def _submit(self, operation: Operation, texts: list[str]) -> list[list[float]]:
+        submitted_at = time.time()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.config.queue_timeout_seconds)
+        except TimeoutError as e:
+            raise self._rejected(operation) from e
+
+        try:
+            loop = asyncio.get_running_loop()
+            vectors, queue_wait, compute = await loop.run_in_executor(
+                self._executor,
+                self._task(operation, texts, submitted_at),
+            )
+        finally:
+            self._slots.release()
+        self._record(operation, queue_wait, compute)
+        return vectors
+
+    def _submit_sync(self, operation: Operation, texts: list[str]) -> list[list[float]]:
+        submitted_at = time.time()
+        if not self._sync_slots.acquire(timeout=self.config.queue_timeout_seconds):
+            raise self._rejected(operation)
+        try:
+            future = self._executor.submit(self._task(operation, texts, submitted_at))
+            vectors, queue_wait, compute = future.result()
+        finally:
+            self._sync_slots.release()
+        self._record(operation, queue_wait, compute)
+        return vectors
+
+    def _rejected(self, operation: Operation) -> RagPipelineError:
+        prometheus_service.increment_embedding_rejected(operation=operation)
+        return RagPipelineError(message=f"Очередь эмбеддингов переполнена (> {self.config.max_queue_depth} задач)")
+
+    def _task(self, operation: Operation, texts: list[str], submitted_at: float) -> Callable[[], _EmbedResult]:
+        # partial от модульных функций — сериализуется для ProcessPoolExecutor
+        if self._embeddings is None:
+            return functools.partial(_embed_in_worker, operation, texts, submitted_at)
+        return functools.partial(_embed, self._embeddings, operation, texts, submitted_at)
+
+    @staticmethod
+    def _record(operation: Operation, queue_wait: float, compute: float) -> None:
+        prometheus_service.record_embedding_timings(operation=operation, queue_wait=queue_wait, compute=compute)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
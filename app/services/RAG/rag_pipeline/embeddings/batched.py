@@ -0,0 +1,36 @@
+from langchain_core.embeddings import Embeddings
+
+from app.services.RAG.rag_pipeline.utils.micro_batcher import MicroBatcher
+
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Embeddings, собирающие aembed_query конкурентных запросов в общие батчи (MicroBatcher).
+
+    Батч считается одним aembed_documents вложенной модели: Embedding не задаёт
+    отдельные query_encode_kwargs, поэтому эмбеддинги запроса и документа совпадают.
+    Синхронные методы и aembed_documents (уже батч) делегируются без изменений.
+    """
+
+    def __init__(self, embeddings: Embeddings, max_batch_size: int, max_wait_ms: float) -> None:
+        if getattr(embeddings, "query_encode_kwargs", None):
+            raise ValueError("BatchedEmbeddings не поддерживает отдельные query_encode_kwargs")
+        self.embeddings = embeddings
+        self._batcher: MicroBatcher[str, list[float]] = MicroBatcher(
+            embeddings.aembed_documents,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name="embeddings",
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self._batcher.submit(text)
@@ -0,0 +1,289 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.services.RAG.rag_pipeline.cache.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class MemmapVectorStore:
+    """
+    Персистентное content-addressed хранилище векторов на диске.
+
+    - vectors.bin — np.memmap (capacity x dim) float32/float16, строка = вектор;
+    - keys.txt — ключи по строкам (номер строки = номер вектора), дописывается после записи вектора,
+      поэтому оборванная запись не даёт ключа на мусорный вектор;
+    - meta.json — dim/dtype/capacity; при несовпадении dtype/capacity (другие настройки) или dim
+      (другая модель под тем же именем — выясняется при первой записи) хранилище пересоздаётся.
+
+    set() не трогает диск: вектор попадает в очередь, фоновый поток пишет накопленные векторы
+    пачкой — один flush memmap-а и одна дозапись keys.txt на пачку (event loop не блокируется).
+    Один процесс-писатель на каталог. При заполнении capacity новые векторы на диск не пишутся.
+    """
+
+    def __init__(self, directory: Path, dtype: Literal["float32", "float16"], capacity: int) -> None:
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self._index: dict[str, int] = {}
+        self._vectors: np.memmap | None = None
+        self._dim: int | None = None
+        self._full_logged = False
+        # очередь записи: key → vector (ещё не на диске, но уже отдаётся из get)
+        self._pending: dict[str, list[float]] = {}
+        self._cond = threading.Condition()
+        self._writing = False
+        self._closing = False
+        self._writer: threading.Thread | None = None
+        self._open_existing()
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / "meta.json"
+
+    @property
+    def _keys_path(self) -> Path:
+        return self.directory / "keys.txt"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.directory / "vectors.bin"
+
+    def _open_existing(self) -> None:
+        if not self._meta_path.exists():
+            return
+        meta = json.loads(self._meta_path.read_text())
+        if meta.get("dtype") != self.dtype.name or meta.get("capacity") != self.capacity or not meta.get("dim"):
+            logger.warning(f"⚠️ Кэш эмбеддингов {self.directory}: настройки изменились, хранилище пересоздаётся")
+            self._reset()
+            return
+
+        self._dim = int(meta["dim"])
+        self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r+", shape=(self.capacity, self._dim))
+        if self._keys_path.exists():
+            keys = self._keys_path.read_text().splitlines()
+            self._index = {key: row for row, key in enumerate(keys[: self.capacity]) if key}
+        logger.info(f"💾 Кэш эмбеддингов {self.directory}: загружено {len(self._index)} векторов")
+
+    def _reset(self) -> None:
+        """Удаляет файлы хранилища; следующая запись создаёт его заново."""
+        self._vectors = None
+        self._dim = None
+        self._index = {}
+        self._full_logged = False
+        for path in (self._meta_path, self._keys_path, self._vectors_path):
+            path.unlink(missing_ok=True)
+
+    def _create(self, dim: int) -> np.memmap:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._dim = dim
+        vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="w+", shape=(self.capacity, dim))
+        self._keys_path.write_text("")
+        self._meta_path.write_text(json.dumps({"dim": dim, "dtype": self.dtype.name, "capacity": self.capacity}))
+        return vectors
+
+    def get(self, key: str) -> list[float] | None:
+        with self._cond:
+            pending = self._pending.get(key)
+            row = self._index.get(key)
+            vectors = self._vectors
+        if pending is not None:
+            return pending
+        if row is None or vectors is None:
+            return None
+        return vectors[row].astype(np.float32).tolist()
+
+    def set(self, key: str, vector: list[float]) -> None:
+        """Ставит вектор в очередь фоновой записи (без дискового I/O в вызывающем потоке)."""
+        with self._cond:
+            if self._closing or key in self._index or key in self._pending:
+                return
+            self._pending[key] = vector
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="embedding-cache-writer", daemon=True)
+                self._writer.start()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                self._writing = True
+            try:
+                self._write_batch(batch)
+            except OSError as e:
+                logger.warning(f"⚠️ Ошибка записи в дисковый кэш эмбеддингов: {e!r}")
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _write_batch(self, batch: dict[str, list[float]]) -> None:
+        """Пишет пачку векторов: строки memmap → один flush → одна дозапись keys.txt → индекс."""
+        if self._dim is not None and any(len(vector) != self._dim for vector in batch.values()):
+            logger.warning(
+                f"⚠️ Кэш эмбеддингов {self.directory}: размерность векторов изменилась "
+                f"({self._dim} → {len(next(iter(batch.values())))}), хранилище пересоздаётся",
+            )
+            with self._cond:
+                self._reset()
+        if self._vectors is None:
+            vectors = self._create(len(next(iter(batch.values()))))
+            with self._cond:
+                self._vectors = vectors
+
+        written: dict[str, int] = {}
+        row = len(self._index)
+        for key, vector in batch.items():
+            if len(vector) != self._dim:
+                continue
+            if row >= self.capacity:
+                if not self._full_logged:
+                    logger.warning(
+                        f"⚠️ Кэш эмбеддингов {self.directory} заполнен ({self.capacity}), запись на диск остановлена",
+                    )
+                    self._full_logged = True
+                break
+            self._vectors[row] = np.asarray(vector, dtype=self.dtype)
+            written[key] = row
+            row += 1
+        if not written:
+            return
+
+        self._vectors.flush()
+        with self._keys_path.open("a") as keys_file:
+            keys_file.write("".join(f"{key}\n" for key in written))
+        with self._cond:
+            self._index.update(written)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Ждёт, пока очередь записи опустеет; False — не успели за timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout=timeout)
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Дописывает очередь (не дольше timeout) и останавливает фоновый поток."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            writer = self._writer
+        if writer is not None:
+            writer.join(timeout)
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._index) + len(self._pending)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Кэширующие Embeddings: ключ — (имя модели, sha256 нормализованного текста).
+
+    Уровни: in-memory LRU → MemmapVectorStore на диске (переживает рестарт) → вложенная модель.
+    Нормализация — только пробелы (strip + схлопывание), регистр сохраняется: он влияет на эмбеддинг.
+    Запросы и документы кэшируются под одним ключом — Embedding кодирует их одинаково.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        max_size: int,
+        store: MemmapVectorStore | None = None,
+    ) -> None:
+        """
+        :param store: дисковое хранилище (None — только in-memory LRU)
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.store = store
+        self._lru: LRUCache[list[float]] = LRUCache(max_size=max_size)
+        # sync-методы могут вызываться из потоков (например, из executor-а langchain)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return _WHITESPACE_RE.sub(" ", text).strip()
+
+    def make_key(self, text: str) -> str:
+        raw = f"{self.model_name}\x00{self.normalize(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> list[float] | None:
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is None and self.store is not None:
+                vector = self.store.get(key)
+                if vector is not None:
+                    self._lru.set(key, vector)
+            return vector
+
+    def _save(self, key: str, vector: list[float]) -> None:
+        with self._lock:
+            self._lru.set(key, vector)
+            if self.store is not None:
+                # запись на диск — в фоновом потоке хранилища
+                self.store.set(key, vector)
+
+    # ───────── query ─────────
+    def embed_query(self, text: str) -> list[float]:
+        key = self.make_key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._save(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self.make_key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            self._save(key, vector)
+        return vector
+
+    # ───────── documents ─────────
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, vectors, missing = self._lookup_many(texts)
+        if missing:
+            self._fill(keys, vectors, missing, self.embeddings.embed_documents([texts[i] for i in missing]))
+        return vectors  # type: ignore[return-value]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, vectors, missing = self._lookup_many(texts)
+        if missing:
+            computed = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            self._fill(keys, vectors, missing, computed)
+        return vectors  # type: ignore[return-value]
+
+    def _lookup_many(self, texts: list[str]) -> tuple[list[str], list[list[float] | None], list[int]]:
+        """Ключи, найденные векторы (None — промах) и индексы промахов (считаются одним батчем)."""
+        keys = [self.make_key(text) for text in texts]
+        vectors = [self._lookup(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        return keys, vectors, missing
+
+    def _fill(
+        self,
+        keys: list[str],
+        vectors: list[list[float] | None],
+        missing: list[int],
+        computed: list[list[float]],
+    ) -> None:
+        for i, vector in zip(missing, computed, strict=True):
+            vectors[i] = vector
+            self._save(keys[i], vector)
@@ -1,15 +1,21 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+from typing import TYPE_CHECKING
 
 from app.core.config import EmbeddingConfig
 
+if TYPE_CHECKING:
+    from langchain_huggingface import HuggingFaceEmbeddings
+
 
 class Embedding:
     def __init__(self, config: EmbeddingConfig):
         self.config = config
         self.model_kwargs = {"device": config.device}
+        # тяжёлый импорт (sentence-transformers, torch) — только при создании модели
+        from langchain_huggingface import HuggingFaceEmbeddings
+
         self.embeddings = HuggingFaceEmbeddings(
             **{"model_name": self.config.model, "model_kwargs": self.model_kwargs},
         )
 
-    def get_embeddings_model(self) -> HuggingFaceEmbeddings:
+    def get_embeddings_model(self) -> "HuggingFaceEmbeddings":
         return self.embeddings
@@ -5,3 +5,9 @@ class RagPipelineError(Exception):
 
     def __init__(self, message: str = ""):
         self.message = message
+
+
+class LLMUnavailableError(RagPipelineError):
+    """
+    Бэкенд LLM недоступен (circuit breaker разомкнут) — ретраи не выполняются.
+    """
@@ -1,20 +1,22 @@
 import logging
 
-from IPython.display import Image, display
-
-# from langchain_community.vectorstores import OpenSearchVectorSearch
-# from langchain_huggingface import HuggingFaceEmbeddings
 from langgraph.constants import END, START
 from langgraph.graph import StateGraph
 
-from app.core.config import RagConfig
-from app.services.RAG.llm.llm import AsyncLLM
+from app.core.config import LLMHedgingConfig, LLMMemoConfig, RagConfig
+from app.services.RAG.llm.hedging import HedgedLLM
+from app.services.RAG.llm.limiter import LLMLimiter, RateLimitedLLM
+from app.services.RAG.llm.memo import MemoBackend, MemoizedLLM
+from app.services.RAG.llm.protocols import AsyncLLMProtocol
+from app.services.RAG.llm.router import LLMRouter
 from app.services.RAG.rag_pipeline.nodes.base.base_llm import BaseLLM
 from app.services.RAG.rag_pipeline.nodes.postprocessing.answer_checker import AnswerChecker
 from app.services.RAG.rag_pipeline.nodes.preprocessing.intent import IntentClassifier
 from app.services.RAG.rag_pipeline.nodes.preprocessing.router import DocsCounter
+from app.services.RAG.rag_pipeline.nodes.retrieval.hybrid_search import HybridOpenSearchEngine
 from app.services.RAG.rag_pipeline.nodes.retrieval.reranker import Reranker
 from app.services.RAG.rag_pipeline.nodes.retrieval.retriever import RetrieverIntent
+from app.services.RAG.rag_pipeline.reranking.cross_encoder import CrossEncoderScorer
 from app.services.RAG.rag_pipeline.state import RAGState
 from app.services.RAG.rag_pipeline.utils.prompts.manager import PromptManager
 
@@ -26,23 +28,63 @@ class RAGGraphBuilder:
 
     def __init__(
         self,
-        async_llm: AsyncLLM,
+        async_llm: AsyncLLMProtocol,
         rag_config: RagConfig,
-        # opensearch: OpenSearchVectorSearch,
-        # embedding_model: HuggingFaceEmbeddings,
+        memo_backend: MemoBackend | None = None,
+        memo_config: LLMMemoConfig | None = None,
+        search_engine: HybridOpenSearchEngine | None = None,
+        reranker_scorer: CrossEncoderScorer | None = None,
+        llm_limiter: LLMLimiter | None = None,
+        hedging_config: LLMHedgingConfig | None = None,
+        llm_router: LLMRouter | None = None,
     ):
         """
         Инициализирует строитель графа.
+
+        :param memo_backend: хранилище мемоизации вызовов LLM (None — без мемоизации)
+        :param memo_config: настройки мемоизации (bypass по температуре, исключённые узлы)
+        :param search_engine: гибридный поиск в OpenSearch (None — моковый поиск)
+        :param reranker_scorer: CrossEncoder для Reranker (None — только обрезка до n_best)
+        :param llm_limiter: общий лимитер вызовов LLM с приоритетом по узлу (None — без лимитов)
+        :param hedging_config: настройки дублирования медленных вызовов LLM (None — без дублей)
+        :param llm_router: роутер между несколькими бэкендами LLM (None — все узлы используют async_llm)
         """
         self.async_llm = async_llm
         self.rag_config = rag_config
+        self.memo_backend = memo_backend
+        self.memo_config = memo_config
         self.use_answer_checker = self.rag_config.use_answer_checker
-        # self.opensearch = opensearch
-        # self.embedding_model = embedding_model
+        self.parallel_intent = self.rag_config.parallel_intent
+        self.search_engine = search_engine
+        self.reranker_scorer = reranker_scorer
+        self.llm_limiter = llm_limiter
+        self.hedging_config = hedging_config
+        self.llm_router = llm_router
         self.prompt_manager = PromptManager()
         self._compiled_graph = None
         self._builder: StateGraph | None = None
 
+    def _llm_for(self, node_name: str) -> AsyncLLMProtocol:
+        """LLM для конкретного узла графа (с обёртками, настроенными под узел)."""
+        llm = self.llm_router.for_node(node_name) if self.llm_router is not None else self.async_llm
+        if self.llm_limiter is not None:
+            llm = RateLimitedLLM(llm, limiter=self.llm_limiter, node=node_name)
+        # дубль запроса тоже проходит через лимитер
+        if (
+            self.hedging_config is not None
+            and self.hedging_config.enabled
+            and node_name not in self.hedging_config.exclude_nodes
+        ):
+            llm = HedgedLLM(llm, config=self.hedging_config, node=node_name)
+        # мемоизация снаружи лимитера: попадания в кэш не занимают слоты
+        if (
+            self.memo_backend is not None
+            and self.memo_config is not None
+            and node_name not in self.memo_config.exclude_nodes
+        ):
+            llm = MemoizedLLM(llm, backend=self.memo_backend, config=self.memo_config, node=node_name)
+        return llm
+
     def _build_graph(self) -> StateGraph:
         """Создаёт и конфигурирует StateGraph (внутренний метод)."""
         logger.info("🛠️ Начало построения RAG-графа...")
@@ -56,7 +98,7 @@ class RAGGraphBuilder:
         # Узлы должны возвращать dict для обновления state
         # Если узел не меняет state, он может вернуть пустой dict {}
         llm = BaseLLM(
-            llm=self.async_llm,
+            llm=self._llm_for("llm"),
             prompt=self.prompt_manager.get_prompt("BaseLLM"),
         )
 
@@ -64,7 +106,7 @@ class RAGGraphBuilder:
         # Узел классификации намерения: анализирует запрос пользователя
         # Возвращает: {"intent": str, ...} (обновляет поле intent в state)
         intent = IntentClassifier(
-            llm=self.async_llm,
+            llm=self._llm_for("Intent"),
             prompt=self.prompt_manager.get_prompt("Classifier"),
         )
 
@@ -72,28 +114,26 @@ class RAGGraphBuilder:
         # Узел поиска документов: переформулирует запрос и ищет в VectorDB
         # Возвращает: {"retrieved": list[str], ...} (добавляет найденные документы в state)
         retriever = RetrieverIntent(
-            llm=self.async_llm,
+            llm=self._llm_for("Retriever"),
             prompt=self.prompt_manager.get_prompt("Retriever"),
-            # opensearch=self.opensearch,
-            # embedding_model=self.embedding_model,
-            # k=self.rag_config.k,
-            # n=self.rag_config.n,
-            # relevance_threshold=self.rag_config.relevance_threshold,
-            # use_hybrid_search=self.rag_config.use_hybrid_search,
-            # bm25_weight=self.rag_config.bm25_weight,
+            search_engine=self.search_engine,
+            n=self.rag_config.n,
+            fusion_method=self.rag_config.fusion_method,
+            rrf_k=self.rag_config.rrf_k,
+            require_vector_hits=self.rag_config.require_vector_hits,
         )
 
         logger.info("Инициализация узла Reranker реранкера...")
         # Узел переранжирования: улучшает релевантность документов
         # Возвращает: {"retrieved": list[str], ...} (обновляет documents в state)
-        reranker = Reranker()
+        reranker = Reranker(n_best=self.rag_config.n_best, scorer=self.reranker_scorer)
 
         ans_check = None
         if self.use_answer_checker:
             logger.info("Инициализация узла проверки ответа (AnswerChecker)")
             # Узел проверки ответа: проверяет качество и релевантность ответа
             ans_check = AnswerChecker(
-                llm=self.async_llm,
+                llm=self._llm_for("AnswerChecker"),
                 prompt=self.prompt_manager.get_prompt("AnswerChecker"),
             )
 
@@ -104,7 +144,11 @@ class RAGGraphBuilder:
         # Каждый узел должен быть асинхронной функцией (ainvoke)
         # и возвращать dict для обновления RAGState
         builder.add_node("Intent", intent.ainvoke)  # Классификация намерения
-        builder.add_node("Retriever", retriever.ainvoke)  # Поиск документов
+        if self.parallel_intent:
+            builder.add_node("Retriever", retriever.ainvoke_main)  # Поиск по основному запросу
+            builder.add_node("IntentRetriever", retriever.ainvoke_intent)  # Доп. поиск по intent + слияние
+        else:
+            builder.add_node("Retriever", retriever.ainvoke)  # Поиск документов
         # ⚠️ Router НЕ добавляется как узел! Используется только в add_conditional_edges
 
         builder.add_node("Reranker", reranker.ainvoke)  # Переранжирование документов
@@ -116,15 +160,25 @@ class RAGGraphBuilder:
         # ===== ОПРЕДЕЛЕНИЕ РЁБЕР (ПЕРЕХОДОВ) =====
         # add_edge: безусловный переход в следующий узел
         # add_conditional_edges: условный переход в зависимости от функции маршрутизации
-        builder.add_edge(START, "Intent")  # Начало → Классификация намерения
-        builder.add_edge("Intent", "Retriever")  # Намерение → Поиск документов
+        if self.parallel_intent:
+            # Fan-out: Intent и Retriever стартуют одновременно (переформулировка не ждёт intent)
+            builder.add_edge(START, "Intent")
+            builder.add_edge(START, "Retriever")
+            # Join: IntentRetriever ждёт завершения обоих узлов
+            builder.add_edge(["Intent", "Retriever"], "IntentRetriever")
+            search_node = "IntentRetriever"
+            logger.info("⚡ Intent и Retriever выполняются параллельно")
+        else:
+            builder.add_edge(START, "Intent")  # Начало → Классификация намерения
+            builder.add_edge("Intent", "Retriever")  # Намерение → Поиск документов
+            search_node = "Retriever"
 
         # 🔹 УСЛОВНЫЙ ПЕРЕХОД (Router):
         # router.ainvoke() возвращает:
         #   - "stop" → переход в END (нет документов)
         #   - "next_step" → переход в Reranker (документы найдены)
         builder.add_conditional_edges(
-            "Retriever",  # От этого узла
+            search_node,  # От этого узла
             router.ainvoke,  # Используй эту функцию для принятия решения
             {  # Маршруты (ключ = возвращаемое значение → узел/END)
                 "stop": END,  # Нет документов → конец
@@ -162,6 +216,8 @@ class RAGGraphBuilder:
 
     def get_image_graph(self):
         """Отрисовать граф (использует builder напрямую)."""
+        # IPython нужен только в ноутбуке — не грузим его при старте сервиса
+        from IPython.display import Image, display
 
         builder = self.get_graph_builder()
         return display(Image(builder.compile().get_graph().draw_mermaid_png()))
@@ -3,9 +3,11 @@ from typing import Any
 
 from langchain_core.messages import AIMessage
 from langchain_core.prompts import PromptTemplate
+from langgraph.config import get_stream_writer
+from langgraph.types import StreamWriter
 
 from app.services.RAG.rag_pipeline.exceptions import RagPipelineError
-from app.services.RAG.llm.llm import AsyncLLM
+from app.services.RAG.llm.protocols import AsyncLLMProtocol
 from app.services.RAG.llm.schemas import ResponseYAGPTSchema
 from app.services.RAG.rag_pipeline.nodes.base.base_node import BaseNode
 from app.services.RAG.rag_pipeline.state import RAGState
@@ -21,7 +23,7 @@ class BaseLLM(BaseNode):
 
     def __init__(
         self,
-        llm: AsyncLLM,
+        llm: AsyncLLMProtocol,
         prompt: str,
     ):
         """Инициализация базового LLM.
@@ -84,7 +86,10 @@ class BaseLLM(BaseNode):
             ),
         )
         try:
-            generate_result = await self.llm.generate([{"role": "user", "text": prompt}])
+            if getattr(self.llm, "stream", False):
+                generate_result = await self._generate_streaming([{"role": "user", "text": prompt}])
+            else:
+                generate_result = await self.llm.generate([{"role": "user", "text": prompt}])
         except RagPipelineError:
             # Уже обработанные - пробрасываем выше
             raise
@@ -96,3 +101,36 @@ class BaseLLM(BaseNode):
             "retrieved": state["retrieved"],
             "intent": state["intent"],
         }
+
+    async def _generate_streaming(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        """Генерирует ответ через llm.astream, пересылая дельты текста в custom-стрим LangGraph.
+
+        Args:
+            prompt: Список сообщений для LLM
+
+        Returns:
+            Последний (полный) чанк ответа
+        """
+        writer = self._stream_writer()
+        sent = ""
+        last: ResponseYAGPTSchema | None = None
+        async for chunk in self.llm.astream(prompt):
+            text = chunk.alternatives[-1].message.text
+            # чанки несут накопленный текст — отдаём наружу только прирост
+            delta = text[len(sent) :] if text.startswith(sent) else text
+            if delta:
+                writer({"type": "token", "delta": delta})
+            sent = text
+            last = chunk
+
+        if last is None:
+            raise RagPipelineError(message="LLM вернула пустой поток")
+        return last
+
+    @staticmethod
+    def _stream_writer() -> StreamWriter:
+        """Writer custom-стрима LangGraph; вне графа (например в тестах) — no-op."""
+        try:
+            return get_stream_writer()
+        except RuntimeError:
+            return lambda _: None
@@ -0,0 +1,132 @@
+import hashlib
+import statistics
+from collections.abc import Iterable
+from typing import Literal
+
+from langchain_core.documents import Document
+
+FusionMethod = Literal["concat", "rrf", "minmax", "zscore"]
+
+
+def chunk_id(doc: Document) -> str:
+    """Идентификатор чанка: _id из OpenSearch, иначе metadata.id, иначе хэш текста."""
+    for key in ("_id", "id"):
+        value = doc.metadata.get(key)
+        if value is not None:
+            return str(value)
+    return hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()  # noqa: S324
+
+
+def unique_chunks(docs: Iterable[Document]) -> list[Document]:
+    """Удаляет дубли по chunk_id, сохраняя порядок (первое вхождение)."""
+    seen: set[str] = set()
+    unique: list[Document] = []
+    for doc in docs:
+        doc_id = chunk_id(doc)
+        if doc_id not in seen:
+            seen.add(doc_id)
+            unique.append(doc)
+    return unique
+
+
+def ranked_lists(docs: list[Document]) -> list[list[Document]]:
+    """Разбивает плоскую выдачу на ранжированные списки по запросу (metadata._query), порядок сохраняется."""
+    lists: dict[object, list[Document]] = {}
+    for doc in docs:
+        lists.setdefault(doc.metadata.get("_query"), []).append(doc)
+    return list(lists.values())
+
+
+def reciprocal_rank_fusion(
+    weighted_lists: list[tuple[list[Document], float]],
+    rrf_k: int = 60,
+) -> list[Document]:
+    """
+    Reciprocal Rank Fusion: score(d) = Σ weight / (rrf_k + rank(d)) по всем спискам.
+
+    Не зависит от шкалы score (KNN-сходство и BM25 несравнимы), учитывает только позиции.
+    Списки с нулевым весом не участвуют (и не добавляют чанки).
+    """
+    scores: dict[str, float] = {}
+    docs: dict[str, Document] = {}
+    for ranked, weight in weighted_lists:
+        if weight <= 0:
+            continue
+        for rank, doc in enumerate(unique_chunks(ranked), start=1):
+            doc_id = chunk_id(doc)
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (rrf_k + rank)
+            docs.setdefault(doc_id, doc)
+    return _sorted_by_score(docs, scores)
+
+
+def score_fusion(
+    weighted_lists: list[tuple[list[Document], float]],
+    method: Literal["minmax", "zscore"] = "minmax",
+) -> list[Document]:
+    """
+    Взвешенная сумма нормализованных score (metadata._score) по всем спискам.
+
+    minmax — score приводится к [0, 1] внутри списка, zscore — к (score - mean) / std.
+    """
+    scores: dict[str, float] = {}
+    docs: dict[str, Document] = {}
+    for ranked, weight in weighted_lists:
+        if weight <= 0:
+            continue
+        unique = unique_chunks(ranked)
+        raw = [float(doc.metadata.get("_score", 0.0)) for doc in unique]
+        for doc, normalized in zip(unique, _normalize(raw, method), strict=True):
+            doc_id = chunk_id(doc)
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight * normalized
+            docs.setdefault(doc_id, doc)
+    return _sorted_by_score(docs, scores)
+
+
+def fuse(
+    vector_docs: list[Document],
+    bm25_docs: list[Document],
+    method: FusionMethod,
+    bm25_weight: float,
+    limit: int,
+    rrf_k: int = 60,
+) -> list[Document]:
+    """
+    Слияние vector и BM25 выдачи (по всем переформулировкам) в один список не длиннее limit.
+
+    Вес vector-списков — 1 - bm25_weight, BM25-списков — bm25_weight; concat — прежнее поведение
+    (vector + bm25 без переранжирования).
+    """
+    if method == "concat":
+        return unique_chunks(vector_docs + bm25_docs)[:limit]
+
+    weighted_lists = [(ranked, 1 - bm25_weight) for ranked in ranked_lists(vector_docs)]
+    weighted_lists += [(ranked, bm25_weight) for ranked in ranked_lists(bm25_docs)]
+    if method == "rrf":
+        fused = reciprocal_rank_fusion(weighted_lists, rrf_k=rrf_k)
+    else:
+        fused = score_fusion(weighted_lists, method=method)
+    return fused[:limit]
+
+
+def _normalize(scores: list[float], method: Literal["minmax", "zscore"]) -> list[float]:
+    if not scores:
+        return []
+    if method == "minmax":
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [1.0] * len(scores)
+        return [(score - low) / (high - low) for score in scores]
+
+    mean = statistics.fmean(scores)
+    std = statistics.pstdev(scores)
+    if std == 0:
+        return [0.0] * len(scores)
+    return [(score - mean) / std for score in scores]
+
+
+def _sorted_by_score(docs: dict[str, Document], scores: dict[str, float]) -> list[Document]:
+    """Документы по убыванию итогового score (копии с metadata._fused_score)."""
+    return [
+        Document(page_content=docs[doc_id].page_content, metadata={**docs[doc_id].metadata, "_fused_score": score})
+        for doc_id, score in sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    ]
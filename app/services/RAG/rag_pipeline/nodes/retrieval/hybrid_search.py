@@ -0,0 +1,176 @@
+import asyncio
+import logging
+from typing import Any, Literal
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from opensearchpy import AsyncOpenSearch
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from app.services.RAG.rag_pipeline.exceptions import RagPipelineError
+from app.utils.logging_decorators import log_execution_time
+
+logger = logging.getLogger(__name__)
+
+
+class HybridOpenSearchEngine:
+    """
+    Гибридный поиск (vector KNN + BM25) в OpenSearch.
+
+    Все запросы (переформулировки) ищутся за один round-trip: эмбеддинги считаются параллельно,
+    vector- и BM25-запросы для всех переформулировок уходят одним _msearch.
+    Доли vector/BM25 в выдаче задаются bm25_weight: size_vector = k * (1 - w), size_bm25 = k * w.
+    """
+
+    # КОНСТАНТЫ для типов поиска
+    SEARCH_TYPE_BM25: Literal["bm25"] = "bm25"
+    SEARCH_TYPE_VECTOR: Literal["vector"] = "vector"
+
+    # КОНСТАНТЫ для поиска с фильтром в методате, в примере - verify_id
+    VERIFY_ID_ALL: Literal["All"] = "All"
+
+    def __init__(
+        self,
+        client: AsyncOpenSearch,
+        index_name: str,
+        embeddings: Embeddings,
+        k: int,
+        relevance_threshold: float,
+        use_hybrid_search: bool,
+        bm25_weight: float,
+    ) -> None:
+        """
+        :param k: количество чанков на один запрос (vector + BM25 вместе)
+        :param relevance_threshold: min_score для векторного поиска
+        """
+        self.client = client
+        self.index_name = index_name
+        self.embeddings = embeddings
+        self.k = k
+        self.relevance_threshold = relevance_threshold
+        self.use_hybrid_search = use_hybrid_search
+        self.bm25_weight = bm25_weight
+
+    @property
+    def vector_size(self) -> int:
+        if not self.use_hybrid_search:
+            return self.k
+        return int(self.k * (1 - self.bm25_weight)) or 1  # чтобы size не стал 0
+
+    @property
+    def bm25_size(self) -> int:
+        return int(self.k * self.bm25_weight) if self.use_hybrid_search else 0
+
+    @log_execution_time
+    async def search(
+        self,
+        queries: list[str],
+        verify_id: list[str] | str = VERIFY_ID_ALL,
+    ) -> tuple[list[Document], list[Document]]:
+        """
+        Ищет по всем запросам за один _msearch.
+
+        Returns:
+            (vector_docs, bm25_docs) — найденные чанки по всем запросам (bm25_docs пуст без гибрида)
+        """
+        if not queries:
+            return [], []
+
+        filter_clause = self._build_filter_clause(verify_id)
+        try:
+            query_embeddings = await asyncio.gather(*(self.embeddings.aembed_query(query) for query in queries))
+        except Exception as e:
+            raise RagPipelineError(message=f"Ошибка при расчёте эмбеддингов запросов: {e!r}") from e
+
+        body: list[dict[str, Any]] = []
+        searches: list[tuple[str, str]] = []  # (тип поиска, запрос) для каждого ответа _msearch
+        for query, embedding in zip(queries, query_embeddings, strict=True):
+            body.extend([{"index": self.index_name}, self._build_vector_query(embedding, filter_clause)])
+            searches.append((self.SEARCH_TYPE_VECTOR, query))
+            if self.bm25_size > 0:
+                body.extend([{"index": self.index_name}, self._build_bm25_query(query, filter_clause)])
+                searches.append((self.SEARCH_TYPE_BM25, query))
+
+        response = await self.execute_msearch(body)
+
+        responses = response.get("responses", [])
+        if len(responses) != len(searches):
+            raise RagPipelineError(
+                message=f"Ошибка при поиске: _msearch вернул {len(responses)} ответов вместо {len(searches)}",
+            )
+
+        vector_docs: list[Document] = []
+        bm25_docs: list[Document] = []
+        for (search_type, query), item in zip(searches, responses, strict=True):
+            if "error" in item:
+                raise RagPipelineError(message=f"Ошибка при поиске ({search_type}): {item['error']!r}")
+            docs = self._process_search_results(response=item, search_type=search_type, query=query)
+            (vector_docs if search_type == self.SEARCH_TYPE_VECTOR else bm25_docs).extend(docs)
+
+        logger.info(
+            f"🔍 Поиск по {len(queries)} запрос(ам): найдено {len(vector_docs)} vector + {len(bm25_docs)} bm25",
+        )
+        return vector_docs, bm25_docs
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=0.5, max=5),
+        retry=retry_if_exception_type(RagPipelineError),
+        reraise=True,
+    )
+    async def execute_msearch(self, body: list[dict[str, Any]]) -> dict[str, Any]:
+        try:
+            return await self.client.msearch(body=body)
+        except Exception as e:
+            raise RagPipelineError(message=f"Ошибка при поиске(execute_msearch): {e!r}") from e
+
+    def _build_filter_clause(self, verify_id: list[str] | str) -> dict | None:
+        """Строит OpenSearch filter clause по verify_id.
+
+        Returns:
+            dict: {"terms": {"metadata.AdditionalData.cardId.keyword": [...]}}
+            None: если фильтр не нужен
+        """
+        # СЛУЧАЙ 1: verify_id == "All" → БЕЗ ФИЛЬТРА
+        if verify_id == self.VERIFY_ID_ALL:
+            return None
+
+        # СЛУЧАЙ 2: verify_id == ["card_1", "card_2", ...] → С ФИЛЬТРОМ
+        if isinstance(verify_id, list):
+            logger.info(f"📋 Фильтр по verify_id: {verify_id} → С ФИЛЬТРОМ")
+            return {"terms": {"metadata.AdditionalData.cardId.keyword": verify_id}}
+
+        # СЛУЧАЙ 3: verify_id == None или другое неизвестное значение → ОШИБКА
+        logger.error(f"❌ verify_id имеет неожиданное значение: {verify_id}")
+        raise RagPipelineError(
+            message=f"Ошибка при построении фильтра: verify_id={verify_id} (ожидается '{self.VERIFY_ID_ALL}' или список)",  # noqa: E501
+        )
+
+    def _build_vector_query(self, query_embedding: list[float], filter_clause: dict | None) -> dict:
+        """Строит Vector KNN query для OpenSearch."""
+        knn = {"knn": {"vector_field": {"vector": query_embedding, "k": self.vector_size}}}
+        query = knn if filter_clause is None else {"bool": {"must": [knn], "filter": [filter_clause]}}
+        return {"size": self.vector_size, "query": query, "min_score": self.relevance_threshold}
+
+    def _build_bm25_query(self, query_text: str, filter_clause: dict | None) -> dict:
+        """Строит BM25 query для OpenSearch."""
+        match = {"match": {"text": query_text}}
+        query = match if filter_clause is None else {"bool": {"must": [match], "filter": [filter_clause]}}
+        return {"size": self.bm25_size, "query": query}
+
+    @staticmethod
+    def _process_search_results(response: dict, search_type: str, query: str) -> list[Document]:
+        """Обрабатывает результаты поиска OpenSearch в Document объекты (_query — для слияния по спискам)."""
+        return [
+            Document(
+                page_content=hit["_source"]["text"],
+                metadata={
+                    **hit["_source"].get("metadata", {}),
+                    "_id": hit.get("_id"),
+                    "_search_type": search_type,
+                    "_query": query,
+                    "_score": float(hit["_score"]),
+                },
+            )
+            for hit in response.get("hits", {}).get("hits", [])
+        ]
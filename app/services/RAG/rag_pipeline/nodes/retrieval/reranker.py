@@ -1,7 +1,10 @@
 import logging
 
+from langchain_core.documents import Document
+
 from app.services.RAG.rag_pipeline.exceptions import RagPipelineError
 from app.services.RAG.rag_pipeline.nodes.base.base_node import BaseNode
+from app.services.RAG.rag_pipeline.reranking.cross_encoder import CrossEncoderScorer
 from app.services.RAG.rag_pipeline.state import RAGState
 
 logger = logging.getLogger(__name__)
@@ -10,25 +13,27 @@ logger = logging.getLogger(__name__)
 class Reranker(BaseNode):
     """Классический реренкер для ранжирования документов по оценке релевантности.
 
-    Использует BentoML сервис для вычисления скоров релевантности
+    Скорит все чанки одним батчем моделью CrossEncoder (CrossEncoderScorer)
     и возвращает топ-N наиболее релевантных документов.
     """
 
-    def __init__(self, n_best: int = 5):
+    def __init__(self, n_best: int = 5, scorer: CrossEncoderScorer | None = None):
         """Инициализация классического реренкера.
 
         Args:
             n_best: Количество лучших документов для возврата
+            scorer: CrossEncoder-скорер (None — без переранжирования, только обрезка до n_best)
         """
         super().__init__()
         self.n_best = n_best
+        self.scorer = scorer
 
     async def ainvoke(self, state: RAGState) -> RAGState:
         """
         Выполняет реранкинг документов.
 
         Принимает текущее состояние RAG, извлекает найденные документы (retrieved),
-        и (в перспективе) переупорядочивает их по релевантности.
+        переупорядочивает их по релевантности вопросу и оставляет n_best лучших.
 
         Args:
             state (RAGState): Текущее состояние пайплайна.
@@ -40,17 +45,26 @@ class Reranker(BaseNode):
             logger.info("Reranker start wait...")
 
             # достаем чанки/документы
-            chunks = state["retrieved"]
+            chunks: list[Document] = state["retrieved"]
 
-            # с помощью реранкера ранжируем документы (какая-то логика)
-            ranked_docs = chunks
+            if self.scorer is not None and chunks:
+                # чистый текст вопроса, без префикса типа сообщения — так обучен CrossEncoder
+                query = str(state["messages"][-1].content)
+                scores = await self.scorer.score(query, [chunk.page_content for chunk in chunks])
+                ranked = sorted(zip(chunks, scores, strict=True), key=lambda pair: pair[1], reverse=True)
+                ranked_docs = [
+                    Document(page_content=doc.page_content, metadata={**doc.metadata, "_rerank_score": score})
+                    for doc, score in ranked[: self.n_best]
+                ]
+            else:
+                ranked_docs = chunks[: self.n_best]
 
-            logger.info(f"✅ Reranker завершен, возвращено " f"{len(ranked_docs)} чанков(а)")
+            logger.info(f"✅ Reranker завершен, возвращено " f"{len(ranked_docs)} чанков(а) из {len(chunks)}")
             return {"retrieved": ranked_docs}
 
         except RagPipelineError:
             # Пробрасываем уже известные ошибки
             raise
         except Exception as e:
-            logger.error(f"Ошибка при вызове BentoMLReranker. Ошибка = {e}.")
+            logger.error(f"Ошибка при вызове Reranker. Ошибка = {e}.")
             raise RagPipelineError(message=f"Ошибка реранкинга документов: {e!r}") from e
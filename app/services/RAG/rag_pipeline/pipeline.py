@@ -1,10 +1,12 @@
 import logging
+from collections.abc import AsyncIterator
 from random import randint
+from typing import Any
 
-import torch
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 
+from app.services.RAG.rag_pipeline.cache.response_cache import SemanticResponseCache
 from app.services.RAG.rag_pipeline.exceptions import RagPipelineError
 from app.services.RAG.rag_pipeline.state import RAGState
 
@@ -17,34 +19,50 @@ class RAGPipeline:
     def __init__(
         self,
         graph,
+        response_cache: SemanticResponseCache | None = None,
     ):
         """
         Инициализация RAG-пайплайна.
+
+        :param response_cache: кэш готовых ответов; при попадании граф (LLM и поиск) не запускается
         """
 
         self.graph = graph
+        self.response_cache = response_cache
 
     async def query(
         self,
         message: str,
         callbacks=None,
+        use_cache: bool = True,
     ) -> RAGState:
-        """Выполняет RAG-запрос по входному сообщению."""
+        """
+        Выполняет RAG-запрос по входному сообщению.
+
+        :param use_cache: False — кэш ответов не читается и не пополняется (например, при прогреве)
+        """
+        cached = await self._cache_get(message) if use_cache else None
+        if cached is not None:
+            return cached
+
         try:
             config = RunnableConfig(
                 configurable={"request_id": randint(1, 100)},
                 callbacks=callbacks or [],
             )
-            with torch.no_grad():
-                result: RAGState = await self.graph.ainvoke(
-                    {
-                        "messages": [HumanMessage(content=str(message))],
-                        "intent": [],
-                        "retrieved": [],
-                    },
-                    config=config,
-                )
-                return result
+            # torch.no_grad() здесь не нужен: он действует только на текущий поток, а инференс моделей
+            # идёт в executor-ах (sentence-transformers сам включает inference_mode)
+            result: RAGState = await self.graph.ainvoke(
+                {
+                    "messages": [HumanMessage(content=str(message))],
+                    "intent": [],
+                    "retrieved": [],
+                },
+                config=config,
+            )
+            if use_cache:
+                await self._cache_set(message, result)
+            return result
         except RagPipelineError:
             # Уже обработанные - пробрасываем выше
             raise
@@ -55,3 +73,83 @@ class RAGPipeline:
             raise RagPipelineError(
                 message=f"Ошибка обработки запроса в RAG-пайплайне: {e!r}",
             ) from e
+
+    async def query_stream(
+        self,
+        message: str,
+        callbacks=None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Выполняет RAG-запрос в потоковом режиме.
+
+        Отдаёт события:
+        - {"type": "token", "delta": str} — приращение текста ответа (если у LLM включён stream);
+        - {"type": "final", "state": RAGState} — итоговое состояние графа, всегда последним.
+        """
+        cached = await self._cache_get(message)
+        if cached is not None:
+            yield {"type": "final", "state": cached}
+            return
+
+        try:
+            config = RunnableConfig(
+                configurable={"request_id": randint(1, 100)},
+                callbacks=callbacks or [],
+            )
+            state: RAGState = {}
+            async for mode, chunk in self.graph.astream(
+                {
+                    "messages": [HumanMessage(content=str(message))],
+                    "intent": [],
+                    "retrieved": [],
+                },
+                config=config,
+                stream_mode=["custom", "values"],
+            ):
+                if mode == "custom":
+                    yield chunk
+                else:
+                    state = chunk
+            await self._cache_set(message, state)
+            yield {"type": "final", "state": state}
+
+        except RagPipelineError:
+            raise
+
+        except Exception as e:
+            logger.exception(f"Ошибка в потоковом RAG-пайплайне при обработке запроса: {message}")
+
+            raise RagPipelineError(
+                message=f"Ошибка обработки запроса в RAG-пайплайне: {e!r}",
+            ) from e
+
+    async def _cache_get(self, message: str) -> RAGState | None:
+        """Ищет готовый ответ в кэше; ошибки кэша не прерывают запрос."""
+        if self.response_cache is None:
+            return None
+        try:
+            answer = await self.response_cache.get(message)
+        except Exception as e:
+            logger.warning(f"⚠️ Ошибка чтения кэша ответов: {e!r}")
+            return None
+        if answer is None:
+            return None
+
+        logger.info("⚡ Ответ взят из кэша, RAG-граф не запускается")
+        return {
+            "messages": [HumanMessage(content=str(message)), AIMessage(answer, name="ai")],
+            "intent": [],
+            "retrieved": [],
+        }
+
+    async def _cache_set(self, message: str, state: RAGState) -> None:
+        """Кэширует ответ, только если граф дошёл до генерации (последнее сообщение — от AI)."""
+        if self.response_cache is None:
+            return
+        messages = state.get("messages", [])
+        if not messages or not isinstance(messages[-1], AIMessage):
+            return
+        try:
+            await self.response_cache.set(message, str(messages[-1].content))
+        except Exception as e:
+            logger.warning(f"⚠️ Ошибка записи в кэш ответов: {e!r}")
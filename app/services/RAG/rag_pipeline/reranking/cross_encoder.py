@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from app.core.config import RerankerConfig
+from app.services.RAG.rag_pipeline.utils.micro_batcher import MicroBatcher
+
+if TYPE_CHECKING:
+    from sentence_transformers import CrossEncoder
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderScorer:
+    """
+    Скоринг пар (вопрос, чанк) моделью sentence-transformers CrossEncoder.
+
+    - Все кандидаты скорятся одним батчем (один forward pass, до max_batch_size пар);
+    - при batch_window_ms > 0 пары конкурентных запросов собираются в общие батчи (MicroBatcher);
+    - инференс идёт в отдельном пуле потоков — event loop не блокируется;
+    - backend="onnx" — ONNX Runtime (в т.ч. int8-квантованная модель) для CPU-подов;
+    - модель загружается лениво при первом вызове (или явно через load()).
+    """
+
+    def __init__(self, config: RerankerConfig) -> None:
+        self.config = config
+        self._executor = ThreadPoolExecutor(max_workers=config.max_workers, thread_name_prefix="reranker")
+        self._model: CrossEncoder | None = None
+        self._load_lock = threading.Lock()
+        self._batcher: MicroBatcher[tuple[str, str], float] | None = None
+        if config.batch_window_ms > 0:
+            self._batcher = MicroBatcher(
+                self._apredict,
+                max_batch_size=config.max_batch_size,
+                max_wait_ms=config.batch_window_ms,
+                name="reranker",
+            )
+
+    def load(self) -> "CrossEncoder":
+        """Загружает модель (потокобезопасно, один раз)."""
+        if self._model is not None:
+            return self._model
+        with self._load_lock:
+            if self._model is None:
+                self._model = self._create_model()
+        return self._model
+
+    def _create_model(self) -> "CrossEncoder":
+        # тяжёлый импорт (torch) — только если реранкер включён
+        from sentence_transformers import CrossEncoder
+
+        if self.config.torch_num_threads is not None:
+            import torch
+
+            torch.set_num_threads(self.config.torch_num_threads)
+
+        model_kwargs: dict[str, str] = {}
+        if self.config.backend == "onnx" and self.config.onnx_file_name:
+            model_kwargs["file_name"] = self.config.onnx_file_name
+
+        logger.info(f"🔧 Загрузка модели реранкера: {self.config.model} (backend={self.config.backend})...")
+        model = CrossEncoder(
+            self.config.model,
+            device=self.config.device,
+            backend=self.config.backend,
+            max_length=self.config.max_length,
+            model_kwargs=model_kwargs or None,
+        )
+        logger.info("✅ Модель реранкера загружена")
+        return model
+
+    async def score(self, query: str, texts: list[str]) -> list[float]:
+        """Оценки релевантности текстов запросу (в порядке texts)."""
+        if not texts:
+            return []
+        pairs = [(query, text) for text in texts]
+        if self._batcher is not None:
+            return await self._batcher.submit_many(pairs)
+        return await self._apredict(pairs)
+
+    async def _apredict(self, pairs: list[tuple[str, str]]) -> list[float]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._predict, pairs)
+
+    def _predict(self, pairs: list[tuple[str, str]]) -> list[float]:
+        model = self.load()
+        scores = model.predict(
+            pairs,
+            batch_size=min(len(pairs), self.config.max_batch_size),
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+        return [float(score) for score in scores]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
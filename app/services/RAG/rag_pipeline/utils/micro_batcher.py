@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+from app.services.prometheus_service import prometheus_service
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Сбор запросов на инференс от конкурентных вызовов в общие батчи.
+
+    - Элементы копятся max_wait_ms от первого элемента батча или до max_batch_size;
+    - батч обрабатывается одним вызовом process (один forward pass модели);
+    - результаты раздаются вызывающим по позициям; ошибка process получают все элементы батча.
+
+    process должен вернуть ровно по одному результату на элемент, в том же порядке.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[list[T]], Awaitable[list[R]]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        name: str = "default",
+    ) -> None:
+        """
+        :param name: имя батчера для логов и метрик (например embeddings/reranker)
+        """
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._pending: list[tuple[T, asyncio.Future[R]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._batches: set[asyncio.Task[None]] = set()
+
+    async def submit(self, item: T) -> R:
+        """Ставит элемент в батч и ждёт его результат."""
+        return await self._enqueue(item)
+
+    async def submit_many(self, items: list[T]) -> list[R]:
+        """Ставит элементы одного вызова в батч (подряд) и ждёт все результаты."""
+        results = await asyncio.gather(*(self._enqueue(item) for item in items), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results  # type: ignore[return-value]
+
+    def _enqueue(self, item: T) -> "asyncio.Future[R]":
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._dispatch)
+        return future
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch: list[tuple[T, "asyncio.Future[R]"]]) -> None:
+        prometheus_service.record_inference_batch_size(len(batch), batcher=self.name)
+        try:
+            results = await self.process([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"[{self.name}] process вернул {len(results)} результатов на {len(batch)} элементов")
+        except Exception as e:
+            logger.warning(f"⚠️ [{self.name}] Ошибка обработки батча из {len(batch)} элементов: {e!r}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results, strict=True):
+            # вызывающий мог быть отменён — future уже закрыт
+            if not future.done():
+                future.set_result(result)
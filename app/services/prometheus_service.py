@@ -3,10 +3,13 @@ import socket
 from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
 
 from app.core.config import CONFIG
-from app.core.logger import get_logger
+from app.core.logger import get_log_queue_handler, get_logger
 
 logger = get_logger(__name__)
 
+# значения gauge-а circuit_breaker_state
+_CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
 
 class PrometheusService:
     """Сервис для управления метриками Prometheus.
@@ -30,6 +33,14 @@ class PrometheusService:
             "tsam_federation_type": CONFIG.prometheus.tsam_federation_type,
         }
 
+        # метрики очереди логов считываются при каждом scrape (очередь создаётся в setup_logger)
+        self.log_queue_size.labels(**self.base_labels).set_function(
+            lambda: handler.size if (handler := get_log_queue_handler()) else 0,
+        )
+        self.log_queue_dropped_records.labels(**self.base_labels).set_function(
+            lambda: handler.dropped if (handler := get_log_queue_handler()) else 0,
+        )
+
         logger.info(f"Prometheus service initialized with base labels: {self.base_labels}")
 
     def _setup_metrics(self) -> None:
@@ -193,6 +204,231 @@ class PrometheusService:
             registry=self.registry,
         )
 
+        # RAG response cache metrics
+        self.rag_response_cache_requests_total = Counter(
+            "rag_response_cache_requests_total",
+            "The metric counts RAG response cache lookups by result (hit/miss) and level (l1/redis/semantic)",
+            labelnames=[
+                "app_name",
+                "result",
+                "level",
+                "project_code",
+                "ris_code",
+                "kubernetes_namespace",
+                "stateless_replica",
+                "tsam_cluster",
+                "tsam_federation_type",
+            ],
+            registry=self.registry,
+        )
+
+        # LLM memoization metrics
+        self.rag_llm_memo_requests_total = Counter(
+            "rag_llm_memo_requests_total",
+            "The metric counts memoized LLM calls by graph node and result (hit/miss/bypass)",
+            labelnames=[
+                "app_name",
+                "node",
+                "result",
+                "project_code",
+                "ris_code",
+                "kubernetes_namespace",
+                "stateless_replica",
+                "tsam_cluster",
+                "tsam_federation_type",
+            ],
+            registry=self.registry,
+        )
+
+        # Batched publishing metrics
+        self.published_batch_size = Histogram(
+            "published_batch_size",
+            "The metric is filled with the number of messages per batch flushed by the batching publisher",
+            labelnames=[
+                "app_name",
+                "destination",
+                "project_code",
+                "ris_code",
+                "kubernetes_namespace",
+                "stateless_replica",
+                "tsam_cluster",
+                "tsam_federation_type",
+            ],
+            buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+            registry=self.registry,
+        )
+
+        # Inference micro-batching metrics
+        self.inference_batch_size = Histogram(
+            "inference_batch_size",
+            "The metric is filled with the number of items per micro-batch of model inference",
+            labelnames=[
+                "app_name",
+                "batcher",
+                "project_code",
+                "ris_code",
+                "kubernetes_namespace",
+                "stateless_replica",
+                "tsam_cluster",
+                "tsam_federation_type",
+            ],
+            buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+            registry=self.registry,
+        )
+
+        # Embedding executor metrics
+        embedding_labelnames = [
+            "app_name",
+            "operation",
+            "project_code",
+            "ris_code",
+            "kubernetes_namespace",
+            "stateless_replica",
+            "tsam_cluster",
+            "tsam_federation_type",
+        ]
+        self.embedding_queue_wait_seconds = Histogram(
+            "embedding_queue_wait_seconds",
+            "The metric is filled with the time embedding tasks wait in the executor queue",
+            labelnames=embedding_labelnames,
+            registry=self.registry,
+        )
+        self.embedding_compute_seconds = Histogram(
+            "embedding_compute_seconds",
+            "The metric is filled with the embedding model compute time",
+            labelnames=embedding_labelnames,
+            registry=self.registry,
+        )
+        self.embedding_rejected_total = Counter(
+            "embedding_rejected_total",
+            "The metric counts embedding tasks rejected because the executor queue is full",
+            labelnames=embedding_labelnames,
+            registry=self.registry,
+        )
+
+        # LLM limiter metrics
+        self.llm_concurrency_limit = Gauge(
+            "llm_concurrency_limit",
+            "The metric shows the current adaptive concurrency limit for LLM calls",
+            labelnames=[
+                "app_name",
+                "project_code",
+                "ris_code",
+                "kubernetes_namespace",
+                "stateless_replica",
+                "tsam_cluster",
+                "tsam_federation_type",
+            ],
+            registry=self.registry,
+        )
+        llm_node_labelnames = [
+            "app_name",
+            "node",
+            "project_code",
+            "ris_code",
+            "kubernetes_namespace",
+            "stateless_replica",
+            "tsam_cluster",
+            "tsam_federation_type",
+        ]
+        self.llm_limiter_wait_seconds = Histogram(
+            "llm_limiter_wait_seconds",
+            "The metric is filled with the time LLM calls wait for a concurrency slot and rate limit",
+            labelnames=llm_node_labelnames,
+            registry=self.registry,
+        )
+        self.llm_limiter_rejected_total = Counter(
+            "llm_limiter_rejected_total",
+            "The metric counts LLM calls rejected by the limiter after the wait timeout",
+            labelnames=llm_node_labelnames,
+            registry=self.registry,
+        )
+        self.llm_overload_total = Counter(
+            "llm_overload_total",
+            "The metric counts LLM overload signals (429/5xx/timeout/slow response) that shrink the limit",
+            labelnames=llm_node_labelnames,
+            registry=self.registry,
+        )
+
+        # LLM hedging metrics
+        self.llm_hedges_fired_total = Counter(
+            "llm_hedges_fired_total",
+            "The metric counts duplicate (hedged) LLM requests fired after the latency percentile",
+            labelnames=llm_node_labelnames,
+            registry=self.registry,
+        )
+        self.llm_hedges_won_total = Counter(
+            "llm_hedges_won_total",
+            "The metric counts hedged LLM requests that finished before the original request",
+            labelnames=llm_node_labelnames,
+            registry=self.registry,
+        )
+
+        # LLM router metrics
+        self.llm_router_calls_total = Counter(
+            "llm_router_calls_total",
+            "The metric counts LLM calls routed to each backend by node and status (success/error)",
+            labelnames=[
+                "app_name",
+                "backend",
+                "node",
+                "project_code",
+                "ris_code",
+                "kubernetes_namespace",
+                "stateless_replica",
+                "status",
+                "tsam_cluster",
+                "tsam_federation_type",
+            ],
+            registry=self.registry,
+        )
+        self.llm_router_failovers_total = Counter(
+            "llm_router_failovers_total",
+            "The metric counts LLM calls retried on another backend after an error",
+            labelnames=llm_node_labelnames,
+            registry=self.registry,
+        )
+
+        # Log queue metrics
+        base_labelnames = [
+            "app_name",
+            "project_code",
+            "ris_code",
+            "kubernetes_namespace",
+            "stateless_replica",
+            "tsam_cluster",
+            "tsam_federation_type",
+        ]
+        self.log_queue_size = Gauge(
+            "log_queue_size",
+            "The metric shows the number of log records waiting in the queue for the background sender",
+            labelnames=base_labelnames,
+            registry=self.registry,
+        )
+        self.log_queue_dropped_records = Gauge(
+            "log_queue_dropped_records",
+            "The metric shows the number of log records dropped on queue overflow since start",
+            labelnames=base_labelnames,
+            registry=self.registry,
+        )
+
+        # Circuit breaker metrics
+        self.circuit_breaker_state = Gauge(
+            "circuit_breaker_state",
+            "The metric shows the circuit breaker state per backend (0 - closed, 1 - half-open, 2 - open)",
+            labelnames=[
+                "app_name",
+                "backend",
+                "project_code",
+                "ris_code",
+                "kubernetes_namespace",
+                "stateless_replica",
+                "tsam_cluster",
+                "tsam_federation_type",
+            ],
+            registry=self.registry,
+        )
+
     def increment_received_messages(self, handler: str, broker: str = "kafka") -> None:
         """Увеличить счетчик полученных сообщений."""
         labels = {**self.base_labels, "broker": broker, "handler": handler}
@@ -258,6 +494,81 @@ class PrometheusService:
         }
         self.published_messages_exceptions_total.labels(**labels).inc()
 
+    def increment_response_cache(self, result: str, level: str) -> None:
+        """Увеличить счетчик обращений к кэшу ответов RAG."""
+        labels = {**self.base_labels, "result": result, "level": level}
+        self.rag_response_cache_requests_total.labels(**labels).inc()
+
+    def increment_llm_memo(self, node: str, result: str) -> None:
+        """Увеличить счетчик обращений к мемо-кэшу LLM."""
+        labels = {**self.base_labels, "node": node, "result": result}
+        self.rag_llm_memo_requests_total.labels(**labels).inc()
+
+    def record_publish_batch_size(self, size: int, destination: str) -> None:
+        """Записать размер батча публикации."""
+        labels = {**self.base_labels, "destination": destination}
+        self.published_batch_size.labels(**labels).observe(size)
+
+    def record_inference_batch_size(self, size: int, batcher: str) -> None:
+        """Записать размер микро-батча инференса."""
+        labels = {**self.base_labels, "batcher": batcher}
+        self.inference_batch_size.labels(**labels).observe(size)
+
+    def record_embedding_timings(self, operation: str, queue_wait: float, compute: float) -> None:
+        """Записать время ожидания в очереди и время расчёта эмбеддинга."""
+        labels = {**self.base_labels, "operation": operation}
+        self.embedding_queue_wait_seconds.labels(**labels).observe(queue_wait)
+        self.embedding_compute_seconds.labels(**labels).observe(compute)
+
+    def increment_embedding_rejected(self, operation: str) -> None:
+        """Увеличить счетчик отклонённых задач эмбеддинга (очередь переполнена)."""
+        labels = {**self.base_labels, "operation": operation}
+        self.embedding_rejected_total.labels(**labels).inc()
+
+    def set_llm_concurrency_limit(self, limit: int) -> None:
+        """Установить текущий адаптивный лимит параллельных вызовов LLM."""
+        self.llm_concurrency_limit.labels(**self.base_labels).set(limit)
+
+    def record_llm_limiter_wait(self, wait: float, node: str) -> None:
+        """Записать время ожидания вызова LLM в лимитере."""
+        labels = {**self.base_labels, "node": node}
+        self.llm_limiter_wait_seconds.labels(**labels).observe(wait)
+
+    def increment_llm_limiter_rejected(self, node: str) -> None:
+        """Увеличить счетчик вызовов LLM, отклонённых лимитером."""
+        labels = {**self.base_labels, "node": node}
+        self.llm_limiter_rejected_total.labels(**labels).inc()
+
+    def increment_llm_overload(self, node: str) -> None:
+        """Увеличить счетчик сигналов перегрузки LLM."""
+        labels = {**self.base_labels, "node": node}
+        self.llm_overload_total.labels(**labels).inc()
+
+    def increment_llm_hedges_fired(self, node: str) -> None:
+        """Увеличить счетчик отправленных дублей запросов к LLM."""
+        labels = {**self.base_labels, "node": node}
+        self.llm_hedges_fired_total.labels(**labels).inc()
+
+    def increment_llm_hedges_won(self, node: str) -> None:
+        """Увеличить счетчик дублей, ответивших раньше исходного запроса."""
+        labels = {**self.base_labels, "node": node}
+        self.llm_hedges_won_total.labels(**labels).inc()
+
+    def increment_llm_router_calls(self, backend: str, node: str, status: str) -> None:
+        """Увеличить счетчик вызовов LLM через роутер (status: success/error)."""
+        labels = {**self.base_labels, "backend": backend, "node": node, "status": status}
+        self.llm_router_calls_total.labels(**labels).inc()
+
+    def increment_llm_router_failovers(self, node: str) -> None:
+        """Увеличить счетчик переключений вызова LLM на другой бэкенд."""
+        labels = {**self.base_labels, "node": node}
+        self.llm_router_failovers_total.labels(**labels).inc()
+
+    def set_circuit_state(self, backend: str, state: str) -> None:
+        """Установить состояние circuit breaker-а бэкенда (closed/half_open/open)."""
+        labels = {**self.base_labels, "backend": backend}
+        self.circuit_breaker_state.labels(**labels).set(_CIRCUIT_STATE_VALUES[state])
+
     def generate_metrics(self) -> bytes:
         """Сгенерировать метрики в формате Prometheus."""
         return generate_latest(self.registry)
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import Any
 
-from ___check.langfuse import handler
 from app.core.kafka_broker.schemas import (
     ERROR_TRACES,
     CodeError,
@@ -14,6 +14,7 @@ from app.core.kafka_broker.schemas import (
 )
 from app.services.RAG.rag_pipeline.pipeline import RAGPipeline
 from app.services.RAG.rag_pipeline.state import RAGState
+from app.services.tracing import langfuse_callbacks
 
 logger = logging.getLogger(__name__)
 
@@ -60,19 +61,67 @@ class RagService:
 
         state: RAGState = await self.pipeline.query(
             body.test_questions,
-            callbacks=[handler],
+            callbacks=langfuse_callbacks(),
         )
 
-        # Извлечение ответа из state
+        answer = self._extract_answer(state)
+        logger.info(f"Получен ответ RAG: {answer[:100]}...")
+        return LangchainProducerMessage(message=answer, statusCode=StatusCode.SUCCESS)
+
+    async def handle_message_stream(
+        self,
+        body: LangchainConsumerMessage,
+        headers: dict[str, Any],
+        on_partial: Callable[[LangchainProducerMessage], Awaitable[Any]],
+        key: bytes | None = None,
+        min_chars: int = 50,
+    ) -> LangchainProducerMessage:
+        """
+        Обрабатывает сообщение в потоковом режиме.
+
+        Частичные ответы (накопленный текст, statusCode=PARTIAL) отдаются в on_partial
+        не чаще, чем раз в min_chars новых символов; итоговый ответ возвращается как обычно.
+        """
+        logger.info("Начало потоковой обработки сообщения через LangChain RAG")
+
+        text = ""
+        published = 0
+        state: RAGState = {}
+        async for event in self.pipeline.query_stream(body.test_questions, callbacks=langfuse_callbacks()):
+            if event["type"] == "token":
+                text += event["delta"]
+                if len(text) - published >= min_chars:
+                    await on_partial(LangchainProducerMessage(message=text, statusCode=StatusCode.PARTIAL))
+                    published = len(text)
+            elif event["type"] == "final":
+                state = event["state"]
+
+        answer = self._extract_answer(state)
+        logger.info(f"Получен ответ RAG (stream): {answer[:100]}...")
+        return LangchainProducerMessage(message=answer, statusCode=StatusCode.SUCCESS)
+
+    async def stream_answer(self, question: str) -> AsyncIterator[str]:
+        """
+        Отдаёт ответ RAG по частям (дельты текста) — для HTTP/SSE.
+        Если LLM работает без стрима, ответ придёт одним куском.
+        """
+        streamed = False
+        async for event in self.pipeline.query_stream(question, callbacks=langfuse_callbacks()):
+            if event["type"] == "token":
+                streamed = True
+                yield event["delta"]
+            elif event["type"] == "final" and not streamed:
+                yield self._extract_answer(event["state"])
+
+    @staticmethod
+    def _extract_answer(state: RAGState) -> str:
+        """Извлечение ответа из state (последнее сообщение — обычно ответ AI)."""
         messages = state.get("messages", [])
         answer = "Нет ответа"
         if messages:
             content = messages[-1].content
-            # Берем последнее сообщение (обычно это ответ AI)
             answer = content if isinstance(content, str) else str(content)
-
-        logger.info(f"Получен ответ RAG: {answer[:100]}...")
-        return LangchainProducerMessage(message=answer, statusCode=StatusCode.SUCCESS)
+        return answer
 
     @classmethod
     def create_error_message(
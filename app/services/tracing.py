@@ -0,0 +1,28 @@
+from functools import lru_cache
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.core.config import CONFIG
+
+
+@lru_cache(maxsize=1)
+def langfuse_callbacks() -> list[BaseCallbackHandler]:
+    """
+    Callback-и трассировки RAG-графа в Langfuse.
+
+    Клиент Langfuse создаётся при первом запросе, а не при импорте сервиса
+    (импорт langfuse и инициализация клиента заметно замедляют старт воркера).
+    При CONFIG.langfuse.enable=False трассировка выключена — пустой список.
+    """
+    if not CONFIG.langfuse.enable:
+        return []
+
+    from langfuse import Langfuse
+    from langfuse.langchain import CallbackHandler
+
+    Langfuse(
+        secret_key=CONFIG.langfuse.secret_key,
+        public_key=CONFIG.langfuse.public_key,
+        host=CONFIG.langfuse.base_url,
+    )
+    return [CallbackHandler()]
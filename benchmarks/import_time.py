@@ -0,0 +1,80 @@
+"""
+Регрессионный бенчмарк времени импорта сервиса (холодный старт воркера).
+
+Запускает `python -X importtime -c "import <module>"` в чистом процессе несколько раз,
+печатает медиану и самые тяжёлые импорты и проверяет, что тяжёлые библиотеки
+(torch, sentence-transformers, IPython, langfuse) не грузятся при импорте.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --module app.core.container --runs 5 --budget-ms 3000
+
+Код возврата 1 — если превышен бюджет или загружена тяжёлая библиотека.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "IPython", "langfuse")
+
+
+def measure(module: str) -> tuple[float, list[tuple[float, str]], list[str]]:
+    """Один холодный импорт: (общее время, мс; [(время, мс; модуль)]; загруженные тяжёлые модули)."""
+    code = f"import sys, {module}; print('HEAVY:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: list[tuple[float, str]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        timings.append((int(cumulative) / 1000, name.strip()))
+
+    total = next(ms for ms, name in timings if name == module)
+    marker = next(line for line in result.stdout.splitlines() if line.startswith("HEAVY:"))
+    heavy = [name for name in marker.removeprefix("HEAVY:").split(",") if name]
+    return total, sorted(timings, reverse=True), heavy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.service_main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Порог медианы времени импорта")
+    args = parser.parse_args()
+
+    totals: list[float] = []
+    timings: list[tuple[float, str]] = []
+    heavy: list[str] = []
+    for _ in range(args.runs):
+        total, timings, heavy = measure(args.module)
+        totals.append(total)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: медиана {median:.0f} мс ({', '.join(f'{t:.0f}' for t in totals)})")
+    print(f"Самые тяжёлые импорты (cumulative, последний прогон, top {args.top}):")
+    for ms, name in timings[: args.top]:
+        print(f"  {ms:9.1f} мс  {name}")
+
+    failed = False
+    if heavy:
+        print(f"❌ При импорте загружены тяжёлые модули: {', '.join(heavy)}")
+        failed = True
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"❌ Медиана {median:.0f} мс превышает бюджет {args.budget_ms:.0f} мс")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Бенчмарк накладных расходов логирования на одно Kafka-сообщение в middleware.
+
+Сравнивает прежние f-строки (AutoPublishMiddleware: тело сообщения целиком + итоговая строка)
+с LazyLogger.event при выключенном уровне (WARNING) и включённом (INFO, форматирование в пустой поток).
+
+    python benchmarks/middleware_logging.py
+    python benchmarks/middleware_logging.py --messages 50000 --payload-items 200
+
+Печатает мкс на сообщение для каждого варианта.
+"""
+
+import argparse
+import io
+import logging
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.logger.lazy import LazyLogger, PayloadSampler  # noqa: E402
+
+TOPIC = "topic-out"
+HEADERS = {"requestId": "5f0c6e8e-4b7a-4c52-9a43-3a4a0f1f6f00"}
+KEY = b"key-1"
+
+
+def make_payload(items: int) -> dict[str, object]:
+    return {"answer": "текст ответа " * 20, "sources": [{"id": i, "score": i / items} for i in range(items)]}
+
+
+def eager(logger: logging.Logger, payload: dict[str, object], elapsed: float) -> None:
+    logger.info(f"📤Отправка сообщения в топик: {TOPIC} | message: {payload} | headers: {HEADERS} | key: {KEY!r}")
+    logger.info(f"✅ Результат опубликован | topic={TOPIC} | partition=0 | offset=42 | время:⏱️ {elapsed:.3f}с")
+
+
+def lazy(logger: LazyLogger, payload: dict[str, object], elapsed: float) -> None:
+    logger.event(logging.INFO, "📤 Отправка сообщения в топик", topic=TOPIC, headers=HEADERS, key=KEY, payload=payload)
+    logger.event(logging.INFO, "✅ Результат опубликован", topic=TOPIC, partition=0, offset=42, duration=elapsed)
+
+
+LogMessage = Callable[[dict[str, object], float], None]
+
+
+def microseconds_per_message(log_message: LogMessage, payload: dict[str, object], messages: int) -> float:
+    started = time.perf_counter()
+    for i in range(messages):
+        log_message(payload, i / messages)
+    return (time.perf_counter() - started) / messages * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--payload-items", type=int, default=100, help="Размер тела сообщения (элементов в sources)")
+    parser.add_argument("--sample-rate", type=float, default=0.01, help="LOG_PAYLOAD__SAMPLE_RATE для сэмплинга")
+    args = parser.parse_args()
+
+    payload = make_payload(args.payload_items)
+    base = logging.getLogger("benchmarks.middleware_logging")
+    base.propagate = False
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s:%(funcName)s - %(message)s"))
+    base.addHandler(handler)
+
+    full = LazyLogger(base, PayloadSampler())
+    sampled = LazyLogger(base, PayloadSampler(sample_rate=args.sample_rate))
+    variants: dict[str, LogMessage] = {
+        "f-строки": lambda p, e: eager(base, p, e),
+        "LazyLogger.event": lambda p, e: lazy(full, p, e),
+        f"LazyLogger.event, sample_rate={args.sample_rate}": lambda p, e: lazy(sampled, p, e),
+    }
+    for level in (logging.WARNING, logging.INFO):
+        base.setLevel(level)
+        print(f"Уровень логгера {logging.getLevelName(level)}:")
+        for name, log_message in variants.items():
+            handler.stream = io.StringIO()
+            print(f"  {name:<40} {microseconds_per_message(log_message, payload, args.messages):8.2f} мкс/сообщение")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Микробенчмарк TslgFormatter: записей в секунду для прежнего пути (TSLGMsgSchemas + model_dump_json,
+TSLG__VALIDATE_SCHEMA=true) и быстрого пути без pydantic (по умолчанию).
+
+    python benchmarks/tslg_formatter.py
+    python benchmarks/tslg_formatter.py --records 50000 --repeat 5 --min-speedup 2
+
+Код возврата 1 — если ускорение меньше --min-speedup.
+"""
+
+import argparse
+import logging
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import CONFIG  # noqa: E402
+from app.core.logger.formatter import TslgFormatter  # noqa: E402
+
+
+def make_records(count: int) -> list[logging.LogRecord]:
+    """Записи как в middleware-ах: половина — внутри запроса (request_id), половина — без."""
+    request_id = str(uuid.uuid4())
+    records = []
+    for i in range(count):
+        record = logging.LogRecord(
+            "app.core.kafka_broker.middlewares",
+            logging.INFO,
+            "/app/core/kafka_broker/middlewares.py",
+            120,
+            "📥 Получено сообщение %s из топика %s",
+            (i, CONFIG.read_kafka.topic_in),
+            None,
+            "consume_scope",
+        )
+        record.request_id = request_id if i % 2 else "-"
+        records.append(record)
+    return records
+
+
+def records_per_second(formatter: TslgFormatter, records: list[logging.LogRecord], repeat: int) -> float:
+    """Лучший из repeat прогонов (записей/с)."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for record in records:
+            formatter.format(record)
+        best = min(best, time.perf_counter() - started)
+    return len(records) / best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-speedup", type=float, default=None, help="Минимальное ускорение быстрого пути")
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    validated = TslgFormatter(CONFIG.tslg.model_copy(update={"validate_schema": True}), is_fluentbit=False)
+    fast = TslgFormatter(CONFIG.tslg.model_copy(update={"validate_schema": False}), is_fluentbit=False)
+
+    before = records_per_second(validated, records, args.repeat)
+    after = records_per_second(fast, records, args.repeat)
+    speedup = after / before
+    print(f"TSLGMsgSchemas (validate_schema): {before:12,.0f} записей/с")
+    print(f"быстрый путь (orjson):            {after:12,.0f} записей/с")
+    print(f"ускорение: x{speedup:.1f}")
+
+    if args.min_speedup is not None and speedup < args.min_speedup:
+        print(f"❌ Ускорение x{speedup:.1f} меньше порога x{args.min_speedup:.1f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
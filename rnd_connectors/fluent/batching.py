@@ -0,0 +1,155 @@
+import json
+import queue
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from rnd_connectors.fluent.client import FluentdClient
+from rnd_connectors.fluent.protocols import FluentdConfigProtocol
+
+_SPOOL_FILE = "fluentd-spool.jsonl"
+
+
+class FluentdBatchSender:
+    """
+    Пакетная отправка записей в Fluentd из фонового потока.
+
+    - submit кладёт запись в ограниченную очередь (max_queue_size); нет места дольше
+      enqueue_timeout_seconds — запись отбрасывается и считается в dropped;
+    - записи группируются по тегу (endpoint-у) и уходят одним запросом на batch_size записей
+      или раз в flush_interval_seconds;
+    - неудачная пачка повторяется max_retries раз с экспоненциальной задержкой, затем пишется
+      в spool-файл (spool_dir); пока Fluentd недоступен, новые пачки сразу идут в spool,
+      после первой успешной отправки spool досылается.
+
+    Ошибки выводятся через print, а не logging: иначе лог об ошибке отправки
+    логов снова попал бы в эту же очередь.
+    """
+
+    def __init__(self, client: FluentdClient, config: FluentdConfigProtocol) -> None:
+        self.client = client
+        self.config = config
+        self.dropped = 0
+        self.spooled = 0  # записей, ушедших в spool (не отправленных сразу)
+        self._queue: queue.Queue[tuple[str, dict] | None] = queue.Queue(maxsize=config.max_queue_size)
+        self._spool_path = Path(config.spool_dir) / _SPOOL_FILE if config.spool_dir else None
+        self._retry_at = 0.0  # до этого момента Fluentd считается недоступным
+        self._thread = threading.Thread(target=self._run, name="fluentd-batch-sender", daemon=True)
+        self._thread.start()
+
+    def submit(self, tag: str, record: dict) -> bool:
+        """Ставит запись в очередь отправки; False — очередь переполнена, запись отброшена."""
+        try:
+            if self.config.enqueue_timeout_seconds > 0:
+                self._queue.put((tag, record), timeout=self.config.enqueue_timeout_seconds)
+            else:
+                self._queue.put_nowait((tag, record))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    @property
+    def size(self) -> int:
+        return self._queue.qsize()
+
+    # ───────── фоновый поток ─────────
+    def _run(self) -> None:
+        buffers: dict[str, list[dict]] = defaultdict(list)
+        flush_at: float | None = None
+        while True:
+            timeout = None if flush_at is None else max(0.0, flush_at - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._flush_all(buffers)
+                flush_at = None
+                continue
+
+            if item is None:
+                self._flush_all(buffers)
+                return
+
+            tag, record = item
+            buffers[tag].append(record)
+            if len(buffers[tag]) >= self.config.batch_size:
+                self._flush(tag, buffers.pop(tag))
+            if not buffers:
+                flush_at = None
+            elif flush_at is None:
+                flush_at = time.monotonic() + self.config.flush_interval_seconds
+
+    def _flush_all(self, buffers: dict[str, list[dict]]) -> None:
+        for tag in list(buffers):
+            self._flush(tag, buffers.pop(tag))
+
+    def _flush(self, tag: str, records: list[dict]) -> None:
+        if time.monotonic() < self._retry_at:
+            self._spool(tag, records)
+            return
+        if not self._send_with_retry(tag, records):
+            self._retry_at = time.monotonic() + self.config.retry_backoff_seconds * 2**self.config.max_retries
+            self._spool(tag, records)
+            return
+        self._replay_spool()
+
+    def _send_with_retry(self, tag: str, records: list[dict]) -> bool:
+        for attempt in range(self.config.max_retries + 1):
+            if self.client.send_batch(tag, records):
+                return True
+            if attempt < self.config.max_retries:
+                time.sleep(self.config.retry_backoff_seconds * 2**attempt)
+        return False
+
+    # ───────── spool ─────────
+    def _spool(self, tag: str, records: list[dict]) -> None:
+        path = self._spool_path
+        if path is None or (path.exists() and path.stat().st_size >= self.config.spool_max_bytes):
+            self.dropped += len(records)
+            print(f"Fluentd недоступен: отброшено записей {len(records)} ({tag})")
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"tag": tag, "records": records}, ensure_ascii=False) + "\n")
+        except OSError as e:
+            self.dropped += len(records)
+            print(f"Fluentd spool: ошибка записи {path}: {e}")
+            return
+        self.spooled += len(records)
+
+    def _replay_spool(self) -> None:
+        path = self._spool_path
+        if path is None:
+            return
+        replaying = path.with_suffix(".replay")
+        # .replay остаётся, если процесс упал посреди досылки, — досылаем его первым, иначе replace его затрёт
+        if replaying.exists() and not self._replay_file(replaying, path):
+            return
+        if path.exists():
+            path.replace(replaying)
+            self._replay_file(replaying, path)
+
+    def _replay_file(self, replaying: Path, path: Path) -> bool:
+        """Досылает пачки из replaying; False — Fluentd снова недоступен, остаток возвращён в spool."""
+        lines = replaying.read_text(encoding="utf-8").splitlines(keepends=True)
+        sent = True
+        for i, line in enumerate(lines):
+            entry = json.loads(line)
+            if not self.client.send_batch(entry["tag"], entry["records"]):
+                # остаток — обратно в spool, следующая попытка после успешной отправки
+                with path.open("a", encoding="utf-8") as f:
+                    f.writelines(lines[i:])
+                sent = False
+                break
+        replaying.unlink()
+        return sent
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """Досылает накопленные записи и останавливает поток."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self.client.close()
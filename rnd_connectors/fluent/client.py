@@ -1,15 +1,25 @@
+import json
+import threading
 from urllib.parse import urljoin
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError, ConnectTimeout
 
 from rnd_connectors.fluent.protocols import FluentdConfigProtocol
 from rnd_connectors.fluent.schemas import FluentDBLog, FluentELKLog, FluentZSMLog
 
+# Теги (пути in_http) Fluentd
+DB_TAG = "pim.logger.db"
+EFK_TAG = "pim.logger.efk/"
+ZSM_TAG = "pim.metrics.zsm"
+
 
 class FluentdClient:
     """
     Fluentd adapter handler for base Python`s logger.
+
+    Для каждого endpoint-а (тега) — своя requests.Session с пулом соединений (keep-alive).
     """
 
     def __init__(self, fluent_config: FluentdConfigProtocol):
@@ -18,15 +28,29 @@ class FluentdClient:
         :param fluent_config: FluentdConfigProtocol
         """
         self.fluentd_config = fluent_config
+        self._sessions: dict[str, requests.Session] = {}
+        # _session вызывается из потоков общего executor-а
+        self._sessions_lock = threading.Lock()
 
-    def _request_post(self, msg: dict, url: str, timeout: float | None = None):
+    def _session(self, url: str) -> requests.Session:
+        session = self._sessions.get(url)
+        if session is not None:
+            return session
+        with self._sessions_lock:
+            session = self._sessions.get(url)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.fluentd_config.pool_maxsize)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                # без cert_path — проверка по системным CA (как verify=None в requests.post)
+                session.verify = (self.fluentd_config.cert_path or True) if self.fluentd_config.verify else False
+                self._sessions[url] = session
+        return session
+
+    def _post(self, url: str, timeout: float | None = None, **kwargs):
         try:
-            response = requests.post(
-                url,
-                json=msg,
-                verify=self.fluentd_config.cert_path if self.fluentd_config.verify else False,
-                timeout=timeout or self.fluentd_config.timeout,
-            )
+            response = self._session(url).post(url, timeout=timeout or self.fluentd_config.timeout, **kwargs)
             return response
 
         except (ConnectTimeout, ConnectionError) as e:
@@ -37,17 +61,45 @@ class FluentdClient:
             print(f"непредвиденная ошибка: {e}")
             return None
 
+    def _request_post(self, msg: dict, url: str, timeout: float | None = None):
+        return self._post(url, timeout, json=msg)
+
     def send_to_db(self, msg: FluentDBLog, timeout: float | None = None):
         msg_dict = msg.model_dump(exclude_none=True)
-        url = urljoin(self.fluentd_config.url, "pim.logger.db")
+        url = urljoin(self.fluentd_config.url, DB_TAG)
         return self._request_post(msg_dict, url, timeout)
 
     def send_to_efk(self, msg: FluentELKLog, timeout: float | None = None):
         msg_dict = msg.model_dump(exclude_none=True)
-        url = urljoin(self.fluentd_config.url, "pim.logger.efk/")
+        url = urljoin(self.fluentd_config.url, EFK_TAG)
         return self._request_post(msg_dict, url, timeout)
 
     def send_to_metric(self, msg: FluentZSMLog, timeout: float | None = None):
         msg_dict = msg.model_dump(exclude_none=True)
-        url = urljoin(self.fluentd_config.url, "pim.metrics.zsm")
+        url = urljoin(self.fluentd_config.url, ZSM_TAG)
         return self._request_post(msg_dict, url, timeout)
+
+    def send_batch(self, tag: str, records: list[dict], timeout: float | None = None) -> bool:
+        """
+        Отправляет пачку записей одним запросом (in_http принимает массив записей).
+        Формат тела — batch_format: json (JSON-массив) или msgpack (msgpack-массив).
+
+        :return: True — Fluentd принял пачку (2xx)
+        """
+        url = urljoin(self.fluentd_config.url, tag)
+        if self.fluentd_config.batch_format == "msgpack":
+            import msgpack  # type: ignore[import-untyped]  # зависимость fluent-logger; нужна только для этого формата
+
+            body = msgpack.packb(records)
+            content_type = "application/msgpack"
+        else:
+            body = json.dumps(records, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json"
+        response = self._post(url, timeout, data=body, headers={"Content-Type": content_type})
+        return response is not None and response.ok
+
+    def close(self) -> None:
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import Literal, Protocol
 
 
 class FluentdConfigProtocol(Protocol):
@@ -17,7 +17,20 @@ class FluentdConfigProtocol(Protocol):
     environment: str
     timeout: float
     raise_exceptions: bool
-    
+
+    # пакетная отправка (FluentdBatchSender)
+    pool_maxsize: int
+    batch_enabled: bool
+    batch_format: Literal["json", "msgpack"]
+    batch_size: int
+    flush_interval_seconds: float
+    max_queue_size: int
+    enqueue_timeout_seconds: float
+    max_retries: int
+    retry_backoff_seconds: float
+    spool_dir: str | None
+    spool_max_bytes: int
+
     @property
     def index_name(self) -> str:
         return f"{self.index_prefix}__{self.app_name}"
\ No newline at end of file
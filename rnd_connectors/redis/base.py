@@ -1,18 +1,32 @@
 import json
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import TYPE_CHECKING, Generic, TypeVar, cast
 
 from rnd_connectors.redis.schemas import RedisConfig
 
+if TYPE_CHECKING:
+    # используются в параметрах BaseRedisClient["..."] (redis импортируется лениво в _init_client)
+    from redis import Redis  # noqa: F401
+    from redis.asyncio import Redis as AsyncRedis  # noqa: F401
 
-class BaseRedisClient(ABC):
+ClientT = TypeVar("ClientT")
+
+
+class BaseRedisClient(ABC, Generic[ClientT]):
     """Базовый класс Redis клиента, определяющий общий интерфейс"""
 
     def __init__(self, config: RedisConfig):
         self.expiration = config.expiration
-        self._client = None
+        self._client: ClientT | None = None
         self._init_client(config)
 
+    def _require_client(self) -> ClientT:
+        """Клиент Redis; RuntimeError, если соединение не инициализировано."""
+        if self._client is None:
+            raise RuntimeError(f"{type(self).__name__}: клиент Redis не подключён")
+        return self._client
+
     @abstractmethod
     def _init_client(self, config: RedisConfig):
         pass
@@ -34,7 +48,7 @@ class BaseRedisClient(ABC):
         return json.dumps(data)
 
 
-class SyncRedisClient(BaseRedisClient):
+class SyncRedisClient(BaseRedisClient["Redis"]):
     """Синхронный клиент Redis
 
     Методы синхронного взаимодействия:
@@ -54,19 +68,19 @@ class SyncRedisClient(BaseRedisClient):
 
     def get(self, trace_id: str) -> dict | None:
         """Синхронный get метод"""
-        data = self._client.get(trace_id)
+        data = self._require_client().get(trace_id)
         return json.loads(data) if data else None
 
     def set(self, trace_id: str, data: dict):
         """Синхронный set метод."""
-        if not self._client.set(trace_id, self._prepare_data(data), ex=self.expiration):
+        if not self._require_client().set(trace_id, self._prepare_data(data), ex=self.expiration):
             raise KeyError("Ключ уже используется")
 
     def ping(self):
-        return self._client.ping()
+        return self._require_client().ping()
 
 
-class AsyncRedisClient(BaseRedisClient):
+class AsyncRedisClient(BaseRedisClient["AsyncRedis"]):
     """Асинхронный клиент Redis"""
 
     def _init_client(self, config: RedisConfig):
@@ -77,15 +91,43 @@ class AsyncRedisClient(BaseRedisClient):
     async def get(self, trace_id: str) -> dict | None:
         """Асинхронный get метод"""
 
-        data = await self._client.get(trace_id)
+        data = await self._require_client().get(trace_id)
         return json.loads(data) if data else None
 
     async def set(self, trace_id: str, data: dict):
         """Асинхронный set метод."""
-        if not await self._client.set(
+        if not await self._require_client().set(
             trace_id, self._prepare_data(data), ex=self.expiration
         ):
             raise KeyError("Ключ уже используется")
 
     async def ping(self):
-        return await self._client.ping()
+        return await self._require_client().ping()
+
+    async def delete(self, *keys: str | bytes) -> int:
+        """Удаляет ключи, возвращает число удалённых."""
+        if not keys:
+            return 0
+        return await self._require_client().delete(*keys)
+
+    async def zadd(self, name: str, mapping: dict[str, float]) -> int:
+        """Добавляет элементы в sorted set (member → score)."""
+        # без incr=True redis возвращает число добавленных элементов
+        return int(await self._require_client().zadd(name, mapping) or 0)
+
+    async def zcard(self, name: str) -> int:
+        """Размер sorted set."""
+        return await self._require_client().zcard(name)
+
+    async def zpopmin(self, name: str, count: int) -> list[tuple[bytes, float]]:
+        """Извлекает count элементов с наименьшим score."""
+        # RESP2: список пар (member, score)
+        return cast("list[tuple[bytes, float]]", await self._require_client().zpopmin(name, count))
+
+    async def zremrangebyscore(self, name: str, min_score: float, max_score: float) -> int:
+        """Удаляет элементы sorted set со score в диапазоне [min_score, max_score]."""
+        return await self._require_client().zremrangebyscore(name, min_score, max_score)
+
+    async def aclose(self):
+        """Закрывает пул соединений."""
+        await self._require_client().aclose()
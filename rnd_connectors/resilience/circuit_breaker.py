@@ -0,0 +1,143 @@
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from enum import Enum
+
+import httpx
+
+from rnd_connectors.resilience.protocols import CircuitBreakerConfigProtocol
+
+logger = logging.getLogger(__name__)
+
+_TOO_MANY_REQUESTS = 429
+_SERVER_ERROR = 500
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Вызов отклонён без обращения к бэкенду: цепь разомкнута."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit '{name}' is open, retry after {retry_after:.1f}s")
+
+
+def is_availability_error(error: BaseException) -> bool:
+    """
+    Ошибка доступности бэкенда: сеть/таймаут (нет HTTP-статуса), 429 или 5xx.
+    Остальные HTTP-ошибки (400, 401, ...) значат, что бэкенд отвечает, — цепь не размыкают.
+    """
+    current: BaseException | None = error
+    while current is not None:
+        status_code = getattr(current, "status_code", None)
+        if isinstance(current, httpx.HTTPStatusError):
+            status_code = current.response.status_code
+        if isinstance(status_code, int):
+            return status_code == _TOO_MANY_REQUESTS or status_code >= _SERVER_ERROR
+        current = current.__cause__
+    return True
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker для одного бэкенда.
+
+    - closed: вызовы идут в бэкенд; failure_threshold ошибок доступности подряд → open;
+    - open: вызовы сразу падают с CircuitOpenError (бэкенд не нагружается, воркеры не висят на ретраях);
+    - через recovery_timeout_seconds → half_open: пропускается до half_open_max_calls пробных вызовов;
+      успех → closed, ошибка → снова open.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: CircuitBreakerConfigProtocol,
+        is_failure: Callable[[BaseException], bool] = is_availability_error,
+        on_state_change: Callable[[str, CircuitState], None] | None = None,
+    ) -> None:
+        """
+        :param is_failure: какие исключения считаются отказом бэкенда
+        :param on_state_change: callback (name, новое состояние) — например, для метрик
+        """
+        self.name = name
+        self.failure_threshold = config.failure_threshold
+        self.recovery_timeout = config.recovery_timeout_seconds
+        self.half_open_max_calls = config.half_open_max_calls
+        self.is_failure = is_failure
+        self.on_state_change = on_state_change
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state is CircuitState.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._set_state(CircuitState.HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: CircuitState) -> None:
+        if state is self._state:
+            return
+        self._state = state
+        self._probes = 0
+        if state is CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+            logger.warning(f"⛔ Circuit '{self.name}' разомкнут на {self.recovery_timeout} с")
+        else:
+            logger.info(f"🔌 Circuit '{self.name}': {state.value}")
+        if self.on_state_change is not None:
+            self.on_state_change(self.name, state)
+
+    def before_call(self) -> None:
+        """Разрешение на вызов; CircuitOpenError — если цепь разомкнута или пробные вызовы заняты."""
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return
+        if state is CircuitState.HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return
+        retry_after = max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._failures = 0
+            self._set_state(CircuitState.OPEN)
+
+    def _release_probe(self) -> None:
+        if self._state is CircuitState.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """Обёртка одного вызова бэкенда: async with breaker.guard(): ..."""
+        self.before_call()
+        try:
+            yield
+        except CircuitOpenError:
+            # отказ вложенного breaker-а (например, токена) — не результат этого бэкенда
+            self._release_probe()
+            raise
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            self._release_probe()
+            raise
+        self.record_success()
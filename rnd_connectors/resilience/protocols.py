@@ -0,0 +1,7 @@
+from typing import Protocol
+
+
+class CircuitBreakerConfigProtocol(Protocol):
+    failure_threshold: int
+    recovery_timeout_seconds: float
+    half_open_max_calls: int
@@ -23,6 +23,15 @@ class TSLGConfigProtocol(Protocol):
 
     # Дополнительные параметры
     aggregation_type: str  # тип агрегации (TRACING/OPENSHIFT_EVENT/...)
+    validate_schema: bool  # Отладка: сообщения TslgFormatter валидируются через TSLGMsgSchemas
+
+    # Постоянное TCP-соединение с пакетной записью кадров (TslgTcpSender)
+    tcp_batching: bool
+    tcp_buffer_frames: int
+    tcp_batch_bytes: int
+    tcp_connect_timeout_seconds: float
+    tcp_reconnect_min_seconds: float
+    tcp_reconnect_max_seconds: float
 
     # Параметры подключения к Kafka
     kafka_topic: str
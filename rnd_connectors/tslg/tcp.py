@@ -0,0 +1,116 @@
+import random
+import socket
+import threading
+from collections import deque
+
+from rnd_connectors.tslg.protocols import TSLGConfigProtocol
+
+
+class TslgTcpSender:
+    """
+    Неблокирующая отправка кадров в TSLG Agent по постоянному TCP-соединению.
+
+    - send только кладёт кадр в кольцевой буфер (tcp_buffer_frames); при переполнении
+      вытесняется самый старый кадр (считается в dropped) — вызывающий не ждёт сеть;
+    - фоновый поток склеивает накопленные кадры в одну запись sendall до tcp_batch_bytes;
+    - при ошибке соединение закрывается, неотправленная пачка возвращается в начало буфера,
+      переподключение — с экспоненциальной задержкой и full jitter
+      (tcp_reconnect_min_seconds .. tcp_reconnect_max_seconds).
+
+    Ошибки выводятся через print, а не logging: лог об ошибке отправки снова попал бы в буфер.
+    """
+
+    def __init__(self, config: TSLGConfigProtocol) -> None:
+        self.host = config.host
+        self.port = config.port
+        self.batch_bytes = config.tcp_batch_bytes
+        self.connect_timeout = config.tcp_connect_timeout_seconds
+        self.reconnect_min_seconds = config.tcp_reconnect_min_seconds
+        self.reconnect_max_seconds = config.tcp_reconnect_max_seconds
+        self.dropped = 0
+        self._frames: deque[bytes] = deque(maxlen=config.tcp_buffer_frames)
+        self._cond = threading.Condition()
+        self._closing = False
+        self._sock: socket.socket | None = None
+        self._thread = threading.Thread(target=self._run, name="tslg-tcp-sender", daemon=True)
+        self._thread.start()
+
+    def send(self, frame: bytes) -> None:
+        with self._cond:
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+            self._frames.append(frame)
+            self._cond.notify()
+
+    @property
+    def size(self) -> int:
+        return len(self._frames)
+
+    def _next_batch(self) -> list[bytes]:
+        """Кадры для одной записи (ждёт хотя бы один); пустой список — остановка."""
+        with self._cond:
+            while not self._frames and not self._closing:
+                self._cond.wait()
+            batch: list[bytes] = []
+            size = 0
+            while self._frames and (not batch or size + len(self._frames[0]) <= self.batch_bytes):
+                frame = self._frames.popleft()
+                batch.append(frame)
+                size += len(frame)
+            return batch
+
+    def _requeue(self, batch: list[bytes]) -> None:
+        with self._cond:
+            # в начало буфера; не влезающие (самые старые) кадры пачки отбрасываются, свежие не вытесняются
+            free = self._frames.maxlen - len(self._frames)  # type: ignore[operator]
+            if len(batch) > free:
+                self.dropped += len(batch) - free
+                batch = batch[len(batch) - free :]
+            self._frames.extendleft(reversed(batch))
+
+    def _connect(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(None)
+        return sock
+
+    def _close_socket(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _run(self) -> None:
+        attempt = 0
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                break
+            try:
+                if self._sock is None:
+                    self._sock = self._connect()
+                self._sock.sendall(b"".join(batch))
+                attempt = 0
+            except OSError as e:
+                self._close_socket()
+                self._requeue(batch)
+                if self._closing:
+                    break
+                delay = random.uniform(
+                    self.reconnect_min_seconds,
+                    min(self.reconnect_max_seconds, self.reconnect_min_seconds * 2**attempt),
+                )
+                attempt += 1
+                print(f"TSLG TCP {self.host}:{self.port} недоступен: {e!r}, повтор через {delay:.1f} с")
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closing, timeout=delay)
+        self._close_socket()
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Досылает буфер (не дольше timeout) и закрывает соединение."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import json
 import logging
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager, nullcontext
 from typing import Any, Literal
 from urllib.parse import urljoin
 
 import httpx
 
+from rnd_connectors.resilience.circuit_breaker import CircuitBreaker
 from rnd_connectors.yandex_llm.exceptions import YaGPTClientError
 from rnd_connectors.yandex_llm.token_manager import AsyncTokenManager, SyncTokenManager
 
@@ -77,7 +81,7 @@ class YaGPTSyncClient(HeaderMixin):
                     headers=merged_headers,
                 )
             if response.status_code != 200:
-                raise YaGPTClientError(response.text)
+                raise YaGPTClientError(response.text, status_code=response.status_code)
             return response.json()
 
         except httpx.ReadTimeout:
@@ -110,7 +114,8 @@ class YaGPTAsyncClient(HeaderMixin):
     """
     Main client used by Pipeline / Processors.
 
-    • stream & reasoning_mode – deliberately disabled (False / None)
+    • reasoning_mode – deliberately disabled (None)
+    • stream – via `stream()` (NDJSON, one partial result per line)
     • any HTTP verb supported via `request`
     """
 
@@ -120,15 +125,55 @@ class YaGPTAsyncClient(HeaderMixin):
         folder_id: str,
         api_url: str,
         use_ssl: bool = False,
+        http_client: httpx.AsyncClient | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
     ):
+        """
+        :param http_client: общий (пуловый) httpx.AsyncClient. Если не передан —
+            на каждый запрос создаётся свой клиент (новое соединение).
+            У общего клиента verify задаётся на уровне пула, use_ssl не применяется.
+        :param circuit_breaker: при разомкнутой цепи запросы сразу падают с CircuitOpenError
+        """
         super().__init__(folder_id=folder_id)
         self.token_manager = token_manager
         self.api_url = api_url
         self.use_ssl = use_ssl
+        self.http_client = http_client
+        self.circuit_breaker = circuit_breaker
+
+    def _guard(self) -> AbstractAsyncContextManager[None]:
+        return self.circuit_breaker.guard() if self.circuit_breaker is not None else nullcontext()
 
     def _full_url(self, endpoint: str) -> str:
         return urljoin(self.api_url, endpoint)
 
+    async def _send(
+        self,
+        method: _HTTP_METHOD,
+        endpoint: str,
+        json: dict[str, Any] | None,
+        headers: dict[str, str] | None,
+        timeout: float,
+    ) -> httpx.Response:
+        if self.http_client is not None:
+            merged_headers = await self._create_headers(headers)
+            return await self.http_client.request(
+                method=method,
+                url=self._full_url(endpoint),
+                json=json,
+                headers=merged_headers,
+                timeout=timeout,
+            )
+
+        async with httpx.AsyncClient(verify=self.use_ssl, timeout=timeout) as client:
+            merged_headers = await self._create_headers(headers)
+            return await client.request(
+                method=method,
+                url=self._full_url(endpoint),
+                json=json,
+                headers=merged_headers,
+            )
+
     async def _create_headers(self, *extra: dict[str, str] | None) -> dict[str, str]:
         return self.create_headers(await self.token_manager.id_token, *extra)
 
@@ -141,26 +186,20 @@ class YaGPTAsyncClient(HeaderMixin):
         headers: dict[str, str] | None = None,
         timeout: float = 15.0,
     ) -> dict[str, Any]:
-        try:
-            async with httpx.AsyncClient(verify=self.use_ssl, timeout=timeout) as client:
-                merged_headers = await self._create_headers(headers)
-                response = await client.request(
-                    method=method,
-                    url=self._full_url(endpoint),
-                    json=json,
-                    headers=merged_headers,
-                )
-            if response.status_code != 200:
-                raise YaGPTClientError(response.text)
-            return response.json()
+        async with self._guard():
+            try:
+                response = await self._send(method, endpoint, json=json, headers=headers, timeout=timeout)
+                if response.status_code != 200:
+                    raise YaGPTClientError(response.text, status_code=response.status_code)
+                return response.json()
 
-        except httpx.ReadTimeout:
-            logger.exception("Async YaGPT %s %s failed", method, endpoint)
-            raise YaGPTClientError("Истекло время ожидания read_timeout")
+            except httpx.ReadTimeout:
+                logger.exception("Async YaGPT %s %s failed", method, endpoint)
+                raise YaGPTClientError("Истекло время ожидания read_timeout")
 
-        except (httpx.RequestError, httpx.HTTPStatusError) as exc:
-            logger.exception("Async YaGPT %s %s failed: %s", method, endpoint, exc)
-            raise YaGPTClientError(str(exc)) from exc
+            except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+                logger.exception("Async YaGPT %s %s failed: %s", method, endpoint, exc)
+                raise YaGPTClientError(str(exc)) from exc
 
     # convenience wrapper (keeps old API)
     async def post(
@@ -181,3 +220,59 @@ class YaGPTAsyncClient(HeaderMixin):
             headers=headers,
             timeout=timeout,
         )
+
+    async def stream(
+        self,
+        endpoint: str,
+        payload: dict[str, Any],
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float = 60.0,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Выполняет потоковый POST-запрос (completionOptions.stream=True).
+
+        YaGPT отдаёт NDJSON: каждая строка — частичный результат с накопленным текстом.
+        :return: асинхронный итератор распарсенных строк ответа
+        """
+        async with self._guard():
+            merged_headers = await self._create_headers(headers)
+            try:
+                if self.http_client is not None:
+                    async for line in self._iter_lines(self.http_client, endpoint, payload, merged_headers, timeout):
+                        yield line
+                    return
+
+                async with httpx.AsyncClient(verify=self.use_ssl, timeout=timeout) as client:
+                    async for line in self._iter_lines(client, endpoint, payload, merged_headers, timeout):
+                        yield line
+
+            except httpx.ReadTimeout as exc:
+                logger.exception("Async YaGPT stream %s failed", endpoint)
+                raise YaGPTClientError("Истекло время ожидания read_timeout") from exc
+
+            except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+                logger.exception("Async YaGPT stream %s failed: %s", endpoint, exc)
+                raise YaGPTClientError(str(exc)) from exc
+
+    async def _iter_lines(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        payload: dict[str, Any],
+        headers: dict[str, str],
+        timeout: float,
+    ) -> AsyncIterator[dict[str, Any]]:
+        async with client.stream(
+            "POST",
+            self._full_url(endpoint),
+            json=payload,
+            headers=headers,
+            timeout=timeout,
+        ) as response:
+            if response.status_code != httpx.codes.OK:
+                await response.aread()
+                raise YaGPTClientError(response.text, status_code=response.status_code)
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
@@ -15,6 +15,10 @@ class TokenManagerConfig(Config):
     password: str
     url: str
     verify: bool = False
+    refresh_ratio: float = 0.8
+    background_refresh: bool = False
+    refresh_retry_min_seconds: float = 1
+    refresh_retry_max_seconds: float = 30
 
     model_config = SettingsConfigDict(env_prefix="YATOKEN_")
 
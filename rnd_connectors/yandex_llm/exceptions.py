@@ -11,4 +11,6 @@ class YaGPTClientError(BusinessException, RuntimeError):
     Ошибка клиента YaGPT client. бизнес-ошибка
     """
 
-    pass
+    def __init__(self, message: str = "", status_code: int | None = None):
+        self.status_code = status_code  # HTTP-статус ответа; None — сетевая ошибка/таймаут
+        super().__init__(message)
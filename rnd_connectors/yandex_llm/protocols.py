@@ -6,6 +6,10 @@ class TokenManagerConfigProtocol(Protocol):
     password: str
     url: str
     verify: bool
+    refresh_ratio: float
+    background_refresh: bool
+    refresh_retry_min_seconds: float
+    refresh_retry_max_seconds: float
 
 
 class YandexEmbeddingConfigProtocol(Protocol):
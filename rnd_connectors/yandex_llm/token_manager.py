@@ -2,13 +2,16 @@ import asyncio
 import logging
 import threading
 import time
+from contextlib import nullcontext
 from typing import Optional
 
 import httpx
 
+from rnd_connectors.resilience.circuit_breaker import CircuitBreaker
 from rnd_connectors.yandex_llm.exceptions import YaGPTClientError
 from rnd_connectors.yandex_llm.protocols import TokenManagerConfigProtocol
 from rnd_connectors.yandex_llm.schemas import Tokens
+from rnd_connectors.yandex_llm.token_refresh import TokenRefresher
 
 logger = logging.getLogger(__name__)
 
@@ -86,7 +89,7 @@ class SyncTokenManager(BaseTokenManager):
                 json=token_request,
             )
             if response.status_code != 200:
-                raise YaGPTClientError(response.text)
+                raise YaGPTClientError(response.text, status_code=response.status_code)
 
             response_data = response.json()
             logger.info("Tokens successfully obtained")
@@ -95,26 +98,50 @@ class SyncTokenManager(BaseTokenManager):
 
 
 class AsyncTokenManager(BaseTokenManager):
-    """Асинхронный менеджер токенов"""
+    """
+    Асинхронный менеджер токенов.
 
-    def __init__(self, config: TokenManagerConfigProtocol, lock: asyncio.Lock | None = None):
+    Пока токен действителен, id_token отдаётся без лока; заранее (refresh_ratio от expires_in)
+    токен обновляется в фоне (TokenRefresher), поэтому запросы не ждут token endpoint.
+    Лок берётся, только если токена нет или он уже истёк.
+    """
+
+    def __init__(
+        self,
+        config: TokenManagerConfigProtocol,
+        lock: asyncio.Lock | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
+        """
+        :param circuit_breaker: при разомкнутой цепи token endpoint не вызывается (CircuitOpenError)
+        """
         super().__init__(config)
         self._lock = lock if lock is not None else asyncio.Lock()
+        self._refresher = TokenRefresher(self._refresh_tokens, config, name="rnd")
+        self.circuit_breaker = circuit_breaker
 
     @property
     async def id_token(self) -> str:
         """Асинхронный метод для получения id_token"""
         return await self._get_id_token()
 
+    def _is_valid(self) -> bool:
+        return self._id_token is not None and self._expires_in is not None and self._expires_in > time.time()
+
+    def _update_tokens(self, tokens: Tokens) -> None:
+        super()._update_tokens(tokens)
+        self._refresher.schedule(issued_at=time.time(), expires_in=tokens.expires_in)
+
     async def _get_id_token(self) -> str:
-        """Асинхронный метод для получения id_token (с использованием асинхронного лока)"""
+        """Асинхронный метод для получения id_token (лок — только при отсутствии действительного токена)"""
+        # быстрый путь: токен действителен — без лока, плановое обновление идёт в фоне
+        if self._is_valid():
+            if self._refresher.due():
+                self._refresher.trigger()
+            return self._id_token  # type: ignore[return-value]
+
         async with self._lock:
-            current_time = int(time.time())
-            if (
-                self._id_token is None
-                or self._expires_in is None
-                or self._expires_in <= current_time
-            ):
+            if not self._is_valid():
                 tokens = await self._get_tokens()
                 self._update_tokens(tokens)
 
@@ -123,19 +150,29 @@ class AsyncTokenManager(BaseTokenManager):
 
             return self._id_token
 
+    async def _refresh_tokens(self) -> None:
+        async with self._lock:
+            tokens = await self._get_tokens()
+            self._update_tokens(tokens)
+
+    async def aclose(self) -> None:
+        """Остановка фонового обновления токена"""
+        await self._refresher.aclose()
+
     async def _get_tokens(self) -> Tokens:
         """Асинхронный метод для получения токена"""
         header_token = self._create_headers()
         token_request = self._create_body()
 
-        async with httpx.AsyncClient(verify=self.verify) as client:
+        guard = self.circuit_breaker.guard() if self.circuit_breaker is not None else nullcontext()
+        async with guard, httpx.AsyncClient(verify=self.verify) as client:
             response = await client.post(
                 self.url,
                 headers=header_token,
                 json=token_request,
             )
             if response.status_code != 200:
-                raise YaGPTClientError(response.text)
+                raise YaGPTClientError(response.text, status_code=response.status_code)
 
             response_data = response.json()
             logger.info("Tokens successfully obtained")
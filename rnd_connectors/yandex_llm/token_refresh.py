@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+
+from rnd_connectors.yandex_llm.protocols import TokenManagerConfigProtocol
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRefresher:
+    """
+    Плановое обновление токена до истечения срока.
+
+    - refresh_at = момент выдачи + refresh_ratio * expires_in;
+    - background_refresh=True — фоновая задача обновляет токен по расписанию сама;
+    - background_refresh=False — обновление запускает первый запрос после refresh_at,
+      но ждать его не нужно: пока токен не истёк, запросы получают текущий;
+    - ошибки обновления повторяются с экспоненциальной задержкой и full jitter
+      (refresh_retry_min_seconds .. refresh_retry_max_seconds);
+    - одновременно работает не больше одной задачи обновления.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[], Awaitable[None]],
+        config: TokenManagerConfigProtocol,
+        name: str,
+    ) -> None:
+        """
+        :param refresh: получает новый токен и сообщает о нём через schedule()
+        """
+        self._refresh = refresh
+        self.refresh_ratio = config.refresh_ratio
+        self.background = config.background_refresh
+        self.retry_min_seconds = config.refresh_retry_min_seconds
+        self.retry_max_seconds = config.refresh_retry_max_seconds
+        self.name = name
+        self.refresh_at: float | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def schedule(self, issued_at: float, expires_in: float) -> None:
+        """Запоминает срок нового токена; в фоновом режиме запускает задачу обновления."""
+        self.refresh_at = issued_at + expires_in * self.refresh_ratio
+        if self.background:
+            self.trigger()
+
+    def due(self) -> bool:
+        return self.refresh_at is not None and time.time() >= self.refresh_at
+
+    def trigger(self) -> None:
+        """Запускает задачу обновления, если она ещё не запущена."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"{self.name}-token-refresh")
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(self.retry_min_seconds, min(self.retry_max_seconds, self.retry_min_seconds * 2**attempt))
+
+    async def _run(self) -> None:
+        attempt = 0
+        while True:
+            if self.refresh_at is not None:
+                await asyncio.sleep(max(0.0, self.refresh_at - time.time()))
+            try:
+                await self._refresh()
+            except Exception as e:
+                delay = self._backoff(attempt)
+                attempt += 1
+                logger.warning(
+                    f"⚠️ Ошибка обновления токена {self.name} (попытка {attempt}): {e!r}, повтор через {delay:.1f} с",
+                )
+                self.refresh_at = time.time() + delay
+                continue
+            attempt = 0
+            if not self.background:
+                return
+
+    async def aclose(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from app.core.kafka_broker.batching_publisher import BatchingPublisher
+
+
+class FakeBroker:
+    """Broker-заглушка: publish(no_confirm=True) возвращает future доставки, разрешаемый вручную."""
+
+    def __init__(self) -> None:
+        self.sent: list[Any] = []
+        self.deliveries: list[asyncio.Future[Any]] = []
+
+    async def publish(self, message: Any, topic: str = "", **kwargs: Any) -> asyncio.Future[Any]:
+        assert kwargs["no_confirm"] is True
+        self.sent.append(message)
+        delivery: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self.deliveries.append(delivery)
+        return delivery
+
+    def deliver_all(self) -> None:
+        for offset, delivery in enumerate(self.deliveries):
+            if not delivery.done():
+                delivery.set_result(offset)
+
+
+@pytest.mark.asyncio
+async def test_flush_by_size_and_delivery_futures() -> None:
+    """Батч уходит при достижении batch_size; future сообщения разрешается только после доставки."""
+    broker = FakeBroker()
+    publisher = BatchingPublisher(broker, topic="topic-out", linger_ms=10_000, batch_size=3)
+
+    futures = [await publisher.publish({"n": n}) for n in range(3)]
+    await asyncio.sleep(0)
+    assert broker.sent == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert not any(future.done() for future in futures)
+
+    broker.deliver_all()
+    assert [await future for future in futures] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_flush_by_linger_and_errors() -> None:
+    """Неполный батч уходит по linger_ms; ошибка доставки попадает в future своего сообщения."""
+    broker = FakeBroker()
+    publisher = BatchingPublisher(broker, topic="topic-out", linger_ms=5, batch_size=100)
+
+    ok = await publisher.publish("ok")
+    failed = await publisher.publish("failed")
+    assert broker.sent == []
+
+    await asyncio.sleep(0.02)
+    assert broker.sent == ["ok", "failed"]
+    broker.deliveries[1].set_exception(RuntimeError("not delivered"))
+    broker.deliver_all()
+
+    assert await ok == 0
+    with pytest.raises(RuntimeError):
+        await failed
+    await publisher.close()
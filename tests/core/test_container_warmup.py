@@ -0,0 +1,57 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.core.config import CONFIG
+from app.core.container import DependencyContainer
+
+
+class FailingTokenManager:
+    @property
+    async def id_token(self) -> str:
+        raise RuntimeError("EPA недоступен")
+
+    async def aclose(self) -> None:
+        pass
+
+
+def make_container(**warmup: object) -> DependencyContainer:
+    config = CONFIG.model_copy(update={"warmup": CONFIG.warmup.model_copy(update={"enabled": True, **warmup})})
+    container = DependencyContainer(config=config)
+    # готовые заглушки вместо тяжёлых компонентов
+    container._service = Mock()
+    container._pipeline = Mock(query=AsyncMock())
+    container._llm = Mock(token_manager=FailingTokenManager())
+    container._model_embeddings = Mock(aembed_query=AsyncMock(return_value=[0.1]))
+    return container
+
+
+@pytest.mark.asyncio
+async def test_warmup_runs_all_steps_and_marks_ready() -> None:
+    """Прогрев прогоняет модель и граф (без кэша ответов); ошибка шага не мешает готовности."""
+    container = make_container()
+    assert not container.ready
+
+    await container.init_async()
+
+    assert container.ready
+    container._model_embeddings.aembed_query.assert_awaited_once_with(CONFIG.warmup.query)  # type: ignore[union-attr]
+    container._pipeline.query.assert_awaited_once_with(CONFIG.warmup.query, use_cache=False)  # type: ignore[union-attr]
+
+    await container.aclose()
+    assert not container.ready
+
+
+@pytest.mark.asyncio
+async def test_warmup_timeout_does_not_block_startup() -> None:
+    container = make_container(timeout_seconds=0.01)
+
+    async def slow_query(*_: object, **__: object) -> None:
+        await asyncio.sleep(1)
+
+    container._pipeline.query = slow_query  # type: ignore[union-attr]
+
+    await container.init_async()
+
+    assert container.ready
@@ -0,0 +1,114 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from aiokafka import TopicPartition
+
+from app.core.kafka_broker.dispatcher import KeyOrderedDispatcher, PartitionOffsetTracker
+
+TP = TopicPartition("topic-in", 0)
+
+
+class FakeConsumer:
+    """Consumer-заглушка: запоминает коммиты и паузы."""
+
+    def __init__(self) -> None:
+        self.commits: list[int] = []
+        self.paused: set[TopicPartition] = set()
+
+    async def commit(self, offsets: dict[TopicPartition, int]) -> None:
+        self.commits.append(offsets[TP])
+
+    def pause(self, *partitions: TopicPartition) -> None:
+        self.paused.update(partitions)
+
+    def resume(self, *partitions: TopicPartition) -> None:
+        self.paused.difference_update(partitions)
+
+    def assignment(self) -> set[TopicPartition]:
+        return {TP}
+
+
+def make_msg(consumer: FakeConsumer, offset: int, key: bytes | None) -> Any:
+    raw = SimpleNamespace(topic=TP.topic, partition=TP.partition, offset=offset, key=key)
+    return SimpleNamespace(raw_message=raw, consumer=consumer)
+
+
+def test_tracker_commits_only_contiguous_prefix() -> None:
+    """Позиция коммита сдвигается только когда завершены все предыдущие offset-ы."""
+    tracker = PartitionOffsetTracker()
+    for offset in (10, 11, 12):
+        tracker.register(TP, offset)
+
+    assert tracker.complete(TP, 12) is None
+    assert tracker.complete(TP, 11) is None
+    assert tracker.complete(TP, 10) == 13  # noqa: PLR2004
+    assert tracker.in_flight(TP) == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_keeps_key_order_and_runs_keys_concurrently() -> None:
+    """Один key — строго по порядку, разные key — параллельно; коммит до последнего offset."""
+    consumer = FakeConsumer()
+    dispatcher = KeyOrderedDispatcher(max_in_flight_per_partition=2, max_in_flight_total=10)
+    order: list[int] = []
+    running = 0
+    max_running = 0
+
+    async def handler(msg: Any) -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        # первое сообщение ключа "a" самое медленное — второе не должно его обогнать
+        await asyncio.sleep(0.05 if msg.raw_message.offset == 0 else 0.01)
+        order.append(msg.raw_message.offset)
+        running -= 1
+
+    for offset, key in enumerate([b"a", b"b", b"a"]):
+        await dispatcher.dispatch(handler, make_msg(consumer, offset, key))
+
+    assert TP in consumer.paused  # лимит на партицию достигнут
+    await dispatcher.drain(timeout=1)
+
+    assert order.index(0) < order.index(2)
+    assert max_running == 2  # noqa: PLR2004
+    assert consumer.commits[-1] == 3  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_reports_errors_and_still_commits() -> None:
+    """Ошибка обработки уходит в on_error, offset всё равно коммитится."""
+    consumer = FakeConsumer()
+    errors: list[Exception] = []
+
+    async def on_error(exc: Exception) -> None:
+        errors.append(exc)
+
+    async def handler(msg: Any) -> None:
+        raise ValueError("boom")
+
+    dispatcher = KeyOrderedDispatcher(max_in_flight_per_partition=4, max_in_flight_total=4, on_error=on_error)
+    await dispatcher.dispatch(handler, make_msg(consumer, 5, None))
+    await dispatcher.drain(timeout=1)
+
+    assert [str(e) for e in errors] == ["boom"]
+    assert consumer.commits == [6]
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_without_consumer_relies_on_total_limit() -> None:
+    """Без consumer партиция не ставится на паузу и не коммитится; sync on_error тоже поддерживается."""
+    errors: list[Exception] = []
+
+    async def handler(msg: Any) -> None:
+        if msg.raw_message.offset == 1:
+            raise ValueError("boom")
+
+    dispatcher = KeyOrderedDispatcher(max_in_flight_per_partition=1, max_in_flight_total=2, on_error=errors.append)
+    for offset in range(3):
+        await dispatcher.dispatch(handler, make_msg(None, offset, None))  # type: ignore[arg-type]
+    await dispatcher.drain(timeout=1)
+
+    assert [str(e) for e in errors] == ["boom"]
+    assert dispatcher.in_flight == 0
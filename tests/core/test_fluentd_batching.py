@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+from app.core.config import CONFIG
+from rnd_connectors.fluent.batching import FluentdBatchSender
+from rnd_connectors.fluent.client import DB_TAG, EFK_TAG
+
+
+class FakeClient:
+    """Заглушка FluentdClient: запоминает пачки, пока available=True."""
+
+    def __init__(self, available: bool = True) -> None:
+        self.available = available
+        self.batches: list[tuple[str, list[dict]]] = []
+
+    def send_batch(self, tag: str, records: list[dict], timeout: float | None = None) -> bool:
+        if not self.available:
+            return False
+        self.batches.append((tag, records))
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+def make_sender(client: FakeClient, **config: object) -> FluentdBatchSender:
+    fluent_config = CONFIG.fluent.model_copy(
+        update={
+            "batch_enabled": True,
+            "batch_size": 3,
+            "flush_interval_seconds": 10.0,
+            "max_retries": 1,
+            "retry_backoff_seconds": 0.001,
+            **config,
+        },
+    )
+    return FluentdBatchSender(client, fluent_config)  # type: ignore[arg-type]
+
+
+def test_records_are_sent_in_batches_per_tag() -> None:
+    client = FakeClient()
+    sender = make_sender(client)
+
+    for i in range(4):
+        sender.submit(EFK_TAG, {"n": i})
+    sender.submit(DB_TAG, {"n": 0})
+    sender.close()
+
+    # полная пачка — сразу, остатки по тегам — при закрытии
+    assert client.batches[0] == (EFK_TAG, [{"n": 0}, {"n": 1}, {"n": 2}])
+    assert client.batches[1:] == [(EFK_TAG, [{"n": 3}]), (DB_TAG, [{"n": 0}])]
+
+
+def test_failed_batches_are_spooled_and_replayed(tmp_path: Path) -> None:
+    client = FakeClient(available=False)
+    sender = make_sender(client, spool_dir=str(tmp_path), batch_size=2)
+    for i in range(2):
+        sender.submit(EFK_TAG, {"n": i})
+    sender.close()
+
+    assert sender.spooled == 2  # noqa: PLR2004
+    assert client.batches == []
+
+    client.available = True
+    sender = make_sender(client, spool_dir=str(tmp_path), batch_size=1)
+    sender.submit(EFK_TAG, {"n": 2})
+    sender.close()
+
+    assert client.batches == [(EFK_TAG, [{"n": 2}]), (EFK_TAG, [{"n": 0}, {"n": 1}])]
+    assert not (tmp_path / "fluentd-spool.jsonl").exists()
+
+
+def test_leftover_replay_file_is_sent(tmp_path: Path) -> None:
+    """.replay, оставшийся после падения посреди досылки, досылается вместе со spool."""
+    entry = {"tag": EFK_TAG, "records": [{"n": 0}]}
+    (tmp_path / "fluentd-spool.replay").write_text(json.dumps(entry) + "\n", encoding="utf-8")
+    (tmp_path / "fluentd-spool.jsonl").write_text(json.dumps({**entry, "records": [{"n": 1}]}) + "\n")
+
+    client = FakeClient()
+    sender = make_sender(client, spool_dir=str(tmp_path), batch_size=1)
+    sender.submit(EFK_TAG, {"n": 2})
+    sender.close()
+
+    assert client.batches == [(EFK_TAG, [{"n": 2}]), (EFK_TAG, [{"n": 0}]), (EFK_TAG, [{"n": 1}])]
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,67 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import httpx
+import pytest
+
+from app.core.http_client import _PerHostLimitTransport, use_client
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    """Потоковое тело ответа (не httpx.ByteStream), как у реального транспорта."""
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield b"chunk"
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakeTransport(httpx.AsyncBaseTransport):
+    """Транспорт-заглушка: потоковые ответы; хост fail — ошибка соединения."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host == "fail":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, stream=ChunkedStream(), request=request)
+
+
+def make_client(max_per_host: int = 1) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=_PerHostLimitTransport(FakeTransport(), max_per_host=max_per_host))
+
+
+@pytest.mark.asyncio
+async def test_stream_holds_host_slot_until_closed() -> None:
+    """Открытый stream-ответ держит слот своего хоста; другой хост не ждёт."""
+    async with make_client() as client:
+        async with client.stream("GET", "http://llm-a/") as response:
+            second = asyncio.create_task(client.get("http://llm-a/"))
+            other_host = await asyncio.wait_for(client.get("http://llm-b/"), timeout=1)
+            await asyncio.sleep(0.01)
+
+            assert other_host.status_code == 200  # noqa: PLR2004
+            assert not second.done()
+            assert [chunk async for chunk in response.aiter_bytes()] == [b"chunk"]
+
+        assert (await asyncio.wait_for(second, timeout=1)).status_code == 200  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_slot_is_released_on_error() -> None:
+    async with make_client() as client:
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                await asyncio.wait_for(client.get("http://fail/"), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_use_client_shared_and_temporary() -> None:
+    """Общий клиент отдаётся как есть и не закрывается; временный закрывается после запроса."""
+    async with make_client() as shared:
+        async with use_client(shared) as client:
+            assert client is shared
+        assert not shared.is_closed
+
+    async with use_client(None, timeout=1.0) as temporary:
+        assert temporary.timeout.read == 1.0
+    assert temporary.is_closed
@@ -0,0 +1,15 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "IPython", "langfuse")
+
+
+def test_service_import_does_not_load_heavy_modules() -> None:
+    """Импорт сервиса (старт воркера) не тянет torch/sentence-transformers/IPython/langfuse."""
+    code = f"import sys, app.service_main; print('HEAVY:', [m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert "HEAVY: []" in result.stdout.splitlines()
@@ -0,0 +1,50 @@
+import logging
+
+import pytest
+
+from app.core.logger.lazy import Lazy, LazyLogger, PayloadSampler
+
+
+class ExplodingPayload:
+    def __str__(self) -> str:
+        raise AssertionError("payload не должен сериализоваться")
+
+
+def make_logger(name: str, sampler: PayloadSampler | None = None) -> LazyLogger:
+    return LazyLogger(logging.getLogger(name), payload_sampler=sampler or PayloadSampler())
+
+
+def test_disabled_level_builds_nothing(caplog: pytest.LogCaptureFixture) -> None:
+    calls: list[int] = []
+    logger = make_logger("tests.lazy.disabled")
+    caplog.set_level(logging.WARNING, logger="tests.lazy.disabled")
+
+    logger.event(logging.INFO, "пропуск", value=Lazy(lambda: calls.append(1)), payload=ExplodingPayload())
+    logger.debug("пропуск %s", Lazy(lambda: calls.append(1)))
+
+    assert calls == []
+    assert caplog.records == []
+
+
+def test_event_renders_fields_at_call_site(caplog: pytest.LogCaptureFixture) -> None:
+    logger = make_logger("tests.lazy.enabled")
+    caplog.set_level(logging.INFO, logger="tests.lazy.enabled")
+
+    logger.event(logging.INFO, "✅ готово", topic="out", offset=42, duration=0.01234, payload={"a": 1})
+
+    (record,) = caplog.records
+    assert record.getMessage() == "✅ готово | topic=out | offset=42 | duration=0.012 | message={'a': 1}"
+    assert record.funcName == "test_event_renders_fields_at_call_site"
+    assert record.event_fields["offset"] == 42  # noqa: PLR2004
+
+
+def test_payload_sampling_and_truncation(caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.INFO, logger="tests.lazy.sampled")
+
+    never = make_logger("tests.lazy.sampled", PayloadSampler(sample_rate=0))
+    truncated = make_logger("tests.lazy.sampled", PayloadSampler(max_length=5))
+
+    never.event(logging.INFO, "a", payload=ExplodingPayload())
+    truncated.event(logging.INFO, "b", payload="x" * 100)
+
+    assert [r.getMessage() for r in caplog.records] == ["a", "b | message=xxxxx…"]
@@ -0,0 +1,59 @@
+import logging
+import queue
+
+from app.core.logger.context_storage import request_id
+from app.core.logger.filters import RequestIdFilter
+from app.core.logger.handlers.queued import BatchQueueListener, BoundedQueueHandler
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self, level: int = logging.NOTSET) -> None:
+        super().__init__(level)
+        self.records: list[logging.LogRecord] = []
+        self.flushes = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+    def flush(self) -> None:
+        self.flushes += 1
+
+
+def make_logger(handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f"test_log_queue.{id(handler)}")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    return logger
+
+
+def test_overflow_drops_and_counts_records() -> None:
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), overflow_policy="drop")
+    logger = make_logger(handler)
+
+    for i in range(5):
+        logger.info("msg %d", i)
+
+    assert handler.size == 2  # noqa: PLR2004
+    assert handler.dropped == 3  # noqa: PLR2004
+
+
+def test_listener_ships_records_with_caller_context() -> None:
+    log_queue: queue.Queue[logging.LogRecord | None] = queue.Queue(maxsize=100)
+    handler = BoundedQueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    sink, errors_only = CollectingHandler(), CollectingHandler(level=logging.ERROR)
+    listener = BatchQueueListener(log_queue, handlers=[sink, errors_only], batch_size=10)
+    logger = make_logger(handler)
+
+    request_id.set("req-1")
+    logger.info("hello %s", "world")
+    logger.error("boom")
+    request_id.reset()
+    listener.start()
+    listener.stop()
+
+    assert [r.getMessage() for r in sink.records] == ["hello world", "boom"]
+    assert [r.request_id for r in sink.records] == ["req-1", "req-1"]  # type: ignore[attr-defined]
+    assert [r.getMessage() for r in errors_only.records] == ["boom"]
+    assert sink.flushes >= 1
@@ -0,0 +1,31 @@
+import pytest
+from faststream.kafka import KafkaBroker, TestKafkaBroker
+
+from app.core.config import CONFIG
+from app.core.kafka_broker.middlewares import PrometheusMiddleware
+
+
+@pytest.mark.asyncio
+async def test_handler_name_resolved_once_per_subscriber(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Имя обработчика берётся из подписчика и кэшируется: без обхода стека на каждое сообщение."""
+    monkeypatch.setattr(CONFIG.prometheus, "enabled", True)
+    monkeypatch.setattr(PrometheusMiddleware, "_handler_names", {})
+    resolved: list[str] = []
+    resolve = PrometheusMiddleware._resolve_handler_name
+
+    def counting_resolve(self: PrometheusMiddleware, subscriber: object) -> str:
+        resolved.append(name := resolve(self, subscriber))
+        return name
+
+    monkeypatch.setattr(PrometheusMiddleware, "_resolve_handler_name", counting_resolve)
+    broker = KafkaBroker(middlewares=[PrometheusMiddleware])
+
+    @broker.subscriber("topic-in")
+    async def handle_question(body: str) -> None:
+        pass
+
+    async with TestKafkaBroker(broker) as test_broker:
+        for _ in range(3):
+            await test_broker.publish("вопрос", "topic-in")
+
+    assert resolved == ["handle_question"]
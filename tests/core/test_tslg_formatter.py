@@ -0,0 +1,61 @@
+import json
+import logging
+import sys
+import uuid
+
+import pytest
+
+from app.core.config import CONFIG
+from app.core.logger.formatter import TslgFormatter
+from rnd_connectors.tslg.schemas import TSLGMsgSchemas
+
+VOLATILE_FIELDS = ("eventId", "timestamp")
+
+
+def make_record(**extra: object) -> logging.LogRecord:
+    record = logging.LogRecord("app.test", logging.WARNING, "/app/module.py", 7, "hello %s", ("world",), None, "f")
+    record.__dict__.update(extra)
+    return record
+
+
+def make_error_record() -> logging.LogRecord:
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        return logging.LogRecord("app.test", logging.ERROR, "/app/module.py", 9, "failed", None, sys.exc_info(), "f")
+
+
+def render_both(record: logging.LogRecord, aggregation_type: str) -> tuple[dict, dict]:
+    config = CONFIG.tslg.model_copy(update={"aggregation_type": aggregation_type})
+    fast = TslgFormatter(config=config, is_fluentbit=False)
+    validated = TslgFormatter(config=config.model_copy(update={"validate_schema": True}), is_fluentbit=False)
+    return json.loads(fast.format(record)), json.loads(validated.format(record))
+
+
+@pytest.mark.parametrize("aggregation_type", ["TRACING", "OPENSHIFT_EVENT"])
+@pytest.mark.parametrize(
+    "record",
+    [
+        make_record(),
+        make_record(request_id=str(uuid.uuid4()), trace_id=str(uuid.uuid4()), span_id="not-a-uuid"),
+        make_error_record(),
+    ],
+)
+def test_fast_path_matches_schema_path(record: logging.LogRecord, aggregation_type: str) -> None:
+    fast, validated = render_both(record, aggregation_type)
+
+    for field in VOLATILE_FIELDS:
+        fast.pop(field)
+        validated.pop(field)
+    assert fast == validated
+
+
+def test_fast_path_output_is_valid_schema() -> None:
+    request_id = str(uuid.uuid4())
+    fast, _ = render_both(make_record(request_id=request_id), "TRACING")
+
+    assert TSLGMsgSchemas.model_validate(fast).eventId == request_id
+    # без request_id — уникальный eventId в формате UUID
+    formatter = TslgFormatter(config=CONFIG.tslg, is_fluentbit=False)
+    first, second = (json.loads(formatter.format(make_record()))["eventId"] for _ in range(2))
+    assert uuid.UUID(first) != uuid.UUID(second)
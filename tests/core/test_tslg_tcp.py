@@ -0,0 +1,84 @@
+import json
+import logging
+import socket
+import struct
+import threading
+from datetime import datetime, timezone
+
+from app.core.config import CONFIG, TSLGConfig
+from app.core.logger.handlers.tslg_socket import TslgSocketHandler
+from app.core.logger.tslg_serializer import format_local_time
+from rnd_connectors.tslg.schemas import TSLGMsgSchemas
+from rnd_connectors.tslg.tcp import TslgTcpSender
+
+
+def read_frames(conn: socket.socket, count: int) -> list[object]:
+    data = b""
+    frames: list[object] = []
+    while len(frames) < count:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+        while len(data) >= 4:  # noqa: PLR2004
+            (length,) = struct.unpack(">I", data[:4])
+            if len(data) < 4 + length:
+                break
+            frames.append(json.loads(data[4 : 4 + length]))
+            data = data[4 + length :]
+    return frames
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_config(port: int, **overrides: object) -> TSLGConfig:
+    return CONFIG.tslg.model_copy(
+        update={"host": "127.0.0.1", "port": port, "tcp_reconnect_min_seconds": 0.01, **overrides},
+    )
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("app.test", logging.INFO, "/app/module.py", 42, message, None, None, func="handler")
+
+
+def test_frame_matches_pydantic_schema() -> None:
+    handler = TslgSocketHandler(make_config(free_port()))
+    record = make_record("привет")
+
+    frame = handler.makePickle(record)
+    payload = json.loads(frame[4:])
+
+    assert payload == TSLGMsgSchemas(**payload).model_dump(exclude_none=True)
+    assert struct.unpack(">I", frame[:4])[0] == len(frame) - 4
+    assert payload["appName"] == CONFIG.tslg.app_name
+    assert payload["text"] == "привет"
+    handler.close()
+
+
+def test_local_time_matches_datetime_format() -> None:
+    for created in (0.0, 1700000000.123, 1700000000.999, 1712345678.5004, 1700000000.9999996):
+        expected = datetime.fromtimestamp(created, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+        assert format_local_time(created) == expected
+
+
+def test_sender_buffers_during_outage_and_delivers_after_reconnect() -> None:
+    port = free_port()
+    sender = TslgTcpSender(make_config(port, tcp_buffer_frames=3))
+    for i in range(5):
+        body = json.dumps(i).encode()
+        sender.send(struct.pack(">I", len(body)) + body)
+
+    with socket.create_server(("127.0.0.1", port)) as server:
+        received: list[object] = []
+        accept = threading.Thread(target=lambda: received.extend(read_frames(server.accept()[0], 3)))
+        accept.start()
+        accept.join(timeout=5)
+        sender.close()
+
+    # агент был недоступен: в кольцевом буфере остались 3 самых свежих кадра
+    assert received == [2, 3, 4]
+    assert sender.dropped == 2  # noqa: PLR2004
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.config import CONFIG
+from app.services.RAG.rag_pipeline.embeddings.async_embedding import AsyncEmbedding
+from app.services.RAG.rag_pipeline.exceptions import RagPipelineError
+
+
+class SlowEmbeddings:
+    """Синхронная модель-заглушка: блокирует поток на время «инференса»."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def embed_query(self, text: str) -> list[float]:
+        self.release.wait(timeout=1)
+        return [1.0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_inference_runs_off_loop_and_queue_is_bounded() -> None:
+    """Инференс не блокирует event loop; сверх max_queue_depth задачи отклоняются по таймауту."""
+    model = SlowEmbeddings()
+    config = CONFIG.embedding.model_copy(
+        update={"executor": "thread", "executor_workers": 1, "max_queue_depth": 1, "queue_timeout_seconds": 0.05},
+    )
+    embeddings = AsyncEmbedding(config, embeddings=model)  # type: ignore[arg-type]
+
+    first = asyncio.create_task(embeddings.aembed_query("a"))
+    started = time.perf_counter()
+    await asyncio.sleep(0.01)  # loop свободен, пока модель считает
+    assert time.perf_counter() - started < 0.5  # noqa: PLR2004
+
+    with pytest.raises(RagPipelineError):
+        await embeddings.aembed_query("b")
+
+    model.release.set()
+    assert await first == [1.0]
+    embeddings.close()
+
+
+def test_sync_calls_are_bounded() -> None:
+    """embed_query из потока тоже ограничен max_queue_depth и отклоняется по таймауту."""
+    model = SlowEmbeddings()
+    config = CONFIG.embedding.model_copy(
+        update={"executor": "thread", "executor_workers": 1, "max_queue_depth": 1, "queue_timeout_seconds": 0.05},
+    )
+    embeddings = AsyncEmbedding(config, embeddings=model)  # type: ignore[arg-type]
+
+    first = threading.Thread(target=embeddings.embed_query, args=("a",))
+    first.start()
+    time.sleep(0.01)
+
+    with pytest.raises(RagPipelineError):
+        embeddings.embed_query("b")
+
+    model.release.set()
+    first.join()
+    assert embeddings.embed_query("c") == [1.0]
+    embeddings.close()
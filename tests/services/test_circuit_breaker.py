@@ -0,0 +1,104 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from app.core.config import CONFIG
+from app.services.RAG.llm.fallback import FallbackLLM
+from app.services.RAG.llm.schemas import ResponseYAGPTSchema
+from app.services.RAG.rag_pipeline.exceptions import LLMUnavailableError
+from rnd_connectors.resilience.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from rnd_connectors.yandex_llm.exceptions import YaGPTClientError
+
+
+def make_breaker(**config: object) -> CircuitBreaker:
+    breaker_config = CONFIG.circuit_breaker.model_copy(
+        update={"enabled": True, "failure_threshold": 2, "recovery_timeout_seconds": 0.05, **config},
+    )
+    return CircuitBreaker("yandex", breaker_config)
+
+
+async def call(breaker: CircuitBreaker, error: Exception | None = None) -> None:
+    async with breaker.guard():
+        if error is not None:
+            raise error
+
+
+@pytest.mark.asyncio
+async def test_opens_after_threshold_and_fails_fast() -> None:
+    breaker = make_breaker()
+    for _ in range(2):
+        with pytest.raises(YaGPTClientError):
+            await call(breaker, YaGPTClientError("upstream", status_code=503))
+
+    assert breaker.state is CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        await call(breaker)
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_open_circuit() -> None:
+    """400/401 — бэкенд отвечает: цепь остаётся замкнутой."""
+    breaker = make_breaker()
+    for _ in range(3):
+        with pytest.raises(YaGPTClientError):
+            await call(breaker, YaGPTClientError("bad request", status_code=400))
+
+    assert breaker.state is CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_closes_or_reopens() -> None:
+    breaker = make_breaker(failure_threshold=1)
+    with pytest.raises(TimeoutError):
+        await call(breaker, TimeoutError())
+    await asyncio.sleep(0.06)
+    assert breaker.state is CircuitState.HALF_OPEN
+
+    with pytest.raises(TimeoutError):
+        await call(breaker, TimeoutError())
+    assert breaker.state is CircuitState.OPEN
+
+    await asyncio.sleep(0.06)
+    await call(breaker)
+    assert breaker.state is CircuitState.CLOSED
+
+
+def make_response(text: str) -> ResponseYAGPTSchema:
+    return ResponseYAGPTSchema(
+        alternatives=[{"message": {"role": "assistant", "text": text}, "status": "ALTERNATIVE_STATUS_FINAL"}],
+        modelVersion="test",
+    )
+
+
+class StubLLM:
+    stream = False
+    model_uri = "gpt://folder/lite/latest"
+    temperature = 0.0
+
+    def __init__(self, text: str, unavailable: bool = False) -> None:
+        self.text = text
+        self.unavailable = unavailable
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        if self.unavailable:
+            raise LLMUnavailableError(message="circuit open")
+        return make_response(self.text)
+
+    async def astream(self, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]:
+        if self.unavailable:
+            raise LLMUnavailableError(message="circuit open")
+        yield make_response(self.text)
+
+
+@pytest.mark.asyncio
+async def test_fallback_used_only_when_primary_unavailable() -> None:
+    fallback = StubLLM("fallback")
+
+    healthy = FallbackLLM(StubLLM("primary"), fallback)  # type: ignore[arg-type]
+    unavailable = FallbackLLM(StubLLM("primary", unavailable=True), fallback)  # type: ignore[arg-type]
+
+    assert (await healthy.generate([])).alternatives[0].message.text == "primary"
+    assert (await unavailable.generate([])).alternatives[0].message.text == "fallback"
+    chunks = [chunk async for chunk in unavailable.astream([])]
+    assert [chunk.alternatives[0].message.text for chunk in chunks] == ["fallback"]
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+
+from app.services.RAG.rag_pipeline.embeddings.cached import CachedEmbeddings, MemmapVectorStore
+
+
+class CountingEmbeddings:
+    """Модель-заглушка: вектор = (число символов, 0.5), считает вызовы модели."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        return [float(len(text)), 0.5]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_cache_survives_restart_via_disk_store(tmp_path: Path) -> None:
+    """Повторный текст (с другими пробелами) не доходит до модели, в т.ч. после пересоздания кэша."""
+    model = CountingEmbeddings()
+    store = MemmapVectorStore(tmp_path, dtype="float16", capacity=10)
+    embeddings = CachedEmbeddings(model, model_name="m", max_size=10, store=store)  # type: ignore[arg-type]
+
+    assert await embeddings.aembed_query("как оформить карту") == [18.0, 0.5]
+    assert await embeddings.aembed_query(" как  оформить карту\n") == [18.0, 0.5]
+    assert model.calls == 1
+    store.close()
+
+    restarted = CachedEmbeddings(
+        model,  # type: ignore[arg-type]
+        model_name="m",
+        max_size=10,
+        store=MemmapVectorStore(tmp_path, dtype="float16", capacity=10),
+    )
+    assert await restarted.aembed_query("как оформить карту") == [18.0, 0.5]
+    assert model.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_documents_compute_only_misses_in_one_batch() -> None:
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, model_name="m", max_size=10)  # type: ignore[arg-type]
+    await embeddings.aembed_query("a")
+
+    vectors = await embeddings.aembed_documents(["a", "bb", "ccc"])
+
+    assert [vector[0] for vector in vectors] == [1.0, 2.0, 3.0]
+    assert model.calls == 2  # noqa: PLR2004
+
+
+def test_store_recreated_when_dim_changes(tmp_path: Path) -> None:
+    """Вектор другой размерности (новая модель под тем же именем) пересоздаёт хранилище, а не отключает его."""
+    store = MemmapVectorStore(tmp_path, dtype="float32", capacity=10)
+    store.set("old", [1.0, 2.0])
+    assert store.flush(timeout=5)
+
+    store.set("new", [1.0, 2.0, 3.0])
+    store.close()
+
+    reopened = MemmapVectorStore(tmp_path, dtype="float32", capacity=10)
+    assert reopened.get("old") is None
+    assert reopened.get("new") == [1.0, 2.0, 3.0]
@@ -0,0 +1,33 @@
+import pytest
+from langchain_core.documents import Document
+
+from app.services.RAG.rag_pipeline.nodes.retrieval.fusion import fuse
+
+
+def make_doc(doc_id: str, score: float, query: str = "q") -> Document:
+    return Document(page_content=f"текст {doc_id}", metadata={"_id": doc_id, "_score": score, "_query": query})
+
+
+VECTOR = [make_doc("a", 0.9), make_doc("b", 0.8), make_doc("c", 0.7)]
+BM25 = [make_doc("c", 12.0), make_doc("d", 3.0)]
+
+
+def test_rrf_rewards_chunks_found_by_both_searches_and_caps_at_limit() -> None:
+    """RRF поднимает чанк из обеих выдач, дубли по id схлопываются, длина ограничена limit."""
+    fused = fuse(VECTOR, BM25, method="rrf", bm25_weight=0.5, limit=3)
+
+    assert [doc.metadata["_id"] for doc in fused] == ["c", "a", "b"]
+
+
+@pytest.mark.parametrize("method", ["minmax", "zscore"])
+def test_score_fusion_respects_bm25_weight(method: str) -> None:
+    """При нулевом весе BM25 порядок и состав определяются только vector-выдачей."""
+    fused = fuse(VECTOR, BM25, method=method, bm25_weight=0.0, limit=10)  # type: ignore[arg-type]
+
+    assert [doc.metadata["_id"] for doc in fused] == ["a", "b", "c"]
+
+
+def test_concat_keeps_legacy_order_and_dedupes_by_id() -> None:
+    fused = fuse(VECTOR, BM25, method="concat", bm25_weight=0.5, limit=10)
+
+    assert [doc.metadata["_id"] for doc in fused] == ["a", "b", "c", "d"]
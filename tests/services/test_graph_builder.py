@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from app.core.config import CONFIG
+from app.services.RAG.llm.schemas import AlternativesSchema, MessageSchema, ResponseYAGPTSchema
+from app.services.RAG.rag_pipeline.graph.builder import RAGGraphBuilder
+from app.services.RAG.rag_pipeline.pipeline import RAGPipeline
+
+
+class FakeLLM:
+    """LLM-заглушка: фиксированный ответ, считает одновременные вызовы."""
+
+    stream = False
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return ResponseYAGPTSchema(
+            alternatives=[AlternativesSchema(message=MessageSchema(role="assistant", text="ответ"), status="ok")],
+            modelVersion="test",
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parallel_intent, expected_max_in_flight", [(False, 1), (True, 2)])
+async def test_graph_parallel_intent(parallel_intent: bool, expected_max_in_flight: int) -> None:
+    """В режиме parallel_intent Intent и переформулировка Retriever идут одновременно, результат тот же."""
+    llm = FakeLLM()
+    rag_config = CONFIG.rag.model_copy(update={"parallel_intent": parallel_intent, "use_answer_checker": False})
+    pipeline = RAGPipeline(graph=RAGGraphBuilder(async_llm=llm, rag_config=rag_config).build())
+
+    state = await pipeline.query("вопрос")
+
+    assert llm.max_in_flight == expected_max_in_flight
+    assert [m.content for m in state["intent"]] == ["ответ"]
+    assert len(state["retrieved"]) == 3  # noqa: PLR2004
+    assert state["messages"][-1].content == "ответ"
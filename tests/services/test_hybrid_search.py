@@ -0,0 +1,138 @@
+import asyncio
+from typing import Any
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+
+from app.services.RAG.llm.schemas import AlternativesSchema, MessageSchema, ResponseYAGPTSchema
+from app.services.RAG.rag_pipeline.exceptions import RagPipelineError
+from app.services.RAG.rag_pipeline.nodes.retrieval.hybrid_search import HybridOpenSearchEngine
+from app.services.RAG.rag_pipeline.nodes.retrieval.retriever import RetrieverIntent
+
+
+class FakeEmbeddings:
+    async def aembed_query(self, text: str) -> list[float]:
+        return [float(len(text))]
+
+
+class FakeOpenSearch:
+    """Клиент-заглушка: запоминает тела _msearch и отвечает одним хитом на каждый запрос."""
+
+    def __init__(self) -> None:
+        self.bodies: list[list[dict[str, Any]]] = []
+
+    async def msearch(self, body: list[dict[str, Any]]) -> dict[str, Any]:
+        self.bodies.append(body)
+        queries = body[1::2]
+        return {
+            "responses": [
+                {"hits": {"hits": [{"_id": f"doc-{i}", "_score": 1.0, "_source": {"text": f"чанк {i}"}}]}}
+                for i, _ in enumerate(queries)
+            ],
+        }
+
+
+class TruncatingOpenSearch(FakeOpenSearch):
+    """Клиент-заглушка, теряющий последний ответ _msearch."""
+
+    async def msearch(self, body: list[dict[str, Any]]) -> dict[str, Any]:
+        response = await super().msearch(body)
+        return {"responses": response["responses"][:-1]}
+
+
+class RewritingLLM:
+    """LLM-заглушка: разные переформулировки, считает одновременные вызовы."""
+
+    stream = False
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        self.calls += 1
+        text = f"переформулировка {self.calls}"
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return ResponseYAGPTSchema(
+            alternatives=[AlternativesSchema(message=MessageSchema(role="assistant", text=text), status="ok")],
+            modelVersion="test",
+        )
+
+
+@pytest.mark.asyncio
+async def test_rewrites_in_parallel_and_single_msearch() -> None:
+    """n переформулировок генерируются параллельно, vector и BM25 по всем уходят одним _msearch."""
+    client = FakeOpenSearch()
+    engine = HybridOpenSearchEngine(
+        client=client,  # type: ignore[arg-type]
+        index_name="index",
+        embeddings=FakeEmbeddings(),  # type: ignore[arg-type]
+        k=10,
+        relevance_threshold=0.5,
+        use_hybrid_search=True,
+        bm25_weight=0.3,
+    )
+    llm = RewritingLLM()
+    retriever = RetrieverIntent(llm=llm, prompt="{message} {history}", search_engine=engine, n=3)
+
+    docs = await retriever._retrieve_main("вопрос", [])
+
+    assert llm.max_in_flight == 3  # noqa: PLR2004
+    assert len(client.bodies) == 1
+    searches = client.bodies[0][1::2]
+    assert [search["size"] for search in searches] == [7, 3] * 3
+    assert "knn" in searches[0]["query"]
+    assert searches[1]["query"] == {"match": {"text": "переформулировка 1"}}
+    assert len(docs) == 6  # noqa: PLR2004
+
+
+def test_intent_query_is_message_text() -> None:
+    """Intent из AIMessage (BaseLLM.process_output) ищется по тексту, а не по repr сообщения."""
+    retriever = RetrieverIntent(llm=RewritingLLM(), prompt="{message} {history}")
+    state: Any = {"intent": [AIMessage(content="ипотека", name="ai")]}
+
+    assert retriever._prepare_intent_queries(state) == ["ипотека"]
+
+
+@pytest.mark.asyncio
+async def test_msearch_response_count_mismatch() -> None:
+    engine = HybridOpenSearchEngine(
+        client=TruncatingOpenSearch(),  # type: ignore[arg-type]
+        index_name="index",
+        embeddings=FakeEmbeddings(),  # type: ignore[arg-type]
+        k=10,
+        relevance_threshold=0.5,
+        use_hybrid_search=True,
+        bm25_weight=0.3,
+    )
+
+    with pytest.raises(RagPipelineError) as exc_info:
+        await engine.search(["вопрос"])
+    assert "1 ответов вместо 2" in exc_info.value.message
+
+
+@pytest.mark.asyncio
+async def test_main_and_intent_results_capped_at_k() -> None:
+    """Выдача основного запроса и intent сливается через RRF и не превышает k чанков."""
+    engine = HybridOpenSearchEngine(
+        client=FakeOpenSearch(),  # type: ignore[arg-type]
+        index_name="index",
+        embeddings=FakeEmbeddings(),  # type: ignore[arg-type]
+        k=3,
+        relevance_threshold=0.5,
+        use_hybrid_search=False,
+        bm25_weight=0.0,
+    )
+    llm = RewritingLLM()
+    retriever = RetrieverIntent(llm=llm, prompt="{message} {history}", search_engine=engine, fusion_method="rrf")
+    main_docs = [Document(page_content=f"main {i}", metadata={"_id": f"main-{i}"}) for i in range(3)]
+    intent_docs = [Document(page_content=f"intent {i}", metadata={"_id": f"intent-{i}"}) for i in range(3)]
+
+    combined = retriever._combine_docs(main_docs, intent_docs)
+
+    assert [doc.metadata["_id"] for doc in combined] == ["main-0", "intent-0", "main-1"]
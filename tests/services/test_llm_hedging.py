@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.core.config import CONFIG
+from app.services.RAG.llm.hedging import HedgedLLM
+from app.services.RAG.llm.schemas import ResponseYAGPTSchema
+
+
+def make_response(text: str) -> ResponseYAGPTSchema:
+    return ResponseYAGPTSchema(
+        alternatives=[{"message": {"role": "assistant", "text": text}, "status": "ALTERNATIVE_STATUS_FINAL"}],
+        modelVersion="test",
+    )
+
+
+class SlowFirstLLM:
+    """LLM-заглушка: задержки вызовов берутся по очереди из delays."""
+
+    stream = False
+    model_uri = "gpt://folder/lite/latest"
+    temperature = 0.0
+
+    def __init__(self, delays: list[float]) -> None:
+        self.delays = delays
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        call = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delays[call])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return make_response(f"call-{call}")
+
+
+def make_hedged(llm: SlowFirstLLM, **config: object) -> HedgedLLM:
+    hedging_config = CONFIG.llm_hedging.model_copy(
+        update={"enabled": True, "min_samples": 3, "min_delay_seconds": 0.01, **config},
+    )
+    return HedgedLLM(llm, config=hedging_config, node="llm")  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_loser_cancelled() -> None:
+    """Ответа нет дольше перцентиля — уходит дубль; побеждает быстрый, медленный отменяется."""
+    llm = SlowFirstLLM(delays=[0.01, 0.01, 0.01, 1.0, 0.01])
+    hedged = make_hedged(llm, max_extra_ratio=1.0)
+    for _ in range(3):
+        await hedged.generate([])
+
+    response = await hedged.generate([])
+
+    assert response.alternatives[0].message.text == "call-4"
+    await asyncio.sleep(0)  # отмена проигравшего доставляется на следующей итерации цикла
+    assert llm.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_hedges_respect_budget() -> None:
+    llm = SlowFirstLLM(delays=[0.01, 0.01, 0.01, 0.05])
+    hedged = make_hedged(llm, max_extra_ratio=0.05)
+    for _ in range(3):
+        await hedged.generate([])
+
+    response = await hedged.generate([])
+
+    assert response.alternatives[0].message.text == "call-3"
+    assert llm.calls == 4  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_budget_does_not_accumulate_over_quiet_period() -> None:
+    """Бюджет копится не больше budget_burst: после тихого периода нет залпа дублей."""
+    llm = SlowFirstLLM(delays=[0.01, 0.01, 0.01, 0.2, 0.01, 0.2])
+    hedged = make_hedged(llm, max_extra_ratio=0.5, budget_burst=1.0)
+    for _ in range(3):
+        await hedged.generate([])
+
+    hedged_response = await hedged.generate([])
+    response = await hedged.generate([])
+
+    assert hedged_response.alternatives[0].message.text == "call-4"
+    assert response.alternatives[0].message.text == "call-5"
+    assert llm.calls == 6  # noqa: PLR2004
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.core.config import CONFIG
+from app.services.RAG.llm.limiter import LLMLimiter
+from app.services.RAG.llm.TYK.exceptions import TYKClientError
+from app.services.RAG.rag_pipeline.exceptions import RagPipelineError
+
+
+def make_limiter(**config: object) -> LLMLimiter:
+    return LLMLimiter(CONFIG.llm_limiter.model_copy(update={"enabled": True, **config}))
+
+
+@pytest.mark.asyncio
+async def test_final_answer_is_served_before_answer_checker() -> None:
+    """Освободившийся слот получает узел с более высоким приоритетом, даже если пришёл позже."""
+    limiter = make_limiter(initial_concurrency=1, max_concurrency=1)
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def call(node: str) -> None:
+        async with limiter.slot(node, tokens=1):
+            order.append(node)
+            await release.wait()
+
+    first = asyncio.create_task(call("Intent"))
+    await asyncio.sleep(0.01)
+    checker = asyncio.create_task(call("AnswerChecker"))
+    await asyncio.sleep(0.01)
+    answer = asyncio.create_task(call("llm"))
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(first, checker, answer)
+
+    assert order == ["Intent", "llm", "AnswerChecker"]
+
+
+@pytest.mark.asyncio
+async def test_overload_shrinks_limit_and_success_grows_it() -> None:
+    limiter = make_limiter(initial_concurrency=10, decrease_ratio=0.5)
+
+    with pytest.raises(RagPipelineError):
+        async with limiter.slot("llm", tokens=1):
+            raise RagPipelineError(message="Ошибка LLM API") from TYKClientError("quota", status_code=429)
+    assert limiter.concurrency.limit == 5  # noqa: PLR2004
+
+    for _ in range(6):  # +1/limit за вызов: за ~limit успешных вызовов лимит растёт на 1
+        async with limiter.slot("llm", tokens=1):
+            pass
+    assert limiter.concurrency.limit == 6  # noqa: PLR2004
+    assert limiter.concurrency.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_overloads_shrink_limit_once() -> None:
+    """Одновременно упавшие вызовы сжимают лимит один раз, а не decrease_ratio ** n."""
+    limiter = make_limiter(initial_concurrency=10, decrease_ratio=0.5)
+    started = asyncio.Event()
+
+    async def failing_call() -> None:
+        async with limiter.slot("llm", tokens=1):
+            await started.wait()
+            raise RagPipelineError(message="Ошибка LLM API") from TYKClientError("quota", status_code=429)
+
+    calls = [asyncio.create_task(failing_call()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    started.set()
+    await asyncio.gather(*calls, return_exceptions=True)
+    assert limiter.concurrency.limit == 5  # noqa: PLR2004
+
+    with pytest.raises(RagPipelineError):
+        await failing_call()
+    assert limiter.concurrency.limit == 2  # noqa: PLR2004
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.core.config import LLMMemoConfig
+from app.services.RAG.llm.memo import InMemoryMemoBackend, MemoizedLLM
+from app.services.RAG.llm.schemas import AlternativesSchema, MessageSchema, ResponseYAGPTSchema
+
+
+class CountingLLM:
+    """LLM-заглушка, считающая реальные вызовы generate."""
+
+    stream = False
+    model_uri = "gpt://folder/lite/latest"
+
+    def __init__(self, temperature: float) -> None:
+        self.temperature = temperature
+        self.calls = 0
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return ResponseYAGPTSchema(
+            alternatives=[AlternativesSchema(message=MessageSchema(role="assistant", text="ответ"), status="ok")],
+            modelVersion="test",
+        )
+
+
+PROMPT = [{"role": "user", "text": "вопрос"}]
+
+
+@pytest.mark.asyncio
+async def test_memoized_llm_reuses_identical_prompts() -> None:
+    """Повторные и одновременные одинаковые промпты вызывают LLM один раз."""
+    llm = CountingLLM(temperature=0.0)
+    memo = MemoizedLLM(llm, backend=InMemoryMemoBackend(max_size=16, ttl_seconds=60), config=LLMMemoConfig())
+
+    results = await asyncio.gather(memo.generate(PROMPT), memo.generate(PROMPT))
+    results.append(await memo.generate(PROMPT))
+    await memo.generate([{"role": "user", "text": "другой вопрос"}])
+
+    assert llm.calls == 2  # noqa: PLR2004
+    assert {r.alternatives[-1].message.text for r in results} == {"ответ"}
+
+
+@pytest.mark.asyncio
+async def test_memoized_llm_bypasses_high_temperature() -> None:
+    """При температуре выше max_temperature кэш не используется."""
+    llm = CountingLLM(temperature=0.82)
+    memo = MemoizedLLM(
+        llm,
+        backend=InMemoryMemoBackend(max_size=16, ttl_seconds=60),
+        config=LLMMemoConfig(max_temperature=0.3),
+    )
+
+    await memo.generate(PROMPT)
+    await memo.generate(PROMPT)
+
+    assert llm.calls == 2  # noqa: PLR2004
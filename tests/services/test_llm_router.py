@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.core.config import CONFIG
+from app.services.RAG.llm.router import LLMRouter
+from app.services.RAG.llm.schemas import ResponseYAGPTSchema
+from app.services.RAG.rag_pipeline.exceptions import RagPipelineError
+
+
+def make_response(text: str) -> ResponseYAGPTSchema:
+    return ResponseYAGPTSchema(
+        alternatives=[{"message": {"role": "assistant", "text": text}, "status": "ALTERNATIVE_STATUS_FINAL"}],
+        modelVersion="test",
+    )
+
+
+class StubBackend:
+    """LLM-заглушка: отвечает своим именем через delay секунд или падает с ошибкой."""
+
+    stream = False
+    temperature = 0.0
+
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False) -> None:
+        self.name = name
+        self.model_uri = f"stub://{name}"
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def generate(self, prompt: list[dict[str, str]]) -> ResponseYAGPTSchema:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RagPipelineError(message=f"{self.name} down")
+        return make_response(self.name)
+
+
+def make_router(backends: list[StubBackend], **config: object) -> LLMRouter:
+    router_config = CONFIG.llm_router.model_copy(update={"enabled": True, **config})
+    return LLMRouter({backend.name: backend for backend in backends}, router_config)  # type: ignore[misc]
+
+
+async def answer(router: LLMRouter, node: str) -> str:
+    response = await router.for_node(node).generate([])
+    return response.alternatives[0].message.text
+
+
+@pytest.mark.asyncio
+async def test_node_policy_routes_to_preferred_backend() -> None:
+    local, remote = StubBackend("ollama"), StubBackend("primary")
+    router = make_router([remote, local], node_backends={"Intent": ["ollama", "primary"]})
+
+    assert await answer(router, "Intent") == "ollama"
+    assert await answer(router, "llm") == "primary"
+    assert router.for_node("Intent").model_uri == "stub://ollama"
+
+
+@pytest.mark.asyncio
+async def test_switches_away_from_much_slower_backend() -> None:
+    slow, fast = StubBackend("slow", delay=0.05), StubBackend("fast", delay=0.005)
+    router = make_router([slow, fast], ewma_alpha=1.0)
+
+    # первый вызов — предпочтительный, второй — проба неизмеренного, дальше — быстрый
+    answers = [await answer(router, "llm") for _ in range(4)]
+
+    assert answers == ["slow", "fast", "fast", "fast"]
+
+
+@pytest.mark.asyncio
+async def test_failover_to_next_backend_on_error() -> None:
+    broken, healthy = StubBackend("primary", fail=True), StubBackend("ollama")
+    router = make_router([broken, healthy])
+
+    assert await answer(router, "llm") == "ollama"
+    assert router.stats["primary"].error_rate > 0
+    assert router.order("llm")[0] == "ollama"
+
+
+@pytest.mark.asyncio
+async def test_without_failover_error_is_raised() -> None:
+    router = make_router([StubBackend("primary", fail=True), StubBackend("ollama")], failover=False)
+
+    with pytest.raises(RagPipelineError):
+        await answer(router, "llm")
+
+
+def test_unknown_backend_in_policy_is_rejected() -> None:
+    with pytest.raises(ValueError, match="unknown"):
+        make_router([StubBackend("primary")], node_backends={"Intent": ["unknown"]})
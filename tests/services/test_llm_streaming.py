@@ -0,0 +1,108 @@
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+import pytest
+
+from app.core.config import CONFIG
+from app.services.RAG.llm.schemas import AlternativesSchema, MessageSchema, ResponseYAGPTSchema
+from app.services.RAG.llm.TYK.yandex import TYKClient
+from app.services.RAG.rag_pipeline.nodes.base.base_llm import BaseLLM
+from rnd_connectors.yandex_llm.client import YaGPTAsyncClient
+from rnd_connectors.yandex_llm.exceptions import YaGPTClientError
+
+
+class StaticToken:
+    @property
+    async def id_token(self) -> str:
+        return "Bearer token"
+
+    @property
+    async def token(self) -> str:
+        return "token"
+
+
+def ndjson_client(status_code: int, lines: list[str]) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["completionOptions"]["stream"] is True
+        return httpx.Response(status_code, content="\n".join(lines).encode())
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def make_yagpt(http_client: httpx.AsyncClient) -> YaGPTAsyncClient:
+    return YaGPTAsyncClient(
+        StaticToken(),  # type: ignore[arg-type]
+        folder_id="folder",
+        api_url="http://yagpt/",
+        http_client=http_client,
+    )
+
+
+def partial(text: str) -> dict[str, Any]:
+    return {"result": {"alternatives": [{"message": {"role": "assistant", "text": text}}]}}
+
+
+@pytest.mark.asyncio
+async def test_stream_parses_ndjson_lines_and_skips_blank() -> None:
+    lines = [json.dumps(partial("При")), "", "  ", json.dumps(partial("Привет"))]
+    client = make_yagpt(ndjson_client(200, lines))
+
+    chunks = [chunk async for chunk in client.stream("completion", {"completionOptions": {"stream": True}})]
+
+    assert chunks == [partial("При"), partial("Привет")]
+
+
+@pytest.mark.asyncio
+async def test_tyk_stream_completion_parses_ndjson_lines() -> None:
+    client = TYKClient(
+        CONFIG.tyk_yandex_config.model_copy(update={"api_url": "http://tyk/completion"}),
+        token_manager=StaticToken(),  # type: ignore[arg-type]
+        http_client=ndjson_client(200, [json.dumps(partial("При")), "", json.dumps(partial("Привет"))]),
+    )
+
+    chunks = [chunk async for chunk in client.stream_completion({"completionOptions": {"stream": True}})]
+
+    assert chunks == [partial("При"), partial("Привет")]
+
+
+@pytest.mark.asyncio
+async def test_stream_error_status_raises_with_body() -> None:
+    client = make_yagpt(ndjson_client(429, ['{"error": "quota"}']))
+
+    with pytest.raises(YaGPTClientError) as exc_info:
+        async for _ in client.stream("completion", {"completionOptions": {"stream": True}}):
+            pass
+
+    assert exc_info.value.status_code == 429  # noqa: PLR2004
+    assert "quota" in str(exc_info.value)
+
+
+class CumulativeLLM:
+    """LLM-заглушка: astream отдаёт накопленный текст, как YaGPT."""
+
+    stream = True
+
+    def __init__(self, texts: list[str]) -> None:
+        self.texts = texts
+
+    async def astream(self, prompt: list[dict[str, str]]) -> AsyncIterator[ResponseYAGPTSchema]:
+        for text in self.texts:
+            yield ResponseYAGPTSchema(
+                alternatives=[AlternativesSchema(message=MessageSchema(role="assistant", text=text), status="")],
+                modelVersion="test",
+            )
+
+
+@pytest.mark.asyncio
+async def test_cumulative_chunks_are_forwarded_as_deltas(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Наружу уходит только прирост текста; если текст переписан целиком — весь новый текст."""
+    events: list[dict[str, str]] = []
+    monkeypatch.setattr(BaseLLM, "_stream_writer", staticmethod(lambda: events.append))
+    node = BaseLLM(CumulativeLLM(["При", "Привет", "Привет", "Привет, мир", "Здравствуйте"]), prompt="{message}")
+
+    last = await node._generate_streaming([{"role": "user", "text": "вопрос"}])
+
+    assert [event["delta"] for event in events] == ["При", "вет", ", мир", "Здравствуйте"]
+    assert last.alternatives[-1].message.text == "Здравствуйте"
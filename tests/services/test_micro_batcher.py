@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.services.RAG.rag_pipeline.embeddings.batched import BatchedEmbeddings
+from app.services.RAG.rag_pipeline.utils.micro_batcher import MicroBatcher
+
+
+class FakeEmbeddings:
+    """Модель-заглушка: запоминает размеры батчей aembed_documents."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(texts)
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_one_forward_pass() -> None:
+    """Одновременные aembed_query уходят в модель одним батчем, результаты раздаются по вызовам."""
+    model = FakeEmbeddings()
+    embeddings = BatchedEmbeddings(model, max_batch_size=32, max_wait_ms=5)  # type: ignore[arg-type]
+
+    results = await asyncio.gather(*(embeddings.aembed_query("x" * n) for n in range(1, 5)))
+
+    assert results == [[1.0], [2.0], [3.0], [4.0]]
+    assert model.batches == [["x", "xx", "xxx", "xxxx"]]
+
+
+@pytest.mark.asyncio
+async def test_batch_flushes_by_size_and_propagates_errors() -> None:
+    calls: list[list[int]] = []
+
+    async def process(items: list[int]) -> list[int]:
+        calls.append(items)
+        if 0 in items:
+            raise ValueError("bad item")
+        return [item * 10 for item in items]
+
+    batcher: MicroBatcher[int, int] = MicroBatcher(process, max_batch_size=2, max_wait_ms=10_000)
+
+    assert await batcher.submit_many([1, 2]) == [10, 20]
+    with pytest.raises(ValueError):
+        await batcher.submit_many([0, 3])
+    assert calls == [[1, 2], [0, 3]]
@@ -3,9 +3,9 @@ from unittest.mock import AsyncMock, Mock
 
 import pytest
 
-from ___check.langfuse import handler
 from app.core.kafka_broker.schemas import LangchainConsumerMessage, LangchainProducerMessage, StatusCode
 from app.services.rag_service import RagService
+from app.services.tracing import langfuse_callbacks
 
 
 @pytest.fixture
@@ -47,7 +47,7 @@ async def test_rag_service_handle_message_success(
     result = await rag_service.handle_message(body=body, headers=headers, key=key)
 
     # Проверяем, что pipeline.query был вызван с переданным вопросом
-    mock_pipeline.query.assert_called_once_with(question, callbacks=[handler])
+    mock_pipeline.query.assert_called_once_with(question, callbacks=langfuse_callbacks())
 
     # Вариант 1: Проверка всего объекта
     assert result == LangchainProducerMessage(message=expected_answer, statusCode=StatusCode.SUCCESS)
@@ -72,3 +72,35 @@ async def test_rag_service_handle_message_exception(rag_service: RagService, moc
         await rag_service.handle_message(body=body, headers=headers, key=key)
     except Exception as e:
         assert "pipeline failed" in str(e)
+
+
+@pytest.mark.asyncio
+async def test_rag_service_handle_message_stream_publishes_partials(
+    rag_service: RagService,
+    mock_pipeline: Mock,
+) -> None:
+    """Тест потоковой обработки: частичные ответы уходят в on_partial, финальный возвращается."""
+    final_message = Mock()
+    final_message.content = "Привет, мир"
+
+    async def query_stream(question: str, callbacks: list[Any]):
+        for delta in ["Привет", ", ", "мир"]:
+            yield {"type": "token", "delta": delta}
+        yield {"type": "final", "state": {"messages": [final_message]}}
+
+    mock_pipeline.query_stream = query_stream
+    on_partial = AsyncMock()
+
+    body = LangchainConsumerMessage(test_questions="вопрос")
+    result = await rag_service.handle_message_stream(
+        body=body,
+        headers={},
+        on_partial=on_partial,
+        key=b"rag_key",
+        min_chars=5,
+    )
+
+    partials = [call.args[0] for call in on_partial.await_args_list]
+    assert [p.message for p in partials] == ["Привет", "Привет, мир"]
+    assert all(p.statusCode == StatusCode.PARTIAL for p in partials)
+    assert result == LangchainProducerMessage(message="Привет, мир", statusCode=StatusCode.SUCCESS)
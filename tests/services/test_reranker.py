@@ -0,0 +1,46 @@
+from typing import Any
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage
+
+from app.core.config import RerankerConfig
+from app.services.RAG.rag_pipeline.nodes.retrieval.reranker import Reranker
+from app.services.RAG.rag_pipeline.reranking.cross_encoder import CrossEncoderScorer
+
+
+class FakeCrossEncoder:
+    """Модель-заглушка: score = длина текста, запоминает размеры батчей."""
+
+    def __init__(self) -> None:
+        self.batch_sizes: list[int] = []
+
+    def predict(self, pairs: list[tuple[str, str]], batch_size: int, **kwargs: Any) -> list[float]:
+        self.batch_sizes.append(batch_size)
+        return [float(len(text)) for _, text in pairs]
+
+
+@pytest.mark.asyncio
+async def test_reranker_scores_in_one_batch_and_truncates_to_n_best() -> None:
+    """Все кандидаты скорятся одним батчем в пуле потоков, на выходе n_best лучших."""
+    model = FakeCrossEncoder()
+    scorer = CrossEncoderScorer(RerankerConfig())
+    scorer._model = model  # type: ignore[assignment]
+    reranker = Reranker(n_best=2, scorer=scorer)
+    chunks = [Document(page_content=text) for text in ("a", "ccc", "bb", "dddd")]
+
+    state = await reranker.ainvoke({"messages": [HumanMessage("вопрос")], "retrieved": chunks, "intent": []})
+
+    assert [doc.page_content for doc in state["retrieved"]] == ["dddd", "ccc"]
+    assert state["retrieved"][0].metadata["_rerank_score"] == 4.0  # noqa: PLR2004
+    assert model.batch_sizes == [4]
+    scorer.close()
+
+
+@pytest.mark.asyncio
+async def test_reranker_without_scorer_only_truncates() -> None:
+    chunks = [Document(page_content=str(i)) for i in range(5)]
+
+    state = await Reranker(n_best=3).ainvoke({"messages": [HumanMessage("вопрос")], "retrieved": chunks, "intent": []})
+
+    assert state["retrieved"] == chunks[:3]
@@ -0,0 +1,51 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.core.config import ResponseCacheConfig
+from app.services.RAG.rag_pipeline.cache.response_cache import SemanticResponseCache
+from app.services.RAG.rag_pipeline.pipeline import RAGPipeline
+
+
+class FakeEmbeddings:
+    """Эмбеддинги-заглушка: вектор по словарю, неизвестный текст — ортогональный вектор."""
+
+    vectors = {
+        "как оформить ипотеку": [1.0, 0.0, 0.0],
+        "как получить ипотеку": [0.99, 0.1, 0.0],
+    }
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return self.vectors.get(text, [0.0, 0.0, 1.0])
+
+
+@pytest.mark.asyncio
+async def test_response_cache_exact_and_semantic_hits() -> None:
+    """Нормализованный вопрос попадает в L1, похожий по смыслу — в семантический поиск."""
+    config = ResponseCacheConfig(enabled=True, semantic_enabled=True, similarity_threshold=0.9)
+    cache = SemanticResponseCache(config=config, embeddings=FakeEmbeddings())  # type: ignore[arg-type]
+
+    assert await cache.get("Как оформить ипотеку?") is None
+    await cache.set("Как оформить ипотеку?", "ответ про ипотеку")
+
+    assert await cache.get("  как   оформить ипотеку ") == "ответ про ипотеку"
+    assert await cache.get("Как получить ипотеку?") == "ответ про ипотеку"
+    assert await cache.get("Какая погода завтра?") is None
+
+
+@pytest.mark.asyncio
+async def test_pipeline_cache_hit_skips_graph() -> None:
+    """При попадании в кэш граф не вызывается, ответ возвращается последним сообщением."""
+    graph = Mock()
+    graph.ainvoke = AsyncMock(
+        return_value={"messages": [HumanMessage("вопрос"), AIMessage("ответ", name="ai")], "retrieved": []},
+    )
+    cache = SemanticResponseCache(config=ResponseCacheConfig(enabled=True))
+    pipeline = RAGPipeline(graph=graph, response_cache=cache)
+
+    first = await pipeline.query("Вопрос")
+    second = await pipeline.query("вопрос?")
+
+    graph.ainvoke.assert_awaited_once()
+    assert first["messages"][-1].content == second["messages"][-1].content == "ответ"
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.core.config import CONFIG
+from app.services.RAG.llm.EPA.epa_token import EPATokenManager
+from app.services.RAG.llm.EPA.schemas import EPAToken
+from rnd_connectors.yandex_llm.schemas import Tokens
+from rnd_connectors.yandex_llm.token_manager import AsyncTokenManager
+
+
+class FakeEPA(EPATokenManager):
+    """EPATokenManager с подменённым походом в EPA: выдаёт token-1, token-2, ...; первые fail_times вызовов падают."""
+
+    def __init__(self, fail_times: int = 0, **config: object) -> None:
+        super().__init__(CONFIG.epa_token.model_copy(update=config))
+        self.calls = 0
+        self.fail_times = fail_times
+
+    async def get_token(self) -> EPAToken:
+        self.calls += 1
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("EPA недоступен")
+        return EPAToken(access_token=f"token-{self.calls}", expires_in=3600, token_type="Bearer")
+
+
+class FakeRnd(AsyncTokenManager):
+    """AsyncTokenManager с подменённым походом в token endpoint: выдаёт id-1, id-2, ...; первые fail_times падают."""
+
+    def __init__(self, fail_times: int = 0, **config: object) -> None:
+        super().__init__(CONFIG.rnd_token_manager_config.model_copy(update=config))
+        self.calls = 0
+        self.fail_times = fail_times
+
+    async def _get_tokens(self) -> Tokens:
+        self.calls += 1
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("token endpoint недоступен")
+        return Tokens(
+            access_token=f"access-{self.calls}",
+            refresh_token=f"refresh-{self.calls}",
+            id_token=f"id-{self.calls}",
+            expires_in=3600,
+            refresh_expires_in=7200,
+            token_type="Bearer",
+            session_state="state",
+            scope="openid",
+        )
+
+
+@pytest.mark.asyncio
+async def test_valid_token_is_served_without_refetch() -> None:
+    manager = FakeEPA()
+
+    tokens = await asyncio.gather(*(manager.token for _ in range(10)))
+
+    assert set(tokens) == {"token-1"}
+    assert manager.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_runs_in_background_and_retries_with_jitter() -> None:
+    """После refresh_at запрос получает текущий токен сразу, новый приходит из фона (после повтора ошибки)."""
+    manager = FakeEPA(refresh_ratio=0.0, refresh_retry_min_seconds=0.01, refresh_retry_max_seconds=0.02)
+    assert await manager.token == "token-1"
+
+    manager.fail_times = 1
+    assert await manager.token == "token-1"  # обновление запущено, запрос его не ждёт
+    await asyncio.sleep(0.1)
+
+    assert manager.calls == 3  # token-1, ошибка, повтор  # noqa: PLR2004
+    assert manager._is_valid()
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rnd_valid_token_is_served_without_refetch() -> None:
+    manager = FakeRnd()
+
+    tokens = await asyncio.gather(*(manager.id_token for _ in range(10)))
+
+    assert set(tokens) == {"id-1"}
+    assert manager.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_rnd_refresh_runs_in_background_and_retries_with_jitter() -> None:
+    """id_token после refresh_at отдаётся сразу, новый приходит из фона (после повтора ошибки)."""
+    manager = FakeRnd(refresh_ratio=0.0, refresh_retry_min_seconds=0.01, refresh_retry_max_seconds=0.02)
+    assert await manager.id_token == "id-1"
+
+    manager.fail_times = 1
+    assert await manager.id_token == "id-1"  # обновление запущено, запрос его не ждёт
+    await asyncio.sleep(0.1)
+
+    assert manager.calls == 3  # id-1, ошибка, повтор  # noqa: PLR2004
+    assert await manager.id_token == "id-3"
+    await manager.aclose()